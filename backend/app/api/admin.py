@@ -0,0 +1,94 @@
+"""
+API Endpoints de Administración: procesos por lotes sobre todo el catálogo.
+Requiere un usuario Administrador (ADMIN_EMAILS).
+"""
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.auth import require_admin
+from app.models.usuario import Usuario
+from app.services.valoracion_masiva_service import ValoracionMasivaService
+from app.services.trm_service import TRMService
+from app.services.clasificacion_service import ClasificacionService
+from app.schemas.calculo_schemas import (
+    ValoracionMasivaRequest, ValoracionMasivaResponse,
+    CargaTRMRequest, CargaTRMResponse,
+    ClasificacionResponse,
+)
+
+router = APIRouter()
+
+
+@router.post("/valoracion-bonos", response_model=ValoracionMasivaResponse)
+def valorar_universo_bonos(
+    request: ValoracionMasivaRequest,
+    db: Session = Depends(get_db),
+    _admin: Usuario = Depends(require_admin),
+):
+    """
+    **Valora todos los bonos activos del catálogo en una sola corrida**
+    
+    Mismo proceso que el job nocturno (`python valorar_bonos.py`): una
+    consulta para cargar los bonos, valoración en un pool de procesos e
+    inserción masiva en el historial `calculos_bonos`.
+    
+    ### Retorna:
+    - Bonos valorados y errores por bono
+    - Tiempos de carga, valoración e inserción
+    - Throughput (bonos por segundo)
+    """
+    try:
+        return ValoracionMasivaService.valorar_universo_bonos(
+            db=db,
+            fecha_valoracion=request.fecha_valoracion,
+            tir=request.tir,
+            procesos=request.procesos
+        )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/trm", response_model=CargaTRMResponse)
+async def cargar_historico_trm(
+    request: CargaTRMRequest,
+    db: Session = Depends(get_db),
+    _admin: Usuario = Depends(require_admin),
+):
+    """
+    **Carga masiva del histórico de TRM**
+    
+    Inserta las fechas nuevas y reemplaza las existentes. La serie en
+    memoria se recarga en la próxima consulta.
+    """
+    try:
+        return TRMService.cargar_historico(
+            db,
+            [(r.fecha, r.valor) for r in request.registros],
+            fuente=request.fuente
+        )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/clasificacion", response_model=ClasificacionResponse)
+async def obtener_clasificacion(
+    limite: Optional[int] = Query(None, ge=1, le=10000, description="Número de posiciones (default: todas)"),
+    db: Session = Depends(get_db),
+    _admin: Usuario = Depends(require_admin),
+):
+    """
+    **Clasificación del curso por rendimiento**
+    
+    Rendimiento = (valor de mercado - costo invertido) / costo invertido de
+    la última valoración diaria de cada usuario, calificado con la
+    META_RENDIMIENTO vigente. Empates comparten posición.
+    
+    El ranking se mantiene en caché y se actualiza con cada snapshot nuevo.
+    """
+    try:
+        return ClasificacionService.obtener_clasificacion(db, limite=limite)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
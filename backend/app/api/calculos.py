@@ -1,19 +1,34 @@
 """
 API Endpoints para Cálculos Financieros
 """
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from typing import Dict
+from typing import Dict, List
 
 from app.database import get_db
-from app.auth import require_auth
+from app.auth import require_auth, require_admin
 from app.models.usuario import Usuario
 from app.services.calculo_service import CalculoFinancieroService
+from app.services.valoracion_bonos_service import ValoracionBonosService
+from app.services.memoizacion_service import MemoizacionService
+from app.services.curva_rendimiento_service import CurvaRendimientoService
+from app.services.trm_service import TRMService
 from app.schemas.calculo_schemas import (
     CalculoBonoRequest, CalculoBonoResponse,
+    CalculoBonoLoteRequest, CalculoBonoLoteResponse,
+    TirImplicitaRequest, TirImplicitaResponse,
+    TirImplicitaLoteRequest, TirImplicitaLoteResponse,
+    AnaliticaBonoResponse,
+    AnaliticaBonoLoteRequest, AnaliticaBonoLoteResponse,
+    CurvaPrecioTirRequest, CurvaPrecioTirResponse,
+    CurvaRendimientoRequest, CurvaRendimientoResponse, CalculoBonoCurvaRequest,
+    CalculoBonoCurvaLoteRequest, CalculoBonoCurvaLoteResponse,
     CalculoBonoActivoRequest,
     CalculoCDTRequest, CalculoCDTResponse,
-    ConversionDivisaRequest, ConversionDivisaResponse,
+    CronogramaLiquidacionCDTRequest, CronogramaLiquidacionCDTResponse,
+    ConversionDivisaRequest, ConversionDivisaResponse, ConsultaTRMResponse,
     CalificacionRequest, CalificacionResponse
 )
 
@@ -40,7 +55,10 @@ async def calcular_precio_bono(
     ### Casos de uso:
     - Valoración de bonos gubernamentales (TES)
     - Bonos corporativos
-    - Cálculo de TIR implícita
+    - Cálculo de TIR implícita (ver `/bono/tir-implicita`)
+    
+    `modo_precision='rapido'` usa el núcleo float64 (tamizaje); el modo
+    por defecto `'exacto'` usa Decimal de 28 dígitos.
     """
     try:
         resultado = CalculoFinancieroService.calcular_precio_bono_sucio(
@@ -50,7 +68,279 @@ async def calcular_precio_bono(
             tir=request.tir,
             fecha_emision=request.fecha_emision,
             fecha_vencimiento=request.fecha_vencimiento,
-            fecha_valoracion=request.fecha_valoracion or __import__('datetime').date.today()
+            fecha_valoracion=request.fecha_valoracion or date.today(),
+            modo_precision=request.modo_precision
+        )
+        return resultado
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/bono/precio-sucio/lote", response_model=CalculoBonoLoteResponse)
+async def calcular_precio_bono_lote(
+    request: CalculoBonoLoteRequest,
+    _current_user: Usuario = Depends(require_auth),
+):
+    """
+    **Valora una matriz de Bonos × TIR en una sola llamada**
+    
+    Calcula precio limpio, cupón acumulado y precio sucio para cada
+    combinación (bono, TIR) con operaciones vectorizadas de NumPy.
+    
+    ### Notas:
+    - El cupón acumulado no depende de la TIR: se reporta una vez por bono
+    - Los bonos vencidos se reportan con `error` sin afectar al resto
+    - `verificar_exacto=true` recalcula cada celda con el motor Decimal y
+      retorna la mayor diferencia en `diferencia_maxima_exacto` (más lento)
+    
+    ### Casos de uso:
+    - Reportes del catálogo completo a varias TIR
+    - Tablas de sensibilidad precio/TIR
+    """
+    try:
+        resultado = ValoracionBonosService.calcular_precios_lote(
+            bonos=[bono.model_dump() for bono in request.bonos],
+            tirs=request.tirs,
+            fecha_valoracion=request.fecha_valoracion or date.today(),
+            verificar_exacto=request.verificar_exacto
+        )
+        return resultado
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/bono/tir-implicita", response_model=TirImplicitaResponse)
+async def calcular_tir_implicita(
+    request: TirImplicitaRequest,
+    _current_user: Usuario = Depends(require_auth),
+):
+    """
+    **Calcula la TIR implícita de un bono dado su precio de mercado**
+    
+    Encuentra la TIR que hace que el precio del bono sea igual al precio
+    observado (`tipo_precio`: `sucio` incluye el cupón acumulado, `limpio` no).
+    
+    ### Método:
+    - Newton-Raphson sobre el precio con derivada analítica
+      $$\\frac{dP}{dr} = -\\frac{1}{1+r}\\sum_{t=1}^{n} t \\cdot \\frac{F_t}{(1+r)^t}$$
+    - Salvaguarda de bisección: si el paso sale del intervalo que encierra
+      la raíz se usa el punto medio, por lo que siempre converge
+    
+    Retorna la valoración completa del bono a la TIR encontrada.
+    """
+    try:
+        resultado = ValoracionBonosService.calcular_tir_implicita(
+            valor_nominal=request.valor_nominal,
+            tasa_cupon=request.tasa_cupon,
+            frecuencia_cupon=request.frecuencia_cupon,
+            precio_mercado=request.precio_mercado,
+            fecha_emision=request.fecha_emision,
+            fecha_vencimiento=request.fecha_vencimiento,
+            fecha_valoracion=request.fecha_valoracion or date.today(),
+            tipo_precio=request.tipo_precio
+        )
+        return resultado
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/bono/tir-implicita/lote", response_model=TirImplicitaLoteResponse)
+async def calcular_tir_implicita_lote(
+    request: TirImplicitaLoteRequest,
+    _current_user: Usuario = Depends(require_auth),
+):
+    """
+    **Calcula la TIR implícita de muchos bonos en una sola llamada**
+    
+    Todas las iteraciones de Newton se ejecutan vectorizadas sobre el lote;
+    cada bono deja de iterar al converger. Los bonos con datos inválidos se
+    reportan con `error` sin afectar al resto.
+    """
+    try:
+        resultado = ValoracionBonosService.calcular_tir_implicita_lote(
+            bonos=[bono.model_dump() for bono in request.bonos],
+            fecha_valoracion=request.fecha_valoracion or date.today()
+        )
+        return resultado
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/bono/analitica", response_model=AnaliticaBonoResponse)
+async def calcular_analitica_bono(
+    request: CalculoBonoRequest,
+    _current_user: Usuario = Depends(require_auth),
+):
+    """
+    **Calcula duración, convexidad y DV01 de un bono**
+    
+    Todas las medidas salen de la misma pasada de descuento que el precio
+    (sin recalcular el bono a TIR desplazadas):
+    
+    - **Duración Macaulay**: plazo promedio ponderado de los flujos (años)
+    - **Duración Modificada**: variación % del precio por cada 1% de TIR
+    - **Convexidad**: curvatura de la relación precio/TIR
+    - **DV01**: cambio del precio en pesos por 1 punto básico de TIR
+    """
+    try:
+        resultado = ValoracionBonosService.calcular_analitica(
+            valor_nominal=request.valor_nominal,
+            tasa_cupon=request.tasa_cupon,
+            frecuencia_cupon=request.frecuencia_cupon,
+            tir=request.tir,
+            fecha_emision=request.fecha_emision,
+            fecha_vencimiento=request.fecha_vencimiento,
+            fecha_valoracion=request.fecha_valoracion or date.today()
+        )
+        return resultado
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/bono/analitica/lote", response_model=AnaliticaBonoLoteResponse)
+async def calcular_analitica_bono_lote(
+    request: AnaliticaBonoLoteRequest,
+    _current_user: Usuario = Depends(require_auth),
+):
+    """
+    **Calcula la analítica de riesgo de muchos bonos en una sola llamada**
+    
+    Cada bono se descuenta una sola vez a su propia TIR; los bonos con
+    datos inválidos se reportan con `error` sin afectar al resto.
+    """
+    try:
+        resultado = ValoracionBonosService.calcular_analitica_lote(
+            bonos=[bono.model_dump() for bono in request.bonos],
+            fecha_valoracion=request.fecha_valoracion or date.today()
+        )
+        return resultado
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/bono/curva-precio-tir", response_model=CurvaPrecioTirResponse)
+async def calcular_curva_precio_tir(
+    request: CurvaPrecioTirRequest,
+    _current_user: Usuario = Depends(require_auth),
+):
+    """
+    **Genera la curva Precio vs TIR de un bono en una sola llamada**
+    
+    Evalúa todos los puntos del rango `[tir_minima, tir_maxima]` con el
+    `paso` indicado en una sola pasada vectorizada. Pensado para graficar
+    la relación precio/TIR sin enviar un request por punto.
+    
+    ### Retorna por punto:
+    - TIR (%)
+    - Precio limpio y precio sucio
+    - Duración modificada (pendiente relativa de la curva)
+    """
+    try:
+        resultado = ValoracionBonosService.calcular_curva_precio_tir(
+            valor_nominal=request.valor_nominal,
+            tasa_cupon=request.tasa_cupon,
+            frecuencia_cupon=request.frecuencia_cupon,
+            fecha_emision=request.fecha_emision,
+            fecha_vencimiento=request.fecha_vencimiento,
+            fecha_valoracion=request.fecha_valoracion or date.today(),
+            tir_minima=request.tir_minima,
+            tir_maxima=request.tir_maxima,
+            paso=request.paso
+        )
+        return resultado
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/curva", response_model=CurvaRendimientoResponse)
+async def registrar_curva_rendimiento(
+    request: CurvaRendimientoRequest,
+    db: Session = Depends(get_db),
+    _admin: Usuario = Depends(require_admin),
+):
+    """
+    **Registra (o reemplaza) la curva de rendimientos de una fecha**
+    
+    Recibe rendimientos par por plazo, construye la curva cero cupón por
+    bootstrapping y la deja en caché para valorar bonos (`/bono/precio-curva`).
+    """
+    try:
+        curva = CurvaRendimientoService.guardar_curva(
+            db=db,
+            nombre_curva=request.nombre_curva,
+            fecha_curva=request.fecha_curva,
+            puntos=[(p.plazo_anios, p.tasa_par) for p in request.puntos]
+        )
+        return CurvaRendimientoService.describir_curva(curva)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/curva/{nombre_curva}/{fecha_curva}", response_model=CurvaRendimientoResponse)
+async def obtener_curva_rendimiento(
+    nombre_curva: str,
+    fecha_curva: date,
+    db: Session = Depends(get_db),
+    _current_user: Usuario = Depends(require_auth),
+):
+    """
+    **Consulta la curva construida: tasas par, tasas cero y factores de descuento**
+    """
+    try:
+        curva = CurvaRendimientoService.obtener_curva(db, nombre_curva, fecha_curva)
+        return CurvaRendimientoService.describir_curva(curva)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@router.post("/bono/precio-curva", response_model=CalculoBonoResponse)
+async def calcular_precio_bono_curva(
+    request: CalculoBonoCurvaRequest,
+    db: Session = Depends(get_db),
+    _current_user: Usuario = Depends(require_auth),
+):
+    """
+    **Valora un bono descontando sus flujos con la curva cero cupón**
+    
+    $$Precio = \\sum_{t} Flujo_t \\times DF(t) + Cupón \\ Acumulado$$
+    
+    La curva se construye una sola vez por (nombre, fecha) y queda en caché,
+    así valorar un bono cuesta un producto punto. `tir_utilizada` sólo se
+    reporta (TIR plana equivalente) con `calcular_tir_equivalente`.
+    """
+    try:
+        fecha_valoracion = request.fecha_valoracion or date.today()
+        curva = CurvaRendimientoService.obtener_curva(
+            db, request.nombre_curva, request.fecha_curva or fecha_valoracion
+        )
+        resultado = CalculoFinancieroService.calcular_precio_bono_sucio(
+            valor_nominal=request.valor_nominal,
+            tasa_cupon=request.tasa_cupon,
+            frecuencia_cupon=request.frecuencia_cupon,
+            tir=None,
+            fecha_emision=request.fecha_emision,
+            fecha_vencimiento=request.fecha_vencimiento,
+            fecha_valoracion=fecha_valoracion,
+            curva=curva,
+            calcular_tir_equivalente=request.calcular_tir_equivalente
+        )
+        return resultado
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/bono/precio-curva/lote", response_model=CalculoBonoCurvaLoteResponse)
+async def calcular_precio_bono_curva_lote(
+    request: CalculoBonoCurvaLoteRequest,
+    db: Session = Depends(get_db),
+    _current_user: Usuario = Depends(require_auth),
+):
+    """
+    **Valora un portafolio de bonos con la curva cero cupón en una sola llamada**
+    
+    Los tiempos de todos los flujos forman una matriz bonos × periodos que se
+    descuenta con una sola evaluación de la curva en caché. Los bonos con
+    datos inválidos se reportan con `error` sin afectar al resto.
+    """
+    try:
+        fecha_valoracion = request.fecha_valoracion or date.today()
+        curva = CurvaRendimientoService.obtener_curva(
+            db, request.nombre_curva, request.fecha_curva or fecha_valoracion
+        )
+        resultado = ValoracionBonosService.calcular_precios_curva_lote(
+            bonos=[bono.model_dump() for bono in request.bonos],
+            curva=curva,
+            fecha_valoracion=fecha_valoracion
         )
         return resultado
     except Exception as e:
@@ -110,7 +400,40 @@ async def calcular_liquidacion_cdt(
             fecha_inicio=request.fecha_inicio,
             fecha_liquidacion=request.fecha_liquidacion,
             plazo_dias_original=request.plazo_dias_original,
-            db=db
+            db=db,
+            modo_precision=request.modo_precision
+        )
+        return resultado
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/cdt/cronograma-liquidacion", response_model=CronogramaLiquidacionCDTResponse)
+async def calcular_cronograma_liquidacion_cdt(
+    request: CronogramaLiquidacionCDTRequest,
+    db: Session = Depends(get_db),
+    _current_user: Usuario = Depends(require_auth),
+):
+    """
+    **Liquidación del CDT para cada día del plazo en una sola llamada**
+    
+    Evalúa la liquidación (mismas fórmulas y penalizaciones de `/cdt/liquidar`)
+    para cada día, o cada `paso_dias`, hasta `plazo_dias_original`.
+    
+    ### Retorna por día:
+    - Interés bruto y tramo de penalización
+    - Monto neto a recibir
+    - Tasa efectiva anual real
+    
+    Además indica el **día óptimo** de liquidación (mayor tasa efectiva anual).
+    """
+    try:
+        resultado = CalculoFinancieroService.calcular_cronograma_liquidacion_cdt(
+            capital_invertido=request.capital_invertido,
+            tasa_interes_anual=request.tasa_interes_anual,
+            fecha_inicio=request.fecha_inicio,
+            plazo_dias_original=request.plazo_dias_original,
+            db=db,
+            paso_dias=request.paso_dias
         )
         return resultado
     except Exception as e:
@@ -119,6 +442,7 @@ async def calcular_liquidacion_cdt(
 @router.post("/divisa/convertir", response_model=ConversionDivisaResponse)
 async def convertir_divisa(
     request: ConversionDivisaRequest,
+    db: Session = Depends(get_db),
     _current_user: Usuario = Depends(require_auth),
 ):
     """
@@ -133,18 +457,38 @@ async def convertir_divisa(
     - TRM: COP/USD = 4800
     - Comisión: COP 50,000
     - **Resultado**: COP 72,170,000
+    
+    Si no se envía `trm`, se usa la TRM histórica vigente a `fecha_trm`
+    (hoy por defecto).
     """
     try:
         resultado = CalculoFinancieroService.convertir_divisa(
             cantidad=request.cantidad,
             precio_unitario=request.precio_unitario,
-            trm=request.trm,
+            trm=request.trm or TRMService.trm_vigente(db, request.fecha_trm),
             comision=request.comision
         )
         return resultado
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.get("/trm", response_model=List[ConsultaTRMResponse])
+async def consultar_trm(
+    fechas: List[date] = Query(..., description="Fechas a consultar (se puede repetir el parámetro)"),
+    db: Session = Depends(get_db),
+    _current_user: Usuario = Depends(require_auth),
+):
+    """
+    **TRM vigente a una o varias fechas**
+    
+    Para cada fecha retorna la TRM del último registro del histórico en o
+    antes de esa fecha (búsqueda binaria en memoria, una sola pasada).
+    """
+    if len(fechas) > 1000:
+        raise HTTPException(status_code=400, detail="Máximo 1000 fechas por consulta")
+    trms = TRMService.trms_en_fechas(db, fechas)
+    return [{"fecha": f, "trm": t} for f, t in zip(fechas, trms)]
+
 @router.post("/calificacion", response_model=CalificacionResponse)
 async def calcular_calificacion(
     request: CalificacionRequest,
@@ -180,3 +524,15 @@ async def calcular_calificacion(
         return resultado
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/cache/estadisticas", response_model=Dict)
+async def estadisticas_cache_calculos(
+    _current_user: Usuario = Depends(require_auth),
+):
+    """
+    **Estado de la caché de cálculos**
+    
+    Aciertos, fallos, expirados y tamaño de la memoización de resultados
+    (se activa con `CACHE_CALCULOS_HABILITADA`).
+    """
+    return MemoizacionService.estadisticas()
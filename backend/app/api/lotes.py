@@ -6,13 +6,14 @@ from sqlalchemy.orm import Session
 from typing import List, Dict
 from uuid import UUID
 
-from app.database import get_db
+from app.database import get_db, con_reintentos
 from app.auth import require_auth
 from app.models.usuario import Usuario
 from app.services.lote_service import LoteService
 from app.schemas.lote_schemas import (
-    LoteCompraRequest, LoteVentaRequest,
-    LoteResponse, EstadisticasLotesResponse
+    LoteCompraRequest, LoteVentaRequest, CompraLoteRequest, CompraLoteResponse,
+    RebalanceoRequest, RebalanceoResponse,
+    LoteResponse, EstadisticasLotesResponse, ResumenActivoResponse
 )
 
 router = APIRouter()
@@ -42,7 +43,7 @@ async def comprar_activo(
     Puedes adjuntar una URL de screenshot del precio de compra
     """
     try:
-        resultado = LoteService.comprar_activo(
+        resultado = con_reintentos(db, lambda: LoteService.comprar_activo(
             db=db,
             id_usuario=request.id_usuario,
             id_activo=request.id_activo,
@@ -52,13 +53,40 @@ async def comprar_activo(
             trm=request.trm,
             url_evidencia=request.url_evidencia,
             notas=request.notas
-        )
+        ))
         return resultado
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
 
+@router.post("/comprar/lote", response_model=CompraLoteResponse)
+async def comprar_activos_lote(
+    request: CompraLoteRequest,
+    db: Session = Depends(get_db),
+    _current_user: Usuario = Depends(require_auth),
+):
+    """
+    **🟢 Compra Masiva - Crea muchos Lotes en una transacción**
+    
+    ### Proceso:
+    1. Valida todas las compras y el costo total contra la caja (una vez)
+    2. Inserta todos los lotes y transacciones en bloque
+    3. Si algo falla no se registra ninguna compra (todo o nada)
+    
+    Útil para sembrar un portafolio o reproducir un ejercicio de clase.
+    """
+    try:
+        return con_reintentos(db, lambda: LoteService.comprar_activos_lote(
+            db=db,
+            id_usuario=request.id_usuario,
+            compras=[compra.model_dump() for compra in request.compras]
+        ))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
+
 @router.post("/vender", response_model=Dict)
 async def vender_activo(
     request: LoteVentaRequest,
@@ -84,7 +112,7 @@ async def vender_activo(
     - ✅ Cumplimiento de normativa contable
     """
     try:
-        resultado = LoteService.vender_activo(
+        resultado = con_reintentos(db, lambda: LoteService.vender_activo(
             db=db,
             id_usuario=request.id_usuario,
             id_activo=request.id_activo,
@@ -94,13 +122,43 @@ async def vender_activo(
             trm=request.trm,
             url_evidencia=request.url_evidencia,
             notas=request.notas
-        )
+        ))
         return resultado
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
 
+@router.post("/rebalancear", response_model=RebalanceoResponse)
+async def rebalancear_portafolio(
+    request: RebalanceoRequest,
+    db: Session = Depends(get_db),
+    _current_user: Usuario = Depends(require_auth),
+):
+    """
+    **⚖️ Rebalanceo - Canasta de ventas y compras en una transacción**
+    
+    ### Proceso:
+    1. Lee la caja y los lotes abiertos de los activos vendidos una sola vez
+    2. Ejecuta las ventas (FIFO) en orden
+    3. Aplica las compras contra el saldo resultante
+    4. Escribe todo en un único commit (todo o nada)
+    
+    Con `simular: true` retorna los saldos y posiciones resultantes sin escribir nada.
+    """
+    try:
+        return con_reintentos(db, lambda: LoteService.rebalancear(
+            db=db,
+            id_usuario=request.id_usuario,
+            ventas=[venta.model_dump() for venta in request.ventas],
+            compras=[compra.model_dump() for compra in request.compras],
+            simular=request.simular
+        ))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
+
 @router.get("/usuario/{id_usuario}", response_model=List[LoteResponse])
 async def obtener_lotes_usuario(
     id_usuario: UUID,
@@ -142,7 +200,7 @@ async def obtener_lotes_usuario(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/usuario/{id_usuario}/resumen", response_model=List[Dict])
+@router.get("/usuario/{id_usuario}/resumen", response_model=List[ResumenActivoResponse])
 async def obtener_resumen_por_activo(
     id_usuario: UUID,
     db: Session = Depends(get_db),
@@ -2,11 +2,11 @@
 API Endpoints para Portafolio: saldo de caja, valoración y resumen consolidado.
 Requiere autenticación JWT.
 """
-from datetime import date
+from datetime import date, datetime
 from decimal import Decimal
-from typing import List
+from typing import Dict, List
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
 
@@ -14,7 +14,6 @@ from app.database import get_db
 from app.auth import require_auth
 from app.models import (
     CajaAhorros,
-    Lote,
     ValoracionDiaria,
     EstadoLote,
 )
@@ -23,11 +22,43 @@ from app.schemas.valoracion_schemas import (
     SaldoCajaResponse,
     ValoracionResponse,
     ResumenPortafolioResponse,
+    SimulacionMonteCarloRequest,
+    SimulacionMonteCarloResponse,
+    RiesgoPortafolioResponse,
+    PruebaEstresRequest,
+    PruebaEstresResponse,
 )
+from app.services.estres_service import EstresPortafolioService
+from app.services.posicion_service import PosicionService
+from app.services.trm_service import MONEDA_TRM, TRMService
+from app.services.clasificacion_service import ClasificacionService
+from app.services.riesgo_service import RiesgoPortafolioService
+from app.services.simulacion_service import SimulacionMonteCarloService
 
 router = APIRouter()
 
 
+def _valor_mercado_posiciones(db: Session, posiciones: List[Dict], fecha: date) -> Decimal:
+    """
+    Valor de mercado estimado = precio de compra × cantidad disponible × TRM.
+
+    Las posiciones en dólares usan la TRM histórica vigente a `fecha` (o la
+    TRM de cada compra si el histórico no cubre la fecha). El histórico sólo
+    cotiza USD/COP: las demás monedas conservan la tasa registrada en cada lote.
+    """
+    en_dolares = [p["moneda"] == MONEDA_TRM for p in posiciones]
+    trm_fecha = TRMService.trm_en_fecha(db, fecha) if any(en_dolares) else None
+
+    return sum(
+        (
+            p["valor_compra_moneda"] * trm_fecha if trm_fecha is not None and usd
+            else p["valor_compra"]
+            for p, usd in zip(posiciones, en_dolares)
+        ),
+        Decimal("0"),
+    )
+
+
 # ── Saldo Caja de Ahorros ───────────────────────────────────────────
 @router.get("/saldo", response_model=SaldoCajaResponse)
 async def obtener_saldo_caja(
@@ -69,26 +100,19 @@ async def obtener_resumen_portafolio(
     ).first()
     saldo_caja = caja.saldo_actual if caja else Decimal("0")
 
-    lotes = db.query(Lote).filter(
-        and_(
-            Lote.id_usuario == current_user.id_usuario,
-            Lote.cantidad_disponible > 0,
-        )
-    ).all()
+    posiciones = PosicionService.obtener_posiciones(db, current_user.id_usuario)
 
-    inversion_total = sum(l.costo_total for l in lotes)
+    inversion_total = sum((p["costo_total"] for p in posiciones), Decimal("0"))
     # Valor de mercado estimado = último precio de compra × cantidad disponible
     # (aproximación; en producción se usaría precio de mercado real)
-    valor_mercado = sum(
-        l.precio_compra * l.cantidad_disponible * l.trm for l in lotes
-    )
+    valor_mercado = _valor_mercado_posiciones(db, posiciones, date.today())
 
     ganancia = valor_mercado - inversion_total
     rentabilidad = float(
         (ganancia / inversion_total * 100) if inversion_total > 0 else 0
     )
 
-    activos_unicos = len({str(l.id_activo) for l in lotes})
+    activos_unicos = len(posiciones)
 
     return ResumenPortafolioResponse(
         saldo_caja=saldo_caja,
@@ -97,7 +121,7 @@ async def obtener_resumen_portafolio(
         ganancia_perdida=ganancia,
         rentabilidad_porcentaje=round(rentabilidad, 4),
         total_activos_diferentes=activos_unicos,
-        total_lotes_activos=len(lotes),
+        total_lotes_activos=sum(p["numero_lotes"] for p in posiciones),
     )
 
 
@@ -156,17 +180,10 @@ async def generar_snapshot_valoracion(
     ).first()
     saldo = caja.saldo_actual if caja else Decimal("0")
 
-    lotes = db.query(Lote).filter(
-        and_(
-            Lote.id_usuario == current_user.id_usuario,
-            Lote.cantidad_disponible > 0,
-        )
-    ).all()
+    posiciones = PosicionService.obtener_posiciones(db, current_user.id_usuario)
 
-    costo_total = sum(l.costo_total for l in lotes)
-    valor_mercado = sum(
-        l.precio_compra * l.cantidad_disponible * l.trm for l in lotes
-    )
+    costo_total = sum((p["costo_total"] for p in posiciones), Decimal("0"))
+    valor_mercado = _valor_mercado_posiciones(db, posiciones, hoy)
     ganancia = valor_mercado - costo_total
     rentabilidad = (
         (ganancia / costo_total * 100) if costo_total > 0 else Decimal("0")
@@ -178,6 +195,7 @@ async def generar_snapshot_valoracion(
         existente.ganancia_perdida = ganancia
         existente.rentabilidad_porcentaje = rentabilidad
         existente.efectivo_disponible = saldo
+        existente.fecha_calculo = datetime.utcnow()
         db.commit()
         db.refresh(existente)
         v = existente
@@ -195,6 +213,11 @@ async def generar_snapshot_valoracion(
         db.commit()
         db.refresh(v)
 
+    RiesgoPortafolioService.invalidar(current_user.id_usuario)
+    ClasificacionService.registrar_snapshot(
+        current_user, v.fecha_valoracion, v.valor_mercado_total, v.costo_total_invertido
+    )
+
     return ValoracionResponse(
         id_valoracion=str(v.id_valoracion),
         fecha_valoracion=v.fecha_valoracion,
@@ -205,3 +228,84 @@ async def generar_snapshot_valoracion(
         efectivo_disponible=v.efectivo_disponible,
         fecha_calculo=v.fecha_calculo,
     )
+
+
+# ── Simulación Monte Carlo ──────────────────────────────────────────
+@router.post("/simulacion/montecarlo", response_model=SimulacionMonteCarloResponse)
+def simular_portafolio_montecarlo(
+    request: SimulacionMonteCarloRequest,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(require_auth),
+):
+    """
+    Simula trayectorias futuras del valor del portafolio (lotes abiertos).
+
+    - **gbm**: movimiento browniano geométrico por activo, con parámetros
+      por tipo de activo (reemplazables por ticker) y correlación común
+    - **bootstrap**: remuestrea los retornos diarios de las valoraciones guardadas
+
+    Las trayectorias se generan por bloques de memoria acotada con semillas
+    derivadas de `semilla`: el resultado es el mismo con cualquier número de procesos.
+    """
+    try:
+        return SimulacionMonteCarloService.simular_portafolio(
+            db,
+            current_user.id_usuario,
+            trayectorias=request.trayectorias,
+            horizonte_dias=request.horizonte_dias,
+            puntos_banda=request.puntos_banda,
+            metodo=request.metodo,
+            parametros={
+                ticker: p.model_dump(exclude_none=True) for ticker, p in request.parametros.items()
+            },
+            correlacion=request.correlacion,
+            semilla=request.semilla,
+            procesos=request.procesos,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# ── Riesgo histórico ────────────────────────────────────────────────
+@router.get("/riesgo", response_model=RiesgoPortafolioResponse)
+def obtener_riesgo_portafolio(
+    nivel_confianza: float = Query(0.95, ge=0.5, lt=1, description="Nivel de confianza del VaR/CVaR"),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(require_auth),
+):
+    """
+    VaR y CVaR (histórico y paramétrico), volatilidad y máximo drawdown
+    calculados sobre las valoraciones diarias del portafolio.
+
+    El resultado se guarda por usuario hasta que se genera un nuevo snapshot.
+    """
+    try:
+        return RiesgoPortafolioService.obtener_riesgo(db, current_user.id_usuario, nivel_confianza)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# ── Pruebas de estrés ───────────────────────────────────────────────
+@router.post("/estres", response_model=PruebaEstresResponse)
+def ejecutar_prueba_estres(
+    request: PruebaEstresRequest,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(require_auth),
+):
+    """
+    Aplica escenarios de choque (TRM, tasas en pb, acciones y por ticker)
+    a las posiciones abiertas y retorna el P&L por escenario y por activo.
+
+    Los bonos se revaloran con su TIR base más el choque de tasas; los
+    activos en moneda extranjera reciben además el choque de TRM.
+    """
+    try:
+        return EstresPortafolioService.ejecutar_escenarios(
+            db,
+            current_user.id_usuario,
+            escenarios=[e.model_dump() for e in request.escenarios],
+            fecha_valoracion=request.fecha_valoracion,
+            tirs_base=request.tirs_base,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -101,3 +101,15 @@ async def require_auth(
     if usuario is None:
         raise credentials_exception
     return usuario
+
+
+async def require_admin(
+    usuario: Usuario = Depends(require_auth),
+) -> Usuario:
+    """Requiere un usuario Administrador (email en ADMIN_EMAILS). Lanza 403 si no lo es."""
+    if usuario.email.lower() not in settings.ADMIN_EMAILS:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Se requieren permisos de administrador",
+        )
+    return usuario
@@ -1,8 +1,11 @@
 """
 Configuración de la aplicación
 """
-from pydantic_settings import BaseSettings
-from typing import List
+import json
+
+from pydantic import field_validator
+from pydantic_settings import BaseSettings, NoDecode
+from typing import Annotated, List
 
 class Settings(BaseSettings):
     # Base de datos
@@ -13,6 +16,9 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
+    # Correos con permisos de Administrador (JSON o separados por comas)
+    ADMIN_EMAILS: Annotated[List[str], NoDecode] = []
+    
     # Aplicación
     APP_NAME: str = "Simulador de Inversiones"
     APP_VERSION: str = "1.0.0"
@@ -26,6 +32,46 @@ class Settings(BaseSettings):
     DEFAULT_COMISION_COMPRA: float = 0.01
     DEFAULT_COMISION_VENTA: float = 0.01
     
+    # Caché de parametros_sistema (segundos entre verificaciones de versión)
+    PARAMETROS_CACHE_SEGUNDOS: float = 30
+    
+    # Caché del histórico de TRM (segundos entre verificaciones de versión)
+    TRM_CACHE_SEGUNDOS: float = 30
+    
+    # Caché de curvas de rendimiento (segundos entre verificaciones de versión)
+    CURVA_CACHE_SEGUNDOS: float = 30
+    
+    # Caché de métricas de riesgo (segundos entre verificaciones de versión)
+    RIESGO_CACHE_SEGUNDOS: float = 30
+    
+    # Clasificación del curso (segundos entre recargas completas del ranking)
+    CLASIFICACION_CACHE_SEGUNDOS: float = 300
+    
+    # Transacciones de compra/venta: reintentos ante serialización o deadlock
+    TRANSACCION_REINTENTOS: int = 5
+    TRANSACCION_ESPERA_BASE_SEGUNDOS: float = 0.02
+    
+    # Memoización de cálculos puros (/api/calculos/*)
+    CACHE_CALCULOS_HABILITADA: bool = False
+    CACHE_CALCULOS_TAMANO: int = 1024
+    CACHE_CALCULOS_TTL_SEGUNDOS: float = 300
+    
+    # Historial de cálculos de bonos (write-behind)
+    HISTORIAL_WRITE_BEHIND_HABILITADO: bool = True
+    HISTORIAL_LOTE_TAMANO: int = 200
+    HISTORIAL_INTERVALO_SEGUNDOS: float = 2.0
+    HISTORIAL_MAX_PENDIENTES: int = 10000
+    HISTORIAL_MAX_INTENTOS: int = 3
+    
+    @field_validator("ADMIN_EMAILS", mode="before")
+    @classmethod
+    def _separar_admin_emails(cls, valor):
+        """Acepta una lista JSON o correos separados por comas; normaliza a minúsculas"""
+        if isinstance(valor, str):
+            valor = valor.strip()
+            valor = json.loads(valor) if valor.startswith("[") else valor.split(",")
+        return [email.strip().lower() for email in valor if email.strip()]
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -1,10 +1,21 @@
 """
 Configuración de la conexión a la base de datos PostgreSQL
 """
+import random
+import time
+from typing import Callable, Optional, TypeVar
+
 from sqlalchemy import create_engine
-from sqlalchemy.orm import DeclarativeBase, sessionmaker
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
 from app.config import settings
 
+T = TypeVar("T")
+
+# SQLSTATE que se resuelven repitiendo la transacción completa:
+# fallo de serialización, deadlock detectado, lock no disponible (lock_timeout)
+CODIGOS_REINTENTABLES = frozenset({"40001", "40P01", "55P03"})
+
 # Motor de base de datos
 engine = create_engine(
     settings.DATABASE_URL,
@@ -27,3 +38,44 @@ def get_db():
         yield db
     finally:
         db.close()
+
+def es_error_reintentable(error: Exception) -> bool:
+    """True si el error de la BD se corrige repitiendo la transacción"""
+    if not isinstance(error, DBAPIError):
+        return False
+    original = error.orig
+    codigo = getattr(original, "pgcode", None) or getattr(original, "sqlstate", None)
+    if codigo in CODIGOS_REINTENTABLES:
+        return True
+    # SQLite: escritor concurrente con la BD bloqueada
+    return "database is locked" in str(original)
+
+def con_reintentos(
+    db: Session,
+    operacion: Callable[[], T],
+    intentos: Optional[int] = None,
+    espera_base: Optional[float] = None
+) -> T:
+    """
+    Ejecuta una transacción y la repite ante fallos de serialización o deadlocks
+
+    Ante cualquier error se hace rollback (libera los locks tomados con
+    SELECT ... FOR UPDATE). Los errores reintentables se repiten con espera
+    exponencial con jitter; el resto se propaga de inmediato.
+
+    Args:
+        db: Sesión usada por la operación
+        operacion: Función sin argumentos que hace el trabajo y el commit
+        intentos: Intentos totales (default: TRANSACCION_REINTENTOS)
+        espera_base: Espera del primer reintento en segundos
+    """
+    intentos = intentos or settings.TRANSACCION_REINTENTOS
+    espera_base = settings.TRANSACCION_ESPERA_BASE_SEGUNDOS if espera_base is None else espera_base
+    for intento in range(1, intentos + 1):
+        try:
+            return operacion()
+        except Exception as error:
+            db.rollback()
+            if intento == intentos or not es_error_reintentable(error):
+                raise
+            time.sleep(espera_base * (2 ** (intento - 1)) * random.uniform(0.5, 1.5))
@@ -1,6 +1,8 @@
 """
 Aplicación Principal FastAPI - Simulador de Inversiones
 """
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
@@ -13,7 +15,23 @@ from app.config import settings
 limiter = Limiter(key_func=get_remote_address)
 
 # Importar routers
-from app.api import lotes, calculos, auth, activos, transacciones, portafolio
+from app.api import lotes, calculos, auth, activos, transacciones, portafolio, admin
+from app.database import SessionLocal
+from app.services.historial_calculos_service import HistorialCalculosService
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Arranca el write-behind del historial y lo vacía al apagar
+
+    Usa `app.state.fabrica_sesiones` (SessionLocal por defecto); los tests lo
+    reemplazan para no escribir en la BD real desde el hilo de vaciado.
+    """
+    HistorialCalculosService.iniciar(app.state.fabrica_sesiones)
+    yield
+    HistorialCalculosService.detener()
+
 
 app = FastAPI(
     title=settings.APP_NAME,
@@ -43,9 +61,13 @@ app = FastAPI(
     - Nota = (Rendimiento Real / Meta Admin) × 5.0
     """,
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
+# Sesiones del hilo de vaciado del historial (ver lifespan)
+app.state.fabrica_sesiones = SessionLocal
+
 # Registrar rate limiter
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
@@ -90,3 +112,4 @@ app.include_router(calculos.router, prefix="/api/calculos", tags=["Cálculos Fin
 app.include_router(activos.router, prefix="/api/activos", tags=["Activos Financieros"])
 app.include_router(transacciones.router, prefix="/api/transacciones", tags=["Historial de Transacciones"])
 app.include_router(portafolio.router, prefix="/api/portafolio", tags=["Portafolio e Inversiones"])
+app.include_router(admin.router, prefix="/api/admin", tags=["Administración"])
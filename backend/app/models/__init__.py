@@ -9,6 +9,9 @@ from .caja import CajaAhorros
 from .parametro import ParametroSistema
 from .calculo_bono import CalculoBono
 from .valoracion import ValoracionDiaria
+from .curva import PuntoCurva
+from .trm import HistoricoTRM
+from .posicion import Posicion
 
 __all__ = [
     'Usuario',
@@ -21,5 +24,8 @@ __all__ = [
     'CajaAhorros',
     'ParametroSistema',
     'CalculoBono',
-    'ValoracionDiaria'
+    'ValoracionDiaria',
+    'PuntoCurva',
+    'HistoricoTRM',
+    'Posicion'
 ]
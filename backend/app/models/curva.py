@@ -0,0 +1,26 @@
+"""
+Modelo de Curva de Rendimientos
+"""
+from sqlalchemy import Column, Integer, String, DECIMAL, Date, DateTime, UniqueConstraint
+from datetime import datetime
+
+from app.database import Base
+
+class PuntoCurva(Base):
+    __tablename__ = "curvas_rendimiento"
+    
+    id_punto = Column(Integer, primary_key=True, autoincrement=True)
+    nombre_curva = Column(String(50), nullable=False)  # Ej: 'TES_COP'
+    fecha_curva = Column(Date, nullable=False)
+    
+    plazo_anios = Column(DECIMAL(8, 4), nullable=False)
+    tasa_par = Column(DECIMAL(10, 6), nullable=False)  # Rendimiento par (%)
+    
+    fecha_registro = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        UniqueConstraint('nombre_curva', 'fecha_curva', 'plazo_anios', name='punto_curva_unico'),
+    )
+    
+    def __repr__(self):
+        return f"<PuntoCurva(curva={self.nombre_curva}, fecha={self.fecha_curva}, plazo={self.plazo_anios}, tasa={self.tasa_par})>"
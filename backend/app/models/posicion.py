@@ -0,0 +1,31 @@
+"""
+Modelo de Posiciones (agregado de lotes por usuario y activo)
+"""
+from sqlalchemy import Column, Integer, DECIMAL, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
+
+from app.database import Base
+
+class Posicion(Base):
+    __tablename__ = "posiciones"
+    
+    id_usuario = Column(UUID(as_uuid=True), ForeignKey('usuarios.id_usuario', ondelete='CASCADE'), primary_key=True)
+    id_activo = Column(UUID(as_uuid=True), ForeignKey('activos.id_activo'), primary_key=True)
+    
+    # Lotes abiertos (cantidad_disponible > 0)
+    cantidad_total = Column(DECIMAL(18, 6), nullable=False, default=0)
+    costo_total = Column(DECIMAL(18, 2), nullable=False, default=0)          # Σ costo_total
+    valor_compra = Column(DECIMAL(24, 6), nullable=False, default=0)         # Σ precio × disponible × TRM
+    valor_compra_moneda = Column(DECIMAL(24, 6), nullable=False, default=0)  # Σ precio × disponible
+    numero_lotes = Column(Integer, nullable=False, default=0)
+    
+    # Semáforo de todos los lotes del activo
+    lotes_verdes = Column(Integer, nullable=False, default=0)
+    lotes_amarillos = Column(Integer, nullable=False, default=0)
+    lotes_rojos = Column(Integer, nullable=False, default=0)
+    
+    fecha_actualizacion = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<Posicion(activo={self.id_activo}, cantidad={self.cantidad_total}, lotes={self.numero_lotes})>"
@@ -0,0 +1,19 @@
+"""
+Modelo del Histórico de la TRM
+"""
+from sqlalchemy import Column, String, DECIMAL, Date, DateTime
+from datetime import datetime
+
+from app.database import Base
+
+class HistoricoTRM(Base):
+    __tablename__ = "historico_trm"
+    
+    fecha = Column(Date, primary_key=True)
+    valor = Column(DECIMAL(12, 6), nullable=False)  # COP por USD
+    fuente = Column(String(50))  # Ej: 'BANREP'
+    
+    fecha_actualizacion = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<HistoricoTRM(fecha={self.fecha}, valor={self.valor})>"
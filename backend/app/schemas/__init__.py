@@ -4,7 +4,9 @@ Inicialización de schemas
 from .lote_schemas import LoteCompraRequest, LoteVentaRequest, LoteResponse, EstadisticasLotesResponse
 from .calculo_schemas import (
     CalculoBonoRequest, CalculoBonoResponse,
+    CalculoBonoLoteRequest, CalculoBonoLoteResponse,
     CalculoCDTRequest, CalculoCDTResponse,
+    CronogramaLiquidacionCDTRequest, CronogramaLiquidacionCDTResponse,
     ConversionDivisaRequest, ConversionDivisaResponse,
     CalificacionRequest, CalificacionResponse
 )
@@ -12,7 +14,9 @@ from .calculo_schemas import (
 __all__ = [
     'LoteCompraRequest', 'LoteVentaRequest', 'LoteResponse', 'EstadisticasLotesResponse',
     'CalculoBonoRequest', 'CalculoBonoResponse',
+    'CalculoBonoLoteRequest', 'CalculoBonoLoteResponse',
     'CalculoCDTRequest', 'CalculoCDTResponse',
+    'CronogramaLiquidacionCDTRequest', 'CronogramaLiquidacionCDTResponse',
     'ConversionDivisaRequest', 'ConversionDivisaResponse',
     'CalificacionRequest', 'CalificacionResponse'
 ]
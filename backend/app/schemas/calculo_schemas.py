@@ -4,7 +4,7 @@ Schemas Pydantic para Cálculos Financieros
 from pydantic import BaseModel, Field, UUID4
 from decimal import Decimal
 from datetime import date
-from typing import Optional
+from typing import Annotated, Optional, List, Literal
 
 class CalculoBonoRequest(BaseModel):
     """Request para calcular valoración de bono"""
@@ -15,6 +15,9 @@ class CalculoBonoRequest(BaseModel):
     fecha_emision: date = Field(..., description="Fecha de emisión del bono")
     fecha_vencimiento: date = Field(..., description="Fecha de vencimiento del bono")
     fecha_valoracion: Optional[date] = Field(None, description="Fecha de valoración (default: hoy)")
+    modo_precision: Literal['exacto', 'rapido'] = Field(
+        default='exacto', description="'exacto' (Decimal) o 'rapido' (float64, para tamizaje)"
+    )
     
     class Config:
         json_schema_extra = {
@@ -37,15 +40,299 @@ class CalculoBonoResponse(BaseModel):
     cupon_periodo: Decimal
     num_periodos: int
     dias_desde_ultimo_cupon: int
-    tir_utilizada: Decimal
+    fecha_ultimo_cupon: Optional[date] = None
+    fecha_proximo_cupon: Optional[date] = None
+    tir_utilizada: Optional[Decimal] = None
     fecha_valoracion: date
 
+class PuntoCurvaItem(BaseModel):
+    """Punto de la curva de rendimientos par"""
+    plazo_anios: Decimal = Field(..., gt=0, le=100, description="Plazo en años")
+    tasa_par: Decimal = Field(..., gt=-5, le=100, description="Rendimiento par (%)")
+
+class CurvaRendimientoRequest(BaseModel):
+    """Request para registrar (o reemplazar) una curva de rendimientos"""
+    nombre_curva: str = Field(..., min_length=1, max_length=50, description="Nombre de la curva (ej: TES_COP)")
+    fecha_curva: date = Field(..., description="Fecha de la curva")
+    puntos: List[PuntoCurvaItem] = Field(..., min_length=1, max_length=200, description="Rendimientos par por plazo")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "nombre_curva": "TES_COP",
+                "fecha_curva": "2026-02-06",
+                "puntos": [
+                    {"plazo_anios": 1, "tasa_par": 9.1},
+                    {"plazo_anios": 2, "tasa_par": 9.4},
+                    {"plazo_anios": 5, "tasa_par": 10.2},
+                    {"plazo_anios": 10, "tasa_par": 11.0}
+                ]
+            }
+        }
+
+class PuntoCurvaResultado(BaseModel):
+    """Punto de la curva construida"""
+    plazo_anios: float
+    tasa_par: float
+    tasa_cero: float
+    factor_descuento: float
+
+class CurvaRendimientoResponse(BaseModel):
+    """Response con la curva cero cupón construida"""
+    nombre_curva: str
+    fecha_curva: date
+    puntos: List[PuntoCurvaResultado]
+
+class CalculoBonoCurvaRequest(BaseModel):
+    """Request para valorar un bono con una curva de rendimientos registrada"""
+    valor_nominal: Decimal = Field(..., gt=0, description="Valor nominal del bono")
+    tasa_cupon: Decimal = Field(..., gt=0, le=100, description="Tasa de cupón anual (%)")
+    frecuencia_cupon: int = Field(..., ge=1, le=12, description="Pagos al año (1, 2, 4)")
+    fecha_emision: date = Field(..., description="Fecha de emisión del bono")
+    fecha_vencimiento: date = Field(..., description="Fecha de vencimiento del bono")
+    fecha_valoracion: Optional[date] = Field(None, description="Fecha de valoración (default: hoy)")
+    nombre_curva: str = Field(..., min_length=1, max_length=50, description="Nombre de la curva")
+    fecha_curva: Optional[date] = Field(None, description="Fecha de la curva (default: fecha de valoración)")
+    calcular_tir_equivalente: bool = Field(default=False, description="Reportar la TIR plana equivalente (resuelve la TIR)")
+
+class BonoLoteItem(BaseModel):
+    """Parámetros de un bono dentro de una valoración por lote"""
+    identificador: Optional[str] = Field(None, max_length=50, description="Ticker o etiqueta del bono")
+    valor_nominal: Decimal = Field(..., gt=0, description="Valor nominal del bono")
+    tasa_cupon: Decimal = Field(..., gt=0, le=100, description="Tasa de cupón anual (%)")
+    frecuencia_cupon: int = Field(..., ge=1, le=12, description="Pagos al año (1, 2, 4)")
+    fecha_emision: date = Field(..., description="Fecha de emisión del bono")
+    fecha_vencimiento: date = Field(..., description="Fecha de vencimiento del bono")
+
+class CalculoBonoLoteRequest(BaseModel):
+    """Request para valorar una matriz de bonos × TIR"""
+    bonos: List[BonoLoteItem] = Field(..., min_length=1, max_length=5000, description="Bonos a valorar")
+    tirs: List[Annotated[Decimal, Field(gt=0, le=100)]] = Field(
+        ..., min_length=1, max_length=500, description="TIRs anuales (%)"
+    )
+    fecha_valoracion: Optional[date] = Field(None, description="Fecha de valoración (default: hoy)")
+    verificar_exacto: bool = Field(default=False, description="Re-verificar cada celda con el motor Decimal")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "bonos": [{
+                    "identificador": "TES2030",
+                    "valor_nominal": 1000000,
+                    "tasa_cupon": 7.25,
+                    "frecuencia_cupon": 2,
+                    "fecha_emision": "2024-01-01",
+                    "fecha_vencimiento": "2030-01-01"
+                }],
+                "tirs": [7.5, 8.0, 8.5, 9.0],
+                "fecha_valoracion": "2026-02-06"
+            }
+        }
+
+class CalculoBonoCurvaLoteRequest(BaseModel):
+    """Request para valorar muchos bonos con una curva de rendimientos registrada"""
+    bonos: List[BonoLoteItem] = Field(..., min_length=1, max_length=10000, description="Bonos a valorar")
+    fecha_valoracion: Optional[date] = Field(None, description="Fecha de valoración (default: hoy)")
+    nombre_curva: str = Field(..., min_length=1, max_length=50, description="Nombre de la curva")
+    fecha_curva: Optional[date] = Field(None, description="Fecha de la curva (default: fecha de valoración)")
+
+class BonoCurvaLoteResultado(BaseModel):
+    """Precio de un bono del lote descontado con la curva"""
+    indice: int
+    identificador: Optional[str] = None
+    num_periodos: Optional[int] = None
+    precio_limpio: Optional[float] = None
+    cupon_acumulado: Optional[float] = None
+    precio_sucio: Optional[float] = None
+    error: Optional[str] = None
+
+class CalculoBonoCurvaLoteResponse(BaseModel):
+    """Response con los precios del lote contra la curva"""
+    fecha_valoracion: date
+    total_bonos: int
+    resultados: List[BonoCurvaLoteResultado]
+
+class BonoLoteResultado(BaseModel):
+    """Precios de un bono para cada TIR solicitada"""
+    indice: int
+    identificador: Optional[str] = None
+    num_periodos: int
+    dias_desde_ultimo_cupon: int
+    cupon_acumulado: Optional[float] = None
+    precios_limpios: Optional[List[float]] = None
+    precios_sucios: Optional[List[float]] = None
+    error: Optional[str] = None
+
+class CalculoBonoLoteResponse(BaseModel):
+    """Response con la matriz de precios bonos × TIR"""
+    fecha_valoracion: date
+    tirs: List[float]
+    total_bonos: int
+    total_precios: int
+    resultados: List[BonoLoteResultado]
+    diferencia_maxima_exacto: Optional[float] = None
+
+class TirImplicitaItem(BonoLoteItem):
+    """Bono con su precio de mercado observado"""
+    precio_mercado: Decimal = Field(..., gt=0, description="Precio observado en el mercado")
+    tipo_precio: Literal["sucio", "limpio"] = Field(default="sucio", description="Si el precio incluye cupón acumulado")
+
+class TirImplicitaRequest(TirImplicitaItem):
+    """Request para calcular la TIR implícita de un bono"""
+    fecha_valoracion: Optional[date] = Field(None, description="Fecha de valoración (default: hoy)")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "valor_nominal": 1000000,
+                "tasa_cupon": 7.25,
+                "frecuencia_cupon": 2,
+                "fecha_emision": "2024-01-01",
+                "fecha_vencimiento": "2030-01-01",
+                "fecha_valoracion": "2026-02-06",
+                "precio_mercado": 969981.98,
+                "tipo_precio": "sucio"
+            }
+        }
+
+class TirImplicitaResponse(CalculoBonoResponse):
+    """Response con la TIR implícita y la valoración a esa TIR"""
+    tir_implicita: Decimal
+    precio_mercado: Decimal
+    tipo_precio: str
+    iteraciones: int
+
+class TirImplicitaLoteRequest(BaseModel):
+    """Request para calcular la TIR implícita de muchos bonos"""
+    bonos: List[TirImplicitaItem] = Field(..., min_length=1, max_length=10000, description="Bonos con precio de mercado")
+    fecha_valoracion: Optional[date] = Field(None, description="Fecha de valoración (default: hoy)")
+
+class TirImplicitaLoteResultado(BaseModel):
+    """TIR implícita de un bono del lote"""
+    indice: int
+    identificador: Optional[str] = None
+    tir: Optional[float] = None
+    precio_objetivo_limpio: Optional[float] = None
+    cupon_acumulado: Optional[float] = None
+    iteraciones: int
+    convergio: bool
+    error: Optional[str] = None
+
+class TirImplicitaLoteResponse(BaseModel):
+    """Response con las TIR implícitas del lote"""
+    fecha_valoracion: date
+    total_bonos: int
+    total_convergidos: int
+    iteraciones_maximas: int
+    resultados: List[TirImplicitaLoteResultado]
+
+class AnaliticaBonoResponse(BaseModel):
+    """Response con precio y medidas de riesgo de un bono"""
+    tir_utilizada: float
+    num_periodos: int
+    precio_limpio: float
+    cupon_acumulado: float
+    precio_sucio: float
+    duracion_macaulay: float
+    duracion_modificada: float
+    convexidad: float
+    dv01: float
+    fecha_valoracion: date
+
+class AnaliticaBonoItem(BonoLoteItem):
+    """Bono con la TIR a la que se calculan sus sensibilidades"""
+    tir: Decimal = Field(..., gt=0, le=100, description="Tasa Interna de Retorno (%)")
+
+class AnaliticaBonoLoteRequest(BaseModel):
+    """Request para calcular la analítica de riesgo de muchos bonos"""
+    bonos: List[AnaliticaBonoItem] = Field(..., min_length=1, max_length=10000, description="Bonos con su TIR")
+    fecha_valoracion: Optional[date] = Field(None, description="Fecha de valoración (default: hoy)")
+
+class AnaliticaBonoLoteResultado(BaseModel):
+    """Analítica de riesgo de un bono del lote"""
+    indice: int
+    identificador: Optional[str] = None
+    tir_utilizada: Optional[float] = None
+    num_periodos: Optional[int] = None
+    precio_limpio: Optional[float] = None
+    cupon_acumulado: Optional[float] = None
+    precio_sucio: Optional[float] = None
+    duracion_macaulay: Optional[float] = None
+    duracion_modificada: Optional[float] = None
+    convexidad: Optional[float] = None
+    dv01: Optional[float] = None
+    error: Optional[str] = None
+
+class AnaliticaBonoLoteResponse(BaseModel):
+    """Response con la analítica de riesgo del lote"""
+    fecha_valoracion: date
+    total_bonos: int
+    resultados: List[AnaliticaBonoLoteResultado]
+
+class CurvaPrecioTirRequest(BaseModel):
+    """Request para generar la curva precio/TIR de un bono"""
+    valor_nominal: Decimal = Field(..., gt=0, description="Valor nominal del bono")
+    tasa_cupon: Decimal = Field(..., gt=0, le=100, description="Tasa de cupón anual (%)")
+    frecuencia_cupon: int = Field(..., ge=1, le=12, description="Pagos al año (1, 2, 4)")
+    fecha_emision: date = Field(..., description="Fecha de emisión del bono")
+    fecha_vencimiento: date = Field(..., description="Fecha de vencimiento del bono")
+    fecha_valoracion: Optional[date] = Field(None, description="Fecha de valoración (default: hoy)")
+    tir_minima: Decimal = Field(..., ge=0, le=100, description="TIR inicial del rango (%)")
+    tir_maxima: Decimal = Field(..., gt=0, le=100, description="TIR final del rango (%)")
+    paso: Decimal = Field(..., gt=0, description="Incremento entre puntos (%)")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "valor_nominal": 1000000,
+                "tasa_cupon": 7.25,
+                "frecuencia_cupon": 2,
+                "fecha_emision": "2024-01-01",
+                "fecha_vencimiento": "2030-01-01",
+                "fecha_valoracion": "2026-02-06",
+                "tir_minima": 4,
+                "tir_maxima": 14,
+                "paso": 0.25
+            }
+        }
+
+class PuntoCurvaPrecioTir(BaseModel):
+    """Punto de la curva precio/TIR"""
+    tir: float
+    precio_limpio: float
+    precio_sucio: float
+    duracion_modificada: float
+
+class CurvaPrecioTirResponse(BaseModel):
+    """Response con la curva precio/TIR"""
+    fecha_valoracion: date
+    num_periodos: int
+    cupon_acumulado: float
+    total_puntos: int
+    puntos: List[PuntoCurvaPrecioTir]
+
 class CalculoBonoActivoRequest(BaseModel):
     """Request para calcular bono desde activo existente"""
     id_activo: UUID4 = Field(..., description="UUID del activo (bono)")
     tir: Decimal = Field(..., gt=0, le=100, description="TIR deseada (%)")
     fecha_valoracion: Optional[date] = Field(None, description="Fecha de valoración")
 
+class ValoracionMasivaRequest(BaseModel):
+    """Request para valorar todo el universo de bonos del catálogo"""
+    fecha_valoracion: Optional[date] = Field(None, description="Fecha de valoración (default: hoy)")
+    tir: Optional[Decimal] = Field(None, gt=0, le=100, description="TIR común (%); por defecto la tasa cupón de cada bono")
+    procesos: Optional[int] = Field(None, ge=1, le=64, description="Procesos del pool (default: núcleos disponibles)")
+
+class ValoracionMasivaResponse(BaseModel):
+    """Response con el reporte de la valoración masiva"""
+    fecha_valoracion: date
+    total_bonos: int
+    valorados: int
+    errores: List[dict]
+    procesos: int
+    tiempos_segundos: dict
+    bonos_por_segundo: Optional[float] = None
+
 class CalculoCDTRequest(BaseModel):
     """Request para calcular liquidación de CDT"""
     capital_invertido: Decimal = Field(..., gt=0, description="Capital inicial invertido")
@@ -53,6 +340,9 @@ class CalculoCDTRequest(BaseModel):
     fecha_inicio: date = Field(..., description="Fecha de apertura del CDT")
     fecha_liquidacion: date = Field(..., description="Fecha de liquidación")
     plazo_dias_original: int = Field(..., gt=0, description="Plazo original en días")
+    modo_precision: Literal['exacto', 'rapido'] = Field(
+        default='exacto', description="'exacto' (Decimal) o 'rapido' (float64, para tamizaje)"
+    )
     
     class Config:
         json_schema_extra = {
@@ -81,11 +371,54 @@ class CalculoCDTResponse(BaseModel):
     fecha_inicio: date
     fecha_liquidacion: date
 
+class CronogramaLiquidacionCDTRequest(BaseModel):
+    """Request para calcular la liquidación del CDT en cada día del plazo"""
+    capital_invertido: Decimal = Field(..., gt=0, description="Capital inicial invertido")
+    tasa_interes_anual: Decimal = Field(..., gt=0, le=100, description="Tasa de interés anual (%)")
+    fecha_inicio: date = Field(..., description="Fecha de apertura del CDT")
+    plazo_dias_original: int = Field(..., gt=0, le=3660, description="Plazo original en días")
+    paso_dias: int = Field(default=1, ge=1, description="Intervalo entre días evaluados")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "capital_invertido": 10000000,
+                "tasa_interes_anual": 12.5,
+                "fecha_inicio": "2025-11-01",
+                "plazo_dias_original": 180,
+                "paso_dias": 15
+            }
+        }
+
+class LiquidacionCDTDia(BaseModel):
+    """Liquidación del CDT en un día del plazo"""
+    dias_transcurridos: int
+    fecha_liquidacion: date
+    tramo_penalizacion: str
+    penalizacion_porcentaje: float
+    interes_bruto: float
+    penalizacion_monto: float
+    interes_neto: float
+    monto_total_recibir: float
+    tasa_efectiva_anual: float
+
+class CronogramaLiquidacionCDTResponse(BaseModel):
+    """Response con la liquidación del CDT día a día y el día óptimo"""
+    capital_invertido: Decimal
+    tasa_interes_anual: Decimal
+    fecha_inicio: date
+    plazo_original: int
+    paso_dias: int
+    total_dias_evaluados: int
+    dia_optimo: LiquidacionCDTDia
+    cronograma: List[LiquidacionCDTDia]
+
 class ConversionDivisaRequest(BaseModel):
     """Request para conversión de divisa"""
     cantidad: Decimal = Field(..., gt=0, description="Cantidad de activos")
     precio_unitario: Decimal = Field(..., gt=0, description="Precio en moneda extranjera")
-    trm: Decimal = Field(..., gt=0, description="Tasa de cambio")
+    trm: Optional[Decimal] = Field(None, gt=0, description="Tasa de cambio (default: TRM histórica a fecha_trm)")
+    fecha_trm: Optional[date] = Field(None, description="Fecha de la TRM histórica si no se envía trm (default: hoy)")
     comision: Decimal = Field(default=Decimal('0'), ge=0, description="Comisión")
     
     class Config:
@@ -109,6 +442,39 @@ class ConversionDivisaResponse(BaseModel):
     costo_total: Decimal
     precio_unitario_local: Decimal
 
+class RegistroTRM(BaseModel):
+    """TRM de una fecha"""
+    fecha: date
+    valor: Decimal = Field(..., gt=0, description="COP por USD")
+
+class CargaTRMRequest(BaseModel):
+    """Request para la carga masiva del histórico de TRM"""
+    registros: List[RegistroTRM] = Field(..., min_length=1, max_length=20000)
+    fuente: Optional[str] = Field(None, max_length=50, description="Origen de los datos (ej: BANREP)")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "registros": [
+                    {"fecha": "2026-02-05", "valor": 4180.35},
+                    {"fecha": "2026-02-06", "valor": 4172.10}
+                ],
+                "fuente": "BANREP"
+            }
+        }
+
+class CargaTRMResponse(BaseModel):
+    """Response de la carga masiva de TRM"""
+    cargados: int
+    reemplazados: int
+    fecha_inicio: date
+    fecha_fin: date
+
+class ConsultaTRMResponse(BaseModel):
+    """TRM vigente a una fecha (None si es anterior al histórico)"""
+    fecha: date
+    trm: Optional[Decimal] = None
+
 class CalificacionRequest(BaseModel):
     """Request para calcular calificación"""
     rendimiento_real: Decimal = Field(..., description="Rendimiento obtenido (0.15 = 15%)")
@@ -121,3 +487,22 @@ class CalificacionResponse(BaseModel):
     nota: float
     calificacion: str
     superó_meta: bool
+
+class PosicionClasificacion(BaseModel):
+    """Posición de un usuario en la clasificación del curso"""
+    posicion: int
+    id_usuario: str
+    nombre: str
+    email: str
+    fecha_valoracion: date
+    rendimiento: float  # %
+    nota: float
+    calificacion: str
+    supero_meta: bool
+
+class ClasificacionResponse(BaseModel):
+    """Response con la clasificación del curso"""
+    meta_rendimiento: float  # %
+    total_usuarios: int
+    desde_cache: bool
+    posiciones: List[PosicionClasificacion]
@@ -4,7 +4,7 @@ Schemas Pydantic para Lotes
 from pydantic import BaseModel, Field, UUID4
 from decimal import Decimal
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 class LoteCompraRequest(BaseModel):
     """Request para comprar un activo (crear lote)"""
@@ -31,6 +31,53 @@ class LoteCompraRequest(BaseModel):
             }
         }
 
+class CompraLoteItem(BaseModel):
+    """Una compra dentro de una compra masiva"""
+    id_activo: UUID4 = Field(..., description="UUID del activo a comprar")
+    cantidad: Decimal = Field(..., gt=0, description="Cantidad de activos a comprar")
+    precio_compra: Decimal = Field(..., gt=0, description="Precio unitario de compra")
+    comision: Decimal = Field(default=Decimal('0'), ge=0, description="Comisión de la operación")
+    trm: Decimal = Field(default=Decimal('1'), gt=0, description="Tasa de cambio (para activos extranjeros)")
+    url_evidencia: Optional[str] = Field(None, description="URL de screenshot del precio")
+    notas: Optional[str] = Field(None, description="Notas adicionales")
+
+class CompraLoteRequest(BaseModel):
+    """Request para ejecutar muchas compras en una sola transacción"""
+    id_usuario: UUID4 = Field(..., description="UUID del usuario")
+    compras: List[CompraLoteItem] = Field(..., min_length=1, max_length=1000, description="Compras a ejecutar")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "id_usuario": "550e8400-e29b-41d4-a716-446655440000",
+                "compras": [
+                    {"id_activo": "660e8400-e29b-41d4-a716-446655440000", "cantidad": 100, "precio_compra": 25000},
+                    {"id_activo": "770e8400-e29b-41d4-a716-446655440000", "cantidad": 10, "precio_compra": 180,
+                     "trm": 4000, "comision": 5000}
+                ]
+            }
+        }
+
+class CompraLoteResultado(BaseModel):
+    """Resultado de una compra de la compra masiva"""
+    indice: int
+    id_activo: UUID4
+    id_lote: Optional[UUID4] = None          # None en simulación
+    id_transaccion: Optional[UUID4] = None
+    cantidad: Decimal
+    costo_total: Decimal
+    saldo_caja_antes: Decimal
+    saldo_caja_despues: Decimal
+
+class CompraLoteResponse(BaseModel):
+    """Response de la compra masiva"""
+    total_compras: int
+    costo_total: Decimal
+    saldo_anterior: Decimal
+    saldo_nuevo: Decimal
+    resultados: List[CompraLoteResultado]
+    mensaje: str
+
 class LoteVentaRequest(BaseModel):
     """Request para vender un activo (desde lotes)"""
     id_usuario: UUID4 = Field(..., description="UUID del usuario")
@@ -54,6 +101,71 @@ class LoteVentaRequest(BaseModel):
             }
         }
 
+class VentaOrdenItem(BaseModel):
+    """Una venta dentro de una canasta de rebalanceo"""
+    id_activo: UUID4 = Field(..., description="UUID del activo a vender")
+    cantidad: Decimal = Field(..., gt=0, description="Cantidad a vender")
+    precio_venta: Decimal = Field(..., gt=0, description="Precio unitario de venta")
+    comision: Decimal = Field(default=Decimal('0'), ge=0, description="Comisión de la operación")
+    trm: Decimal = Field(default=Decimal('1'), gt=0, description="Tasa de cambio")
+    url_evidencia: Optional[str] = Field(None, description="URL de evidencia")
+    notas: Optional[str] = Field(None, description="Notas adicionales")
+
+class RebalanceoRequest(BaseModel):
+    """Request para ejecutar (o simular) una canasta de ventas y compras"""
+    id_usuario: UUID4 = Field(..., description="UUID del usuario")
+    ventas: List[VentaOrdenItem] = Field(default_factory=list, max_length=1000, description="Ventas (se ejecutan primero, FIFO)")
+    compras: List[CompraLoteItem] = Field(default_factory=list, max_length=1000, description="Compras con el saldo resultante")
+    simular: bool = Field(default=False, description="Calcular el resultado sin escribir nada (dry-run)")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "id_usuario": "550e8400-e29b-41d4-a716-446655440000",
+                "ventas": [
+                    {"id_activo": "660e8400-e29b-41d4-a716-446655440000", "cantidad": 50, "precio_venta": 27000}
+                ],
+                "compras": [
+                    {"id_activo": "770e8400-e29b-41d4-a716-446655440000", "cantidad": 100, "precio_compra": 12000}
+                ],
+                "simular": True
+            }
+        }
+
+class LoteVendidoResultado(BaseModel):
+    """Consumo de un lote dentro de una venta"""
+    id_lote: UUID4
+    cantidad_vendida: Decimal
+    cantidad_restante: Decimal
+    estado_nuevo: str
+
+class VentaOrdenResultado(BaseModel):
+    """Resultado de una venta de la canasta"""
+    indice: int
+    id_activo: UUID4
+    cantidad: Decimal
+    monto_total: Decimal
+    lotes_afectados: List[LoteVendidoResultado]
+
+class PosicionRebalanceo(BaseModel):
+    """Cantidad abierta de un activo antes y después del rebalanceo"""
+    id_activo: UUID4
+    ticker: str
+    cantidad_anterior: Decimal
+    cantidad_nueva: Decimal
+
+class RebalanceoResponse(BaseModel):
+    """Response del rebalanceo (o de su simulación)"""
+    simulacion: bool
+    saldo_anterior: Decimal
+    total_ventas: Decimal
+    total_compras: Decimal
+    saldo_nuevo: Decimal
+    ventas: List[VentaOrdenResultado]
+    compras: List[CompraLoteResultado]
+    posiciones: List[PosicionRebalanceo]
+    mensaje: str
+
 class LoteResponse(BaseModel):
     """Response con información de un lote"""
     id_lote: UUID4
@@ -73,6 +185,21 @@ class LoteResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class ResumenActivoResponse(BaseModel):
+    """Response con el resumen de un activo del portafolio"""
+    id_activo: UUID4
+    ticker: str
+    nombre_activo: str
+    tipo_activo: Optional[str] = None
+    moneda: Optional[str] = None
+    cantidad_total: Decimal
+    inversion_total: Decimal
+    precio_promedio: Decimal
+    lotes_verdes: int
+    lotes_amarillos: int
+    lotes_rojos: int
+    numero_lotes: int
+
 class EstadisticasLotesResponse(BaseModel):
     """Response con estadísticas de lotes"""
     total_lotes: int
@@ -1,10 +1,10 @@
 """
 Schemas Pydantic para Valoraciones del Portafolio
 """
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from decimal import Decimal
 from datetime import date, datetime
-from typing import Optional
+from typing import Dict, List, Literal, Optional
 
 
 class ValoracionResponse(BaseModel):
@@ -42,3 +42,176 @@ class ResumenPortafolioResponse(BaseModel):
     rentabilidad_porcentaje: float
     total_activos_diferentes: int
     total_lotes_activos: int
+
+
+class ParametrosGBM(BaseModel):
+    """Rendimiento esperado y volatilidad anual de un activo (reemplaza los de defecto)."""
+    mu: Optional[float] = Field(None, ge=-1, le=2, description="Rendimiento esperado anual (0.10 = 10%)")
+    sigma: Optional[float] = Field(None, ge=0, le=3, description="Volatilidad anual (0.25 = 25%)")
+
+
+class SimulacionMonteCarloRequest(BaseModel):
+    """Parámetros de la simulación Monte Carlo del portafolio."""
+    trayectorias: int = Field(10000, ge=1, le=200000, description="Número de trayectorias")
+    horizonte_dias: int = Field(252, ge=1, le=2520, description="Horizonte en días hábiles")
+    puntos_banda: int = Field(12, ge=1, le=60, description="Puntos de la banda de percentiles")
+    metodo: Literal['gbm', 'bootstrap'] = Field('gbm', description="GBM por activo o bootstrap de retornos históricos")
+    parametros: Dict[str, ParametrosGBM] = Field(default_factory=dict, description="Parámetros GBM por ticker")
+    correlacion: float = Field(0.0, ge=0, lt=1, description="Correlación común entre activos (GBM)")
+    semilla: Optional[int] = Field(None, ge=0, description="Semilla para reproducir la simulación")
+    procesos: int = Field(1, ge=1, le=32, description="Procesos para generar los bloques de trayectorias")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "trayectorias": 20000,
+                "horizonte_dias": 252,
+                "puntos_banda": 12,
+                "metodo": "gbm",
+                "parametros": {"ECOPETROL": {"mu": 0.08, "sigma": 0.35}},
+                "correlacion": 0.3,
+                "semilla": 42,
+                "procesos": 2
+            }
+        }
+
+
+class PosicionSimulada(BaseModel):
+    """Valor inicial y parámetros de un activo en la simulación."""
+    ticker: str
+    tipo_activo: Optional[str] = None
+    valor: float
+    mu: Optional[float] = None
+    sigma: Optional[float] = None
+
+
+class BandaPercentiles(BaseModel):
+    """Percentiles del valor del portafolio en un día del horizonte."""
+    dia: int
+    media: float
+    p5: float
+    p25: float
+    p50: float
+    p75: float
+    p95: float
+
+
+class ResumenSimulacion(BaseModel):
+    """Distribución del valor al final del horizonte."""
+    media: float
+    p5: float
+    p50: float
+    p95: float
+    probabilidad_perdida: float
+
+
+class SimulacionMonteCarloResponse(BaseModel):
+    """Resultado de la simulación Monte Carlo del portafolio."""
+    metodo: str
+    trayectorias: int
+    horizonte_dias: int
+    semilla: int
+    bloques: int
+    procesos: int
+    valor_inicial: float
+    posiciones: List[PosicionSimulada]
+    bandas: List[BandaPercentiles]
+    resumen_final: ResumenSimulacion
+    tiempo_segundos: float
+
+
+class MetricaRiesgo(BaseModel):
+    """Pérdida en porcentaje del valor actual y en pesos."""
+    porcentaje: float
+    valor: float
+
+
+class MaxDrawdown(BaseModel):
+    """Mayor caída desde un máximo previo de la serie."""
+    porcentaje: float
+    fecha_pico: date
+    fecha_valle: date
+
+
+class RiesgoPortafolioResponse(BaseModel):
+    """Métricas de riesgo histórico del portafolio (valoraciones diarias)."""
+    nivel_confianza: float
+    observaciones: int
+    fecha_inicio: date
+    fecha_fin: date
+    valor_actual: float
+    retorno_medio_diario: float
+    volatilidad_diaria: float
+    volatilidad_anual: float
+    var_historico: MetricaRiesgo
+    cvar_historico: MetricaRiesgo
+    var_parametrico: MetricaRiesgo
+    cvar_parametrico: MetricaRiesgo
+    max_drawdown: MaxDrawdown
+    desde_cache: bool
+
+
+class EscenarioEstres(BaseModel):
+    """Choques de un escenario de estrés."""
+    nombre: str = Field(..., min_length=1, max_length=100)
+    choque_trm: float = Field(0, gt=-100, description="Variación de la TRM en % (10 = +10%)")
+    choque_tasas_pb: float = Field(0, ge=-5000, le=5000, description="Variación de la TIR de los bonos en puntos básicos")
+    choque_acciones: float = Field(0, ge=-100, description="Variación de precio de acciones y ETF en %")
+    choques_activos: Dict[str, float] = Field(
+        default_factory=dict, description="Variación de precio en % por ticker (reemplaza el choque del tipo)"
+    )
+
+
+class PruebaEstresRequest(BaseModel):
+    """Escenarios a aplicar sobre las posiciones abiertas."""
+    escenarios: List[EscenarioEstres] = Field(..., min_length=1, max_length=100)
+    fecha_valoracion: Optional[date] = Field(None, description="Fecha para revalorar bonos (default: hoy)")
+    tirs_base: Dict[str, Decimal] = Field(
+        default_factory=dict, description="TIR base en % por ticker de bono (default: tasa cupón)"
+    )
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "escenarios": [
+                    {"nombre": "TRM +10%", "choque_trm": 10},
+                    {"nombre": "Tasas +200pb", "choque_tasas_pb": 200},
+                    {"nombre": "Crisis", "choque_trm": 15, "choque_tasas_pb": 300, "choque_acciones": -20,
+                     "choques_activos": {"ECOPETROL": -35}}
+                ],
+                "tirs_base": {"TES2030": 9.1}
+            }
+        }
+
+
+class PnlActivo(BaseModel):
+    """P&L de un activo en un escenario."""
+    ticker: str
+    pnl: float
+
+
+class ResultadoEscenario(BaseModel):
+    """Valor estresado y P&L de un escenario."""
+    nombre: str
+    valor_estresado: float
+    pnl: float
+    pnl_porcentaje: float
+    por_activo: List[PnlActivo]
+
+
+class PosicionEstres(BaseModel):
+    """Posición abierta incluida en la prueba."""
+    ticker: str
+    tipo_activo: Optional[str] = None
+    moneda: str
+    valor: float
+
+
+class PruebaEstresResponse(BaseModel):
+    """Resultado de la prueba de estrés del portafolio."""
+    fecha_valoracion: date
+    valor_inicial: float
+    posiciones: List[PosicionEstres]
+    escenarios: List[ResultadoEscenario]
+    peor_escenario: str
+    advertencias: List[str]
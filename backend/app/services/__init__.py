@@ -3,5 +3,25 @@ Inicialización de módulos de servicios
 """
 from .lote_service import LoteService
 from .calculo_service import CalculoFinancieroService
+from .valoracion_bonos_service import ValoracionBonosService
+from .cronograma_service import CronogramaCuponesService
+from .parametros_service import ParametrosService
+from .memoizacion_service import MemoizacionService
+from .historial_calculos_service import HistorialCalculosService
+from .valoracion_masiva_service import ValoracionMasivaService
+from .curva_rendimiento_service import CurvaRendimientoService
+from .simulacion_service import SimulacionMonteCarloService
+from .riesgo_service import RiesgoPortafolioService
+from .estres_service import EstresPortafolioService
+from .trm_service import TRMService
+from .clasificacion_service import ClasificacionService
+from .posicion_service import PosicionService
 
-__all__ = ['LoteService', 'CalculoFinancieroService']
+__all__ = [
+    'LoteService', 'CalculoFinancieroService', 'ValoracionBonosService',
+    'CronogramaCuponesService', 'ParametrosService', 'MemoizacionService',
+    'HistorialCalculosService', 'ValoracionMasivaService', 'CurvaRendimientoService',
+    'SimulacionMonteCarloService', 'RiesgoPortafolioService',
+    'EstresPortafolioService', 'TRMService',
+    'ClasificacionService', 'PosicionService'
+]
@@ -2,39 +2,72 @@
 Motor de Cálculos Financieros
 Implementa fórmulas matemáticas con precisión decimal para:
 - Valoración de Bonos (Precio Sucio)
-- Liquidación de CDTs con penalizaciones
+- Liquidación de CDTs con penalizaciones (puntual y cronograma completo)
 - Conversión de Divisas
 """
+import math
 from decimal import Decimal, getcontext
 from datetime import date, datetime
-from typing import Dict, Optional
-from dateutil.relativedelta import relativedelta
+from typing import Dict, Optional, Tuple
+
+import numpy as np
 from sqlalchemy.orm import Session
 
-from app.models import Activo, ParametroSistema, CalculoBono
+from app.models import Activo
+from app.services.cronograma_service import CronogramaCuponesService
+from app.services.memoizacion_service import memoizar_calculo
+from app.services.historial_calculos_service import HistorialCalculosService
+from app.services.curva_rendimiento_service import CurvaCeroCupon
+from app.services.solver_tir_service import SolverTirService
+from app.services.parametros_service import (
+    ParametrosService,
+    PARAM_PENALIZACION_CDT_60_DIAS,
+    PARAM_PENALIZACION_CDT_MAS_60_DIAS,
+    PARAM_META_RENDIMIENTO,
+)
 
 # Configurar precisión decimal alta para cálculos financieros
 getcontext().prec = 28
 
+# Modos de precisión del motor
+MODO_EXACTO = 'exacto'   # Decimal (prec=28): liquidación y todo lo que se persiste
+MODO_RAPIDO = 'rapido'   # float64: tamizaje y analítica masiva
+MODOS_PRECISION = (MODO_EXACTO, MODO_RAPIDO)
+
+# Penalizaciones por defecto si no están en parametros_sistema
+DIAS_TRAMO_PENALIZACION_CDT = 60
+PENALIZACION_CDT_60_DIAS_DEFECTO = Decimal('0.10')
+PENALIZACION_CDT_MAS_60_DIAS_DEFECTO = Decimal('0.20')
+META_RENDIMIENTO_DEFECTO = Decimal('0.15')
+
 
 class CalculoFinancieroService:
     """Servicio de cálculos financieros con precisión decimal"""
     
     @staticmethod
+    @memoizar_calculo
     def calcular_precio_bono_sucio(
         valor_nominal: Decimal,
         tasa_cupon: Decimal,
         frecuencia_cupon: int,
-        tir: Decimal,
+        tir: Optional[Decimal],
         fecha_emision: date,
         fecha_vencimiento: date,
-        fecha_valoracion: date
+        fecha_valoracion: date,
+        modo_precision: str = MODO_EXACTO,
+        curva: Optional[CurvaCeroCupon] = None,
+        calcular_tir_equivalente: bool = False
     ) -> Dict:
         """
         Calcula el precio sucio de un bono
         
         Fórmula: Precio = Σ(Cupón/(1+TIR)^t) + Nominal/(1+TIR)^n + Cupón Acumulado
         
+        Con `curva` cada flujo se descuenta con el factor de la curva cero
+        cupón en lugar de la TIR plana (un producto punto). En ese caso
+        `tir_utilizada` es None, salvo que se pida `calcular_tir_equivalente`
+        (la TIR plana que reproduce el precio; requiere resolver la TIR).
+        
         Args:
             valor_nominal: Valor nominal del bono
             tasa_cupon: Tasa de cupón anual (ej: 7.25 para 7.25%)
@@ -43,14 +76,20 @@ class CalculoFinancieroService:
             fecha_emision: Fecha de emisión del bono
             fecha_vencimiento: Fecha de vencimiento del bono
             fecha_valoracion: Fecha a la que se valora el bono
+            modo_precision: 'exacto' (Decimal) o 'rapido' (núcleo en float64)
+            curva: Curva cero cupón construida (reemplaza a la TIR)
+            calcular_tir_equivalente: Con curva, reportar la TIR equivalente
             
         Returns:
             Dict con precio_limpio, cupon_acumulado, precio_sucio y detalles
         """
+        CalculoFinancieroService._validar_modo_precision(modo_precision)
+        if tir is None and curva is None:
+            raise ValueError("Se requiere la TIR o una curva de rendimientos")
         
         # Convertir tasas de porcentaje a decimal
         tasa_cupon_decimal = tasa_cupon / Decimal('100')
-        tir_decimal = tir / Decimal('100')
+        tir_decimal = (tir or Decimal('0')) / Decimal('100')
         
         # Cupón por periodo
         cupon_periodo = (valor_nominal * tasa_cupon_decimal) / Decimal(str(frecuencia_cupon))
@@ -59,28 +98,37 @@ class CalculoFinancieroService:
         tir_periodo = tir_decimal / Decimal(str(frecuencia_cupon))
         
         # Calcular número de periodos totales
-        years_to_maturity = (fecha_vencimiento - fecha_valoracion).days / Decimal('365.25')
-        num_periodos = int(years_to_maturity * frecuencia_cupon)
+        num_periodos = CalculoFinancieroService._calcular_num_periodos(
+            fecha_emision, fecha_vencimiento, fecha_valoracion, frecuencia_cupon
+        )
         
         if num_periodos <= 0:
             raise ValueError("El bono ya venció o la fecha de valoración es incorrecta")
         
         # PRECIO LIMPIO: Valor Presente de cupones + Valor Presente del nominal
-        precio_limpio = Decimal('0')
-        
-        # 1. Valor presente de los cupones
-        for t in range(1, num_periodos + 1):
-            vp_cupon = cupon_periodo / ((Decimal('1') + tir_periodo) ** t)
-            precio_limpio += vp_cupon
-        
-        # 2. Valor presente del nominal
-        vp_nominal = valor_nominal / ((Decimal('1') + tir_periodo) ** num_periodos)
-        precio_limpio += vp_nominal
+        if curva is not None:
+            precio_limpio = Decimal(repr(curva.valor_presente(
+                float(valor_nominal), float(cupon_periodo), num_periodos, frecuencia_cupon
+            )))
+            tir = None
+            if calcular_tir_equivalente:
+                tir = CalculoFinancieroService._tir_equivalente(
+                    valor_nominal, cupon_periodo, num_periodos, frecuencia_cupon, precio_limpio
+                )
+        elif modo_precision == MODO_RAPIDO:
+            precio_limpio = Decimal(repr(CalculoFinancieroService._valor_presente_flujos_rapido(
+                float(valor_nominal), float(cupon_periodo), float(tir_periodo), num_periodos
+            )))
+        else:
+            precio_limpio = CalculoFinancieroService._valor_presente_flujos(
+                valor_nominal, cupon_periodo, tir_periodo, num_periodos
+            )
         
         # CUPÓN ACUMULADO: Calcular días desde el último pago de cupón
-        dias_desde_ultimo_cupon = CalculoFinancieroService._calcular_dias_desde_ultimo_cupon(
-            fecha_emision, fecha_valoracion, frecuencia_cupon
+        fecha_ultimo_cupon, fecha_proximo_cupon = CronogramaCuponesService.cupon_anterior_y_siguiente(
+            fecha_emision, fecha_vencimiento, frecuencia_cupon, fecha_valoracion
         )
+        dias_desde_ultimo_cupon = (fecha_valoracion - fecha_ultimo_cupon).days
         
         # Días totales en el periodo del cupón
         dias_periodo_cupon = 365 / frecuencia_cupon
@@ -98,38 +146,153 @@ class CalculoFinancieroService:
             "cupon_periodo": round(cupon_periodo, 2),
             "num_periodos": num_periodos,
             "dias_desde_ultimo_cupon": dias_desde_ultimo_cupon,
+            "fecha_ultimo_cupon": fecha_ultimo_cupon,
+            "fecha_proximo_cupon": fecha_proximo_cupon,
             "tir_utilizada": tir,
             "fecha_valoracion": fecha_valoracion
         }
     
+    @staticmethod
+    def _calcular_num_periodos(
+        fecha_emision: date,
+        fecha_vencimiento: date,
+        fecha_valoracion: date,
+        frecuencia_cupon: int
+    ) -> int:
+        """
+        Calcula los periodos de cupón restantes hasta el vencimiento
+        
+        Cuenta las fechas del cronograma cacheado posteriores a la fecha de
+        valoración, el mismo cronograma que da el último y próximo cupón.
+        
+        Args:
+            fecha_emision: Fecha de emisión del bono
+            fecha_vencimiento: Fecha de vencimiento del bono
+            fecha_valoracion: Fecha a la que se valora el bono
+            frecuencia_cupon: Pagos al año (1, 2, 4)
+            
+        Returns:
+            Número de cupones por pagar (0 si el bono venció)
+        """
+        return CronogramaCuponesService.periodos_pendientes(
+            fecha_emision, fecha_vencimiento, frecuencia_cupon, fecha_valoracion
+        )
+    
+    @staticmethod
+    def _valor_presente_flujos(
+        valor_nominal: Decimal,
+        cupon_periodo: Decimal,
+        tir_periodo: Decimal,
+        num_periodos: int
+    ) -> Decimal:
+        """
+        Núcleo de valoración: VP de los cupones + VP del nominal en forma cerrada
+        
+        Usa un único factor de descuento v = (1 + r)^-n para la anualidad de
+        cupones y para el principal:
+        
+            VP = Cupón × (1 - v) / r + Nominal × v
+        
+        Equivale a la suma término a término Σ Cupón/(1+r)^t + Nominal/(1+r)^n
+        pero con una sola potencia Decimal en lugar de n. Con la precisión de
+        28 dígitos la diferencia relativa frente a la suma es menor a 1e-20
+        (menos de 1e-12 pesos para un nominal de 1e8), por lo que los valores
+        redondeados a 2 decimales coinciden salvo que el valor exacto caiga a
+        menos de esa distancia de una frontera de medio centavo.
+        
+        Args:
+            valor_nominal: Valor nominal del bono
+            cupon_periodo: Cupón pagado en cada periodo
+            tir_periodo: TIR por periodo en decimal (ej: 0.0425)
+            num_periodos: Número de periodos restantes
+            
+        Returns:
+            Valor presente (precio limpio) sin redondear
+        """
+        if tir_periodo == 0:
+            return cupon_periodo * num_periodos + valor_nominal
+        
+        factor_descuento = (Decimal('1') + tir_periodo) ** -num_periodos
+        anualidad = (Decimal('1') - factor_descuento) / tir_periodo
+        
+        return cupon_periodo * anualidad + valor_nominal * factor_descuento
+    
+    @staticmethod
+    def _valor_presente_flujos_rapido(
+        valor_nominal: float,
+        cupon_periodo: float,
+        tir_periodo: float,
+        num_periodos: int
+    ) -> float:
+        """
+        Misma forma cerrada que `_valor_presente_flujos` en float64
+        
+        v = exp(-n·log1p(r)) y 1 - v = -expm1(-n·log1p(r)) evitan la
+        cancelación cuando r es pequeño. Error relativo < 1e-13 para
+        n ≤ 360 (ver docs/VALIDACION_FORMULAS.md).
+        """
+        if tir_periodo == 0:
+            return cupon_periodo * num_periodos + valor_nominal
+        
+        exponente = -num_periodos * math.log1p(tir_periodo)
+        factor_descuento = math.exp(exponente)
+        anualidad = -math.expm1(exponente) / tir_periodo
+        
+        return cupon_periodo * anualidad + valor_nominal * factor_descuento
+    
+    @staticmethod
+    def _tir_equivalente(
+        valor_nominal: Decimal,
+        cupon_periodo: Decimal,
+        num_periodos: int,
+        frecuencia_cupon: int,
+        precio_limpio: Decimal
+    ) -> Optional[Decimal]:
+        """
+        TIR plana (%) que reproduce el precio limpio dado (solver del lote)
+        
+        Retorna None si el precio está fuera del rango de TIR del solver: el
+        precio de la curva sigue siendo válido aunque no tenga TIR plana.
+        """
+        solucion = SolverTirService.resolver_tir_periodo(
+            np.array([float(valor_nominal)]), np.array([float(cupon_periodo)]),
+            np.array([float(num_periodos)]), np.array([float(precio_limpio)])
+        )
+        if solucion["fuera_de_rango"][0]:
+            return None
+        return round(Decimal(repr(float(solucion["tir_periodo"][0]))) * frecuencia_cupon * 100, 6)
+    
+    @staticmethod
+    def _validar_modo_precision(modo_precision: str) -> None:
+        """Valida que el modo de precisión sea 'exacto' o 'rapido'"""
+        if modo_precision not in MODOS_PRECISION:
+            raise ValueError(f"Modo de precisión inválido: {modo_precision}. Use {' o '.join(MODOS_PRECISION)}")
+    
     @staticmethod
     def _calcular_dias_desde_ultimo_cupon(
         fecha_emision: date,
         fecha_actual: date,
-        frecuencia_cupon: int
+        frecuencia_cupon: int,
+        fecha_vencimiento: date
     ) -> int:
         """
         Calcula los días transcurridos desde el último pago de cupón
         
+        Usa el cronograma cacheado del bono y busca el último cupón por
+        búsqueda binaria en lugar de recorrer las fechas desde la emisión.
+        
         Args:
             fecha_emision: Fecha de emisión del bono
             fecha_actual: Fecha actual
             frecuencia_cupon: Frecuencia de pago (1, 2, 4)
+            fecha_vencimiento: Fecha de vencimiento del bono
             
         Returns:
             Número de días desde el último cupón
         """
-        # Meses entre pagos
-        meses_entre_cupones = 12 // frecuencia_cupon
-        
-        # Buscar la fecha del último cupón
-        fecha_ultimo_cupon = fecha_emision
-        
-        while fecha_ultimo_cupon < fecha_actual:
-            proxima_fecha = fecha_ultimo_cupon + relativedelta(months=meses_entre_cupones)
-            if proxima_fecha > fecha_actual:
-                break
-            fecha_ultimo_cupon = proxima_fecha
+        fecha_ultimo_cupon, _ = CronogramaCuponesService.cupon_anterior_y_siguiente(
+            fecha_emision, fecha_vencimiento, frecuencia_cupon, fecha_actual
+        )
         
         # Días desde el último cupón
         dias = (fecha_actual - fecha_ultimo_cupon).days
@@ -142,7 +305,8 @@ class CalculoFinancieroService:
         fecha_inicio: date,
         fecha_liquidacion: date,
         plazo_dias_original: int,
-        db: Session
+        db: Session,
+        modo_precision: str = MODO_EXACTO
     ) -> Dict:
         """
         Calcula la liquidación de un CDT con penalizaciones
@@ -157,10 +321,37 @@ class CalculoFinancieroService:
             fecha_liquidacion: Fecha de liquidación
             plazo_dias_original: Plazo original en días
             db: Sesión de base de datos para obtener parámetros
+            modo_precision: 'exacto' (Decimal) o 'rapido' (potencias en float64)
             
         Returns:
             Dict con intereses, penalización, monto a recibir y detalles
         """
+        CalculoFinancieroService._validar_modo_precision(modo_precision)
+        penalizacion_60, penalizacion_mas_60 = CalculoFinancieroService._obtener_penalizaciones_cdt(db)
+        return CalculoFinancieroService._liquidar_cdt(
+            capital_invertido, tasa_interes_anual, fecha_inicio, fecha_liquidacion,
+            plazo_dias_original, penalizacion_60, penalizacion_mas_60, modo_precision
+        )
+    
+    @staticmethod
+    @memoizar_calculo
+    def _liquidar_cdt(
+        capital_invertido: Decimal,
+        tasa_interes_anual: Decimal,
+        fecha_inicio: date,
+        fecha_liquidacion: date,
+        plazo_dias_original: int,
+        penalizacion_60: Decimal,
+        penalizacion_mas_60: Decimal,
+        modo_precision: str = MODO_EXACTO
+    ) -> Dict:
+        """
+        Liquidación del CDT con las penalizaciones ya resueltas (función pura)
+        
+        Las penalizaciones vigentes forman parte de la llave de memoización,
+        así un cambio del Admin nunca sirve un resultado calculado con las
+        anteriores.
+        """
         
         # Días transcurridos
         dias_transcurridos = (fecha_liquidacion - fecha_inicio).days
@@ -175,26 +366,23 @@ class CalculoFinancieroService:
         tasa_decimal = tasa_interes_anual / Decimal('100')
         
         # Calcular intereses compuestos: I = P × ((1 + i)^(n/365) - 1)
-        exponente = Decimal(str(dias_transcurridos)) / Decimal('365')
-        factor = (Decimal('1') + tasa_decimal) ** exponente
-        interes_bruto = capital_invertido * (factor - Decimal('1'))
+        if modo_precision == MODO_RAPIDO:
+            crecimiento = math.expm1(dias_transcurridos / 365 * math.log1p(float(tasa_decimal)))
+            interes_bruto = capital_invertido * Decimal(repr(crecimiento))
+        else:
+            exponente = Decimal(str(dias_transcurridos)) / Decimal('365')
+            factor = (Decimal('1') + tasa_decimal) ** exponente
+            interes_bruto = capital_invertido * (factor - Decimal('1'))
         
         # Determinar penalización según parámetros del sistema
         penalizacion_porcentaje = Decimal('0')
         es_liquidacion_anticipada = dias_transcurridos < plazo_dias_original
         
         if es_liquidacion_anticipada:
-            # Obtener parámetros de penalización
-            if dias_transcurridos <= 60:
-                param = db.query(ParametroSistema).filter(
-                    ParametroSistema.nombre_parametro == 'PENALIZACION_CDT_60_DIAS'
-                ).first()
-                penalizacion_porcentaje = param.get_valor_numeric() if param else Decimal('0.10')
+            if dias_transcurridos <= DIAS_TRAMO_PENALIZACION_CDT:
+                penalizacion_porcentaje = penalizacion_60
             else:
-                param = db.query(ParametroSistema).filter(
-                    ParametroSistema.nombre_parametro == 'PENALIZACION_CDT_MAS_60_DIAS'
-                ).first()
-                penalizacion_porcentaje = param.get_valor_numeric() if param else Decimal('0.20')
+                penalizacion_porcentaje = penalizacion_mas_60
         
         # Aplicar penalización sobre el interés
         penalizacion_monto = interes_bruto * penalizacion_porcentaje
@@ -204,7 +392,10 @@ class CalculoFinancieroService:
         monto_total = capital_invertido + interes_neto
         
         # Calcular tasa efectiva real (después de penalización)
-        if dias_transcurridos > 0:
+        if dias_transcurridos > 0 and modo_precision == MODO_RAPIDO:
+            rendimiento = math.expm1(365 / dias_transcurridos * math.log1p(float(interes_neto / capital_invertido)))
+            tasa_efectiva_anual = Decimal(repr(rendimiento)) * Decimal('100')
+        elif dias_transcurridos > 0:
             factor_efectivo = monto_total / capital_invertido
             tasa_efectiva_anual = ((factor_efectivo ** (Decimal('365') / Decimal(str(dias_transcurridos)))) - Decimal('1')) * Decimal('100')
         else:
@@ -227,6 +418,121 @@ class CalculoFinancieroService:
         }
     
     @staticmethod
+    def _obtener_penalizaciones_cdt(db: Session) -> Tuple[Decimal, Decimal]:
+        """
+        Porcentajes de penalización de CDT desde el registro de parámetros
+
+        Returns:
+            Tupla (penalización ≤ 60 días, penalización > 60 días) como fracción
+        """
+        return (
+            ParametrosService.obtener_numerico(
+                db, PARAM_PENALIZACION_CDT_60_DIAS, PENALIZACION_CDT_60_DIAS_DEFECTO
+            ),
+            ParametrosService.obtener_numerico(
+                db, PARAM_PENALIZACION_CDT_MAS_60_DIAS, PENALIZACION_CDT_MAS_60_DIAS_DEFECTO
+            ),
+        )
+    
+    @staticmethod
+    def calcular_cronograma_liquidacion_cdt(
+        capital_invertido: Decimal,
+        tasa_interes_anual: Decimal,
+        fecha_inicio: date,
+        plazo_dias_original: int,
+        db: Session,
+        paso_dias: int = 1
+    ) -> Dict:
+        """
+        Calcula la liquidación del CDT para cada día (o cada `paso_dias`) del plazo
+        
+        Usa las mismas fórmulas que `calcular_liquidacion_cdt`, evaluadas
+        sobre el arreglo completo de días en una sola pasada (NumPy, float64)
+        y con los parámetros de penalización cargados una sola vez. El
+        último día del plazo siempre se incluye.
+        
+        El día óptimo es el de mayor tasa efectiva anual neta; ante empate
+        se elige el más temprano (mayor liquidez con el mismo rendimiento).
+        
+        Args:
+            capital_invertido: Capital inicial del CDT
+            tasa_interes_anual: Tasa de interés anual (ej: 12.5 para 12.5%)
+            fecha_inicio: Fecha de apertura del CDT
+            plazo_dias_original: Plazo original en días
+            db: Sesión de base de datos para obtener parámetros
+            paso_dias: Intervalo entre días evaluados
+            
+        Returns:
+            Dict con la fila de liquidación de cada día y el día óptimo
+        """
+        if paso_dias <= 0:
+            raise ValueError("El paso en días debe ser mayor a cero")
+        if plazo_dias_original <= 0:
+            raise ValueError("El plazo original debe ser mayor a cero")
+        
+        penalizacion_60, penalizacion_mas_60 = CalculoFinancieroService._obtener_penalizaciones_cdt(db)
+        
+        dias = np.arange(paso_dias, plazo_dias_original + 1, paso_dias, dtype=np.int64)
+        if dias.size == 0 or dias[-1] != plazo_dias_original:
+            dias = np.append(dias, plazo_dias_original)
+        
+        capital = float(capital_invertido)
+        log_tasa = np.log1p(float(tasa_interes_anual) / 100.0)
+        
+        # I = P × ((1 + i)^(n/365) - 1)
+        interes_bruto = capital * np.expm1(dias / 365.0 * log_tasa)
+        
+        anticipada = dias < plazo_dias_original
+        penalizacion_porcentaje = np.where(
+            anticipada,
+            np.where(dias <= DIAS_TRAMO_PENALIZACION_CDT, float(penalizacion_60), float(penalizacion_mas_60)),
+            0.0
+        )
+        penalizacion_monto = interes_bruto * penalizacion_porcentaje
+        interes_neto = interes_bruto - penalizacion_monto
+        monto_total = capital + interes_neto
+        
+        # Tasa efectiva = (monto / P)^(365/n) - 1
+        tasa_efectiva_anual = np.expm1(365.0 / dias * np.log1p(interes_neto / capital)) * 100.0
+        
+        tramos = np.where(
+            anticipada,
+            np.where(dias <= DIAS_TRAMO_PENALIZACION_CDT, "HASTA_60_DIAS", "MAS_60_DIAS"),
+            "SIN_PENALIZACION"
+        )
+        
+        cronograma = [
+            {
+                "dias_transcurridos": int(dias[k]),
+                "fecha_liquidacion": date.fromordinal(fecha_inicio.toordinal() + int(dias[k])),
+                "tramo_penalizacion": str(tramos[k]),
+                "penalizacion_porcentaje": round(float(penalizacion_porcentaje[k]) * 100, 4),
+                "interes_bruto": round(float(interes_bruto[k]), 2),
+                "penalizacion_monto": round(float(penalizacion_monto[k]), 2),
+                "interes_neto": round(float(interes_neto[k]), 2),
+                "monto_total_recibir": round(float(monto_total[k]), 2),
+                "tasa_efectiva_anual": round(float(tasa_efectiva_anual[k]), 4),
+            }
+            for k in range(dias.size)
+        ]
+        
+        # np.argmax retorna la primera ocurrencia del máximo (día más temprano)
+        tasas_redondeadas = np.round(tasa_efectiva_anual, 4)
+        optimo = cronograma[int(np.argmax(tasas_redondeadas))]
+        
+        return {
+            "capital_invertido": round(capital_invertido, 2),
+            "tasa_interes_anual": tasa_interes_anual,
+            "fecha_inicio": fecha_inicio,
+            "plazo_original": plazo_dias_original,
+            "paso_dias": paso_dias,
+            "total_dias_evaluados": len(cronograma),
+            "dia_optimo": optimo,
+            "cronograma": cronograma
+        }
+    
+    @staticmethod
+    @memoizar_calculo
     def convertir_divisa(
         cantidad: Decimal,
         precio_unitario: Decimal,
@@ -319,9 +625,10 @@ class CalculoFinancieroService:
             fecha_valoracion=fecha_valoracion
         )
         
-        # Guardar el cálculo en la base de datos
-        calculo = CalculoBono(
-            id_activo=id_activo,
+        # Guardar el cálculo en el historial (write-behind, sin commit en la petición)
+        id_calculo = HistorialCalculosService.registrar(
+            db,
+            id_activo=activo.id_activo,
             fecha_calculo=fecha_valoracion,
             tir=tir,
             precio_limpio=resultado["precio_limpio"],
@@ -330,16 +637,12 @@ class CalculoFinancieroService:
             dias_desde_ultimo_cupon=resultado["dias_desde_ultimo_cupon"]
         )
         
-        db.add(calculo)
-        db.commit()
-        db.refresh(calculo)
-        
         resultado["activo"] = {
             "ticker": activo.ticker,
             "nombre": activo.nombre,
             "valor_nominal": float(activo.valor_nominal)
         }
-        resultado["id_calculo"] = str(calculo.id_calculo)
+        resultado["id_calculo"] = str(id_calculo)
         
         return resultado
     
@@ -367,11 +670,9 @@ class CalculoFinancieroService:
             if db is None:
                 raise ValueError("Se requiere db o meta_admin")
             
-            param = db.query(ParametroSistema).filter(
-                ParametroSistema.nombre_parametro == 'META_RENDIMIENTO'
-            ).first()
-            
-            meta_admin = param.get_valor_numeric() if param else Decimal('0.15')
+            meta_admin = ParametrosService.obtener_numerico(
+                db, PARAM_META_RENDIMIENTO, META_RENDIMIENTO_DEFECTO
+            )
         
         if meta_admin == 0:
             raise ValueError("La meta del administrador no puede ser cero")
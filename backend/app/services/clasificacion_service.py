@@ -0,0 +1,189 @@
+"""
+Clasificación del Curso
+Ranking de todos los usuarios por rendimiento del portafolio:
+- Rendimiento de la última valoración diaria de cada usuario, en una sola
+  consulta con funciones de ventana (ROW_NUMBER para la última fila, RANK
+  para la posición)
+- Calificación con la META_RENDIMIENTO vigente (misma escala de
+  calcular_calificacion_final)
+- Caché en proceso actualizada por usuario al registrar cada snapshot, con
+  recarga completa periódica
+"""
+import threading
+import time
+from datetime import date
+from decimal import Decimal
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import Usuario, ValoracionDiaria
+from app.services.calculo_service import CalculoFinancieroService, META_RENDIMIENTO_DEFECTO
+from app.services.parametros_service import PARAM_META_RENDIMIENTO, ParametrosService
+
+_lock = threading.Lock()
+_entradas: Dict[UUID, Dict] = {}
+_ranking: Optional[List[Dict]] = None    # None = hay que reordenar
+_cargada_en: Optional[float] = None      # None = hay que recargar desde la BD
+_estadisticas = {"recargas": 0, "actualizaciones": 0, "lecturas": 0}
+
+
+def _consultar_rendimientos(db: Session) -> List[Dict]:
+    """Última valoración por usuario, rendimiento y posición (RANK) en una consulta"""
+    ultima = select(
+        ValoracionDiaria.id_usuario,
+        ValoracionDiaria.fecha_valoracion,
+        ValoracionDiaria.valor_mercado_total,
+        ValoracionDiaria.costo_total_invertido,
+        func.row_number().over(
+            partition_by=ValoracionDiaria.id_usuario,
+            order_by=ValoracionDiaria.fecha_valoracion.desc()
+        ).label("fila"),
+    ).subquery()
+
+    rendimiento = (
+        (ultima.c.valor_mercado_total - ultima.c.costo_total_invertido) / ultima.c.costo_total_invertido
+    ).label("rendimiento")
+    consulta = select(
+        ultima.c.id_usuario,
+        Usuario.nombre,
+        Usuario.email,
+        ultima.c.fecha_valoracion,
+        rendimiento,
+        func.rank().over(order_by=rendimiento.desc()).label("posicion"),
+    ).join(Usuario, Usuario.id_usuario == ultima.c.id_usuario).where(
+        ultima.c.fila == 1,
+        ultima.c.costo_total_invertido > 0
+    ).order_by("posicion", Usuario.nombre)
+
+    return [
+        {
+            "id_usuario": fila.id_usuario,
+            "nombre": fila.nombre,
+            "email": fila.email,
+            "fecha_valoracion": fila.fecha_valoracion,
+            "rendimiento": Decimal(str(fila.rendimiento)),
+            "posicion": fila.posicion,
+        }
+        for fila in db.execute(consulta)
+    ]
+
+
+def _ordenar(entradas: Dict[UUID, Dict]) -> List[Dict]:
+    """Ranking en memoria con la semántica de RANK() (empates comparten posición)"""
+    ordenadas = sorted(entradas.values(), key=lambda e: (-e["rendimiento"], e["nombre"]))
+    for k, entrada in enumerate(ordenadas):
+        empatado = k and entrada["rendimiento"] == ordenadas[k - 1]["rendimiento"]
+        entrada["posicion"] = ordenadas[k - 1]["posicion"] if empatado else k + 1
+    return ordenadas
+
+
+class ClasificacionService:
+    """Servicio del ranking de calificaciones del curso"""
+
+    @staticmethod
+    def obtener_clasificacion(db: Session, limite: Optional[int] = None) -> Dict:
+        """
+        Ranking calificado de todos los usuarios con valoraciones
+
+        La consulta completa sólo se ejecuta con la caché vacía o vencida
+        (CLASIFICACION_CACHE_SEGUNDOS); entre recargas los snapshots nuevos
+        se incorporan con `registrar_snapshot`.
+
+        Args:
+            limite: Número máximo de posiciones a retornar (None = todas)
+
+        Returns:
+            Dict con la meta vigente, total de usuarios y posiciones calificadas
+        """
+        global _entradas, _ranking, _cargada_en
+        desde_cache = True
+        with _lock:
+            ahora = time.monotonic()
+            if _cargada_en is None or ahora - _cargada_en >= settings.CLASIFICACION_CACHE_SEGUNDOS:
+                filas = _consultar_rendimientos(db)
+                _entradas = {f["id_usuario"]: f for f in filas}
+                _ranking = filas
+                _cargada_en = ahora
+                _estadisticas["recargas"] += 1
+                desde_cache = False
+            elif _ranking is None:
+                _ranking = _ordenar(_entradas)
+            ranking = [dict(e) for e in (_ranking[:limite] if limite else _ranking)]
+            total = len(_ranking)
+            _estadisticas["lecturas"] += 1
+
+        meta = ParametrosService.obtener_numerico(db, PARAM_META_RENDIMIENTO, META_RENDIMIENTO_DEFECTO)
+        posiciones = []
+        for entrada in ranking:
+            nota = CalculoFinancieroService.calcular_calificacion_final(entrada["rendimiento"], meta_admin=meta)
+            posiciones.append({
+                "posicion": entrada["posicion"],
+                "id_usuario": str(entrada["id_usuario"]),
+                "nombre": entrada["nombre"],
+                "email": entrada["email"],
+                "fecha_valoracion": entrada["fecha_valoracion"],
+                "rendimiento": round(float(entrada["rendimiento"]) * 100, 4),
+                "nota": nota["nota"],
+                "calificacion": nota["calificacion"],
+                "supero_meta": nota["superó_meta"],
+            })
+
+        return {
+            "meta_rendimiento": float(meta * 100),
+            "total_usuarios": total,
+            "desde_cache": desde_cache,
+            "posiciones": posiciones,
+        }
+
+    @staticmethod
+    def registrar_snapshot(
+        usuario: Usuario,
+        fecha_valoracion: date,
+        valor_mercado_total: Decimal,
+        costo_total_invertido: Decimal
+    ) -> None:
+        """
+        Incorpora el snapshot de un usuario a la caché sin consultar la BD
+
+        Sólo cambia la entrada de ese usuario (si el snapshot es su último);
+        el ranking se reordena en la siguiente lectura.
+        """
+        global _ranking
+        with _lock:
+            if _cargada_en is None:
+                return
+            actual = _entradas.get(usuario.id_usuario)
+            if actual is not None and actual["fecha_valoracion"] > fecha_valoracion:
+                return
+            if costo_total_invertido > 0:
+                _entradas[usuario.id_usuario] = {
+                    "id_usuario": usuario.id_usuario,
+                    "nombre": usuario.nombre,
+                    "email": usuario.email,
+                    "fecha_valoracion": fecha_valoracion,
+                    "rendimiento": (Decimal(valor_mercado_total) - Decimal(costo_total_invertido))
+                    / Decimal(costo_total_invertido),
+                    "posicion": None,
+                }
+            else:
+                _entradas.pop(usuario.id_usuario, None)
+            _ranking = None
+            _estadisticas["actualizaciones"] += 1
+
+    @staticmethod
+    def invalidar() -> None:
+        """Fuerza la recarga completa en la próxima lectura"""
+        global _cargada_en, _ranking
+        with _lock:
+            _cargada_en = None
+            _ranking = None
+            _entradas.clear()
+
+    @staticmethod
+    def estadisticas() -> Dict:
+        """Retorna recargas, actualizaciones incrementales, lecturas y usuarios en caché"""
+        return dict(_estadisticas, usuarios=len(_entradas))
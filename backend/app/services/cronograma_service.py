@@ -0,0 +1,125 @@
+"""
+Cronograma de Cupones de Bonos
+Genera una sola vez el arreglo de fechas de pago de cada bono y lo reutiliza
+para los periodos por pagar, el cupón acumulado y las fechas de cupón de
+cada valoración:
+- Caché LRU por (fecha_emision, fecha_vencimiento, frecuencia_cupon)
+- Búsqueda binaria del cupón anterior y siguiente a una fecha
+"""
+from bisect import bisect_right
+from datetime import date
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+from dateutil.relativedelta import relativedelta
+
+# Número máximo de cronogramas distintos que se mantienen en memoria
+MAX_CRONOGRAMAS_EN_CACHE = 4096
+
+
+@lru_cache(maxsize=MAX_CRONOGRAMAS_EN_CACHE)
+def _generar_fechas_cupon(
+    fecha_emision: date,
+    fecha_vencimiento: date,
+    frecuencia_cupon: int
+) -> Tuple[date, ...]:
+    """
+    Genera las fechas de cupón desde la emisión hasta el vencimiento
+
+    Cada fecha se obtiene sumando los meses entre cupones a la anterior
+    (misma convención que se usaba al recorrer el cronograma en cada
+    cálculo). La primera fecha es la emisión y la última es la primera
+    fecha >= vencimiento.
+    """
+    meses_entre_cupones = 12 // frecuencia_cupon
+    paso = relativedelta(months=meses_entre_cupones)
+
+    fechas = [fecha_emision]
+    while fechas[-1] < fecha_vencimiento:
+        fechas.append(fechas[-1] + paso)
+    return tuple(fechas)
+
+
+class CronogramaCuponesService:
+    """Servicio de cronogramas de pago de cupones con caché"""
+
+    @staticmethod
+    def obtener_cronograma(
+        fecha_emision: date,
+        fecha_vencimiento: date,
+        frecuencia_cupon: int
+    ) -> Tuple[date, ...]:
+        """
+        Retorna el arreglo ordenado de fechas de cupón del bono (cacheado)
+
+        Args:
+            fecha_emision: Fecha de emisión del bono
+            fecha_vencimiento: Fecha de vencimiento del bono
+            frecuencia_cupon: Pagos al año (1, 2, 4)
+
+        Returns:
+            Tupla inmutable de fechas, empezando por la emisión
+        """
+        if frecuencia_cupon <= 0:
+            raise ValueError("La frecuencia de cupón debe ser mayor a cero")
+        return _generar_fechas_cupon(fecha_emision, fecha_vencimiento, frecuencia_cupon)
+
+    @staticmethod
+    def cupon_anterior_y_siguiente(
+        fecha_emision: date,
+        fecha_vencimiento: date,
+        frecuencia_cupon: int,
+        fecha: date
+    ) -> Tuple[date, Optional[date]]:
+        """
+        Busca (binaria) el último cupón <= fecha y el siguiente cupón > fecha
+
+        Si la fecha es anterior a la emisión, el "último cupón" es la emisión.
+        Si es posterior al último cupón del cronograma, no hay siguiente.
+
+        Returns:
+            Tupla (fecha_ultimo_cupon, fecha_proximo_cupon o None)
+        """
+        fechas = CronogramaCuponesService.obtener_cronograma(
+            fecha_emision, fecha_vencimiento, frecuencia_cupon
+        )
+        posicion = bisect_right(fechas, fecha)
+        anterior = fechas[max(posicion - 1, 0)]
+        siguiente = fechas[posicion] if posicion < len(fechas) else None
+        return anterior, siguiente
+
+    @staticmethod
+    def periodos_pendientes(
+        fecha_emision: date,
+        fecha_vencimiento: date,
+        frecuencia_cupon: int,
+        fecha: date
+    ) -> int:
+        """
+        Número de cupones por pagar después de `fecha` (búsqueda binaria)
+
+        Returns:
+            Fechas del cronograma > fecha; 0 si el bono ya venció
+        """
+        if fecha >= fecha_vencimiento:
+            return 0
+        fechas = CronogramaCuponesService.obtener_cronograma(
+            fecha_emision, fecha_vencimiento, frecuencia_cupon
+        )
+        return len(fechas) - bisect_right(fechas, fecha)
+
+    @staticmethod
+    def estadisticas_cache() -> Dict:
+        """Retorna aciertos, fallos y tamaño actual de la caché de cronogramas"""
+        info = _generar_fechas_cupon.cache_info()
+        return {
+            "aciertos": info.hits,
+            "fallos": info.misses,
+            "tamano": info.currsize,
+            "tamano_maximo": info.maxsize,
+        }
+
+    @staticmethod
+    def limpiar_cache() -> None:
+        """Vacía la caché de cronogramas"""
+        _generar_fechas_cupon.cache_clear()
@@ -0,0 +1,275 @@
+"""
+Curva de Rendimientos Cero Cupón
+Construye la curva de descuento a partir de rendimientos par de mercado:
+- Bootstrapping de factores de descuento y tasas cero
+- Interpolación log-lineal de factores de descuento (tasa cero constante
+  al extrapolar más allá del último plazo)
+- Caché de curvas construidas por (nombre, fecha) para valorar muchos bonos
+  con una sola construcción, invalidada por versión (puntos + último
+  fecha_registro) para que todos los workers vean las curvas re-registradas
+"""
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from decimal import Decimal
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import PuntoCurva
+
+# Frecuencia del bootstrapping (pagos al año de los bonos par de referencia)
+FRECUENCIA_BOOTSTRAP = 2
+
+# Número máximo de curvas construidas que se mantienen en memoria
+MAX_CURVAS_EN_CACHE = 64
+
+
+class CurvaCeroCupon:
+    """Curva de descuento construida (inmutable): tiempos en años y log de factores"""
+
+    def __init__(
+        self,
+        puntos: Tuple[Tuple[Decimal, Decimal], ...],
+        tiempos: np.ndarray,
+        log_factores: np.ndarray,
+        nombre: Optional[str] = None,
+        fecha: Optional[date] = None
+    ):
+        self.puntos = puntos
+        self.tiempos = tiempos
+        self.log_factores = log_factores
+        self.nombre = nombre
+        self.fecha = fecha
+        self.tiempos.flags.writeable = False
+        self.log_factores.flags.writeable = False
+
+    @property
+    def llave_cache(self) -> Tuple:
+        """Identidad de la curva para memoización (cambia si cambian los puntos)"""
+        return ("curva", self.nombre, self.fecha, self.puntos)
+
+    def factores_descuento(self, t: np.ndarray) -> np.ndarray:
+        """
+        Factores de descuento DF(t) para tiempos en años
+
+        Interpola log DF linealmente (tasa forward constante entre nodos).
+        Más allá del último nodo mantiene constante la tasa cero.
+        """
+        t = np.asarray(t, dtype=np.float64)
+        t_max = self.tiempos[-1]
+        log_df = np.interp(t, np.concatenate(([0.0], self.tiempos)), np.concatenate(([0.0], self.log_factores)))
+        log_df = np.where(t > t_max, self.log_factores[-1] * t / t_max, log_df)
+        return np.exp(log_df)
+
+    def tasas_cero(self, t: np.ndarray) -> np.ndarray:
+        """Tasas cero efectivas anuales (%) para tiempos en años"""
+        t = np.asarray(t, dtype=np.float64)
+        return np.expm1(-np.log(self.factores_descuento(t)) / t) * 100.0
+
+    def valor_presente(
+        self,
+        valor_nominal: float,
+        cupon_periodo: float,
+        num_periodos: int,
+        frecuencia_cupon: int
+    ) -> float:
+        """
+        VP de los flujos de un bono con un solo producto punto
+
+        Los flujos caen en t = k / frecuencia (k = 1..n), la misma
+        convención de periodos del motor con TIR plana.
+        """
+        t = np.arange(1, num_periodos + 1, dtype=np.float64) / frecuencia_cupon
+        flujos = np.full(num_periodos, cupon_periodo)
+        flujos[-1] += valor_nominal
+        return float(flujos @ self.factores_descuento(t))
+
+
+_lock = threading.Lock()
+# (nombre, fecha) -> (curva, versión, instante de la última verificación)
+_cache: "OrderedDict[Tuple, Tuple[CurvaCeroCupon, Tuple, float]]" = OrderedDict()
+_estadisticas = {"aciertos": 0, "fallos": 0, "verificaciones": 0}
+
+
+def _filtro_curva(nombre_curva: str, fecha_curva: date) -> Tuple:
+    return (PuntoCurva.nombre_curva == nombre_curva, PuntoCurva.fecha_curva == fecha_curva)
+
+
+def _consultar_version(db: Session, nombre_curva: str, fecha_curva: date) -> Tuple:
+    """Versión barata de la curva: (número de puntos, último fecha_registro)"""
+    return tuple(db.query(
+        func.count(PuntoCurva.id_punto),
+        func.max(PuntoCurva.fecha_registro)
+    ).filter(*_filtro_curva(nombre_curva, fecha_curva)).one())
+
+
+class CurvaRendimientoService:
+    """Servicio de curvas de rendimiento: almacenamiento, bootstrapping y caché"""
+
+    @staticmethod
+    def construir_curva(
+        puntos: Sequence[Tuple[Decimal, Decimal]],
+        nombre: Optional[str] = None,
+        fecha: Optional[date] = None,
+        frecuencia: int = FRECUENCIA_BOOTSTRAP
+    ) -> CurvaCeroCupon:
+        """
+        Bootstrapping de la curva cero cupón desde rendimientos par
+
+        Los rendimientos par se interpolan linealmente en cada fecha de pago
+        t_k = k / f. Un bono par de cupón c_k (por periodo) vale 1, así:
+
+            DF_k = (1 - c_k × Σ_{j<k} DF_j) / (1 + c_k)
+
+        Args:
+            puntos: Pares (plazo en años, rendimiento par %)
+            nombre, fecha: Identificación de la curva
+            frecuencia: Pagos al año de los bonos par de referencia
+
+        Returns:
+            CurvaCeroCupon con los factores de descuento en la grilla
+        """
+        if not puntos:
+            raise ValueError("La curva necesita al menos un punto")
+        ordenados = tuple(sorted((Decimal(p), Decimal(t)) for p, t in puntos))
+        plazos = np.array([float(p) for p, _ in ordenados])
+        tasas = np.array([float(t) for _, t in ordenados]) / 100.0
+        if plazos[0] <= 0:
+            raise ValueError("Los plazos deben ser mayores a cero")
+        if np.unique(plazos).size != plazos.size:
+            raise ValueError("Hay plazos repetidos en la curva")
+
+        num_nodos = max(1, int(np.ceil(plazos[-1] * frecuencia - 1e-9)))
+        tiempos = np.arange(1, num_nodos + 1, dtype=np.float64) / frecuencia
+        cupones = np.interp(tiempos, plazos, tasas) / frecuencia
+
+        factores = np.empty(num_nodos)
+        suma_factores = 0.0
+        for k in range(num_nodos):
+            factores[k] = (1.0 - cupones[k] * suma_factores) / (1.0 + cupones[k])
+            if factores[k] <= 0:
+                raise ValueError(f"La curva no admite factores de descuento positivos en t={tiempos[k]:.2f} años")
+            suma_factores += factores[k]
+
+        return CurvaCeroCupon(ordenados, tiempos, np.log(factores), nombre=nombre, fecha=fecha)
+
+    @staticmethod
+    def guardar_curva(
+        db: Session,
+        nombre_curva: str,
+        fecha_curva: date,
+        puntos: Sequence[Tuple[Decimal, Decimal]]
+    ) -> CurvaCeroCupon:
+        """
+        Reemplaza los puntos de la curva (nombre, fecha) y la reconstruye
+
+        La curva se valida (bootstrapping) antes de escribir en la BD y se
+        retorna reconstruida desde los puntos almacenados, igual que la
+        servirá cualquier otro worker.
+        """
+        validada = CurvaRendimientoService.construir_curva(puntos, nombre=nombre_curva, fecha=fecha_curva)
+
+        db.query(PuntoCurva).filter(
+            *_filtro_curva(nombre_curva, fecha_curva)
+        ).delete(synchronize_session=False)
+        db.add_all([
+            PuntoCurva(nombre_curva=nombre_curva, fecha_curva=fecha_curva, plazo_anios=plazo, tasa_par=tasa)
+            for plazo, tasa in validada.puntos
+        ])
+        db.commit()
+
+        # Se reconstruye con los valores tal como quedaron en la BD (redondeados)
+        with _lock:
+            _cache.pop((nombre_curva, fecha_curva), None)
+        return CurvaRendimientoService.obtener_curva(db, nombre_curva, fecha_curva)
+
+    @staticmethod
+    def obtener_curva(db: Session, nombre_curva: str, fecha_curva: date) -> CurvaCeroCupon:
+        """
+        Retorna la curva construida (desde caché o cargando sus puntos)
+
+        La versión de la curva en la BD sólo se consulta cada
+        CURVA_CACHE_SEGUNDOS; si cambió (curva re-registrada en cualquier
+        worker) se reconstruye desde los puntos almacenados.
+
+        Raises:
+            ValueError: Si no hay puntos para esa curva y fecha
+        """
+        llave = (nombre_curva, fecha_curva)
+        ahora = time.monotonic()
+        with _lock:
+            entrada = _cache.get(llave)
+            if entrada is not None and ahora - entrada[2] < settings.CURVA_CACHE_SEGUNDOS:
+                _cache.move_to_end(llave)
+                _estadisticas["aciertos"] += 1
+                return entrada[0]
+
+        if entrada is not None:
+            version = _consultar_version(db, nombre_curva, fecha_curva)
+            with _lock:
+                _estadisticas["verificaciones"] += 1
+                if version == entrada[1]:
+                    _cache[llave] = (entrada[0], version, ahora)
+                    _cache.move_to_end(llave)
+                    _estadisticas["aciertos"] += 1
+                    return entrada[0]
+
+        with _lock:
+            _estadisticas["fallos"] += 1
+        filas = db.query(PuntoCurva.plazo_anios, PuntoCurva.tasa_par, PuntoCurva.fecha_registro).filter(
+            *_filtro_curva(nombre_curva, fecha_curva)
+        ).all()
+        if not filas:
+            with _lock:
+                _cache.pop(llave, None)
+            raise ValueError(f"No hay curva '{nombre_curva}' para la fecha {fecha_curva}")
+
+        curva = CurvaRendimientoService.construir_curva(
+            [(plazo, tasa) for plazo, tasa, _ in filas], nombre=nombre_curva, fecha=fecha_curva
+        )
+        version = (len(filas), max(registro for _, _, registro in filas))
+        with _lock:
+            _cache[llave] = (curva, version, ahora)
+            _cache.move_to_end(llave)
+            while len(_cache) > MAX_CURVAS_EN_CACHE:
+                _cache.popitem(last=False)
+        return curva
+
+    @staticmethod
+    def describir_curva(curva: CurvaCeroCupon) -> Dict:
+        """Tabla de la curva en los plazos de entrada: tasa par, tasa cero y factor de descuento"""
+        plazos = np.array([float(p) for p, _ in curva.puntos])
+        factores = curva.factores_descuento(plazos)
+        tasas_cero = curva.tasas_cero(plazos)
+        return {
+            "nombre_curva": curva.nombre,
+            "fecha_curva": curva.fecha,
+            "puntos": [
+                {
+                    "plazo_anios": float(plazo),
+                    "tasa_par": float(tasa),
+                    "tasa_cero": round(float(tasas_cero[k]), 6),
+                    "factor_descuento": round(float(factores[k]), 10),
+                }
+                for k, (plazo, tasa) in enumerate(curva.puntos)
+            ],
+        }
+
+    @staticmethod
+    def estadisticas_cache() -> Dict:
+        """Retorna aciertos, fallos, verificaciones de versión y tamaño de la caché de curvas"""
+        with _lock:
+            return dict(_estadisticas, tamano=len(_cache), tamano_maximo=MAX_CURVAS_EN_CACHE)
+
+    @staticmethod
+    def limpiar_cache() -> None:
+        """Vacía la caché de curvas"""
+        with _lock:
+            _cache.clear()
+            for contador in _estadisticas:
+                _estadisticas[contador] = 0
@@ -0,0 +1,220 @@
+"""
+Pruebas de Estrés del Portafolio
+Aplica una matriz de escenarios (choques de TRM, tasas y precios) a todas las
+posiciones abiertas del usuario con operaciones sobre arreglos:
+- Posiciones cargadas una sola vez (una consulta agrupada por activo)
+- Bonos revalorados con el núcleo vectorizado (matriz bonos × escenarios)
+- Acciones/ETF con choque porcentual de precio, reemplazable por ticker
+- Activos en dólares con choque de TRM (la TRM cotiza USD/COP; otras monedas
+  extranjeras no se chocan y se reportan en las advertencias)
+"""
+from datetime import date
+from decimal import Decimal
+from typing import Dict, List, Optional
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models import Activo, Lote, TipoActivo
+from app.services.trm_service import MONEDA_TRM
+from app.services.valoracion_bonos_service import ValoracionBonosService
+
+MAX_ESCENARIOS = 100
+TIPOS_RENTA_VARIABLE = frozenset({'ACCION', 'ACCION_EXT', 'ETF'})
+TIPO_BONO = 'BONO'
+MONEDA_LOCAL = 'COP'
+CAMPOS_BONO = ('valor_nominal', 'tasa_cupon', 'frecuencia_cupon', 'fecha_emision', 'fecha_vencimiento')
+
+
+class EstresPortafolioService:
+    """Servicio de pruebas de estrés sobre las posiciones del usuario"""
+
+    @staticmethod
+    def cargar_posiciones(db: Session, id_usuario: UUID) -> List[Dict]:
+        """
+        Posiciones abiertas por activo con los datos necesarios para los choques
+
+        El valor actual usa la aproximación del resumen del portafolio:
+        precio de compra × cantidad disponible × TRM (en pesos).
+        """
+        filas = db.query(
+            Activo.ticker,
+            TipoActivo.nombre,
+            Activo.moneda,
+            Activo.valor_nominal,
+            Activo.tasa_cupon,
+            Activo.frecuencia_cupon,
+            Activo.fecha_emision,
+            Activo.fecha_vencimiento,
+            func.sum(Lote.cantidad_disponible * Lote.precio_compra * Lote.trm),
+        ).join(Activo, Lote.id_activo == Activo.id_activo).outerjoin(
+            TipoActivo, Activo.id_tipo_activo == TipoActivo.id_tipo_activo
+        ).filter(
+            Lote.id_usuario == id_usuario,
+            Lote.cantidad_disponible > 0
+        ).group_by(
+            Activo.id_activo, Activo.ticker, TipoActivo.nombre, Activo.moneda, Activo.valor_nominal,
+            Activo.tasa_cupon, Activo.frecuencia_cupon, Activo.fecha_emision, Activo.fecha_vencimiento
+        ).order_by(Activo.ticker).all()
+
+        return [
+            {
+                "ticker": ticker,
+                "tipo_activo": tipo,
+                "moneda": moneda or MONEDA_LOCAL,
+                "valor": float(valor),
+                "valor_nominal": nominal,
+                "tasa_cupon": tasa,
+                "frecuencia_cupon": frecuencia,
+                "fecha_emision": emision,
+                "fecha_vencimiento": vencimiento,
+            }
+            for ticker, tipo, moneda, nominal, tasa, frecuencia, emision, vencimiento, valor in filas
+        ]
+
+    @staticmethod
+    def _factores_bonos(
+        bonos: List[Dict],
+        choques_pb: np.ndarray,
+        fecha_valoracion: date,
+        tirs_base: Dict[str, Decimal]
+    ) -> Dict:
+        """
+        Razón precio sucio estresado / precio sucio base por bono y escenario
+
+        La TIR base de cada bono es la indicada en `tirs_base` o, por
+        defecto, su tasa cupón. Todas las celdas se valoran en una pasada.
+
+        Returns:
+            Dict con la matriz de factores (bonos × escenarios) y errores por bono
+        """
+        datos = ValoracionBonosService._preparar_bonos(bonos, fecha_valoracion)
+        base = np.array([
+            float(tirs_base.get(b["ticker"], b["tasa_cupon"])) for b in bonos
+        ]) / 100.0
+        tir_anual = base[:, None] + np.concatenate(([0.0], choques_pb))[None, :] / 10_000.0
+        if np.any(tir_anual / datos["frecuencia"][:, None] <= -1):
+            raise ValueError("El choque de tasas produce una TIR inválida")
+
+        precio_sucio = ValoracionBonosService._precio_limpio_vectorizado(
+            datos["nominal"][:, None],
+            datos["cupon"][:, None],
+            tir_anual / datos["frecuencia"][:, None],
+            datos["periodos"][:, None],
+        ) + datos["cupon_acumulado"][:, None]
+
+        validos = np.array([e is None for e in datos["errores"]])
+        factores = np.ones((len(bonos), choques_pb.size))
+        factores[validos] = precio_sucio[validos, 1:] / precio_sucio[validos, :1]
+        return {"factores": factores, "errores": datos["errores"]}
+
+    @staticmethod
+    def ejecutar_escenarios(
+        db: Session,
+        id_usuario: UUID,
+        escenarios: List[Dict],
+        fecha_valoracion: Optional[date] = None,
+        tirs_base: Optional[Dict[str, Decimal]] = None
+    ) -> Dict:
+        """
+        P&L del portafolio bajo cada escenario
+
+        Args:
+            escenarios: Lista de dicts con nombre, choque_trm (%), choque_tasas_pb,
+                        choque_acciones (%) y choques_activos {ticker: %}
+            fecha_valoracion: Fecha para revalorar los bonos (default: hoy)
+            tirs_base: TIR base (%) por ticker de bono (default: tasa cupón)
+
+        Returns:
+            Dict con valor inicial, posiciones y, por escenario, el valor
+            estresado y el P&L total y por activo
+        """
+        if not escenarios:
+            raise ValueError("Debe enviar al menos un escenario")
+        if len(escenarios) > MAX_ESCENARIOS:
+            raise ValueError(f"Máximo {MAX_ESCENARIOS} escenarios por solicitud")
+
+        posiciones = EstresPortafolioService.cargar_posiciones(db, id_usuario)
+        if not posiciones:
+            raise ValueError("El portafolio no tiene lotes abiertos")
+
+        fecha_valoracion = fecha_valoracion or date.today()
+        tickers = [p["ticker"] for p in posiciones]
+        valores = np.array([p["valor"] for p in posiciones])
+        es_variable = np.array([p["tipo_activo"] in TIPOS_RENTA_VARIABLE for p in posiciones])
+        es_dolar = np.array([p["moneda"] == MONEDA_TRM for p in posiciones])
+        indices_bonos = [
+            i for i, p in enumerate(posiciones)
+            if p["tipo_activo"] == TIPO_BONO and all(p[c] is not None for c in CAMPOS_BONO)
+        ]
+
+        choque_trm = np.array([float(e.get("choque_trm", 0)) for e in escenarios]) / 100.0
+        choque_acciones = np.array([float(e.get("choque_acciones", 0)) for e in escenarios]) / 100.0
+        choque_pb = np.array([float(e.get("choque_tasas_pb", 0)) for e in escenarios])
+
+        # Matrices activos × escenarios
+        factor_precio = np.where(es_variable[:, None], 1.0 + choque_acciones[None, :], 1.0)
+        advertencias = []
+        if np.any(choque_trm != 0):
+            advertencias.extend(
+                f"{p['ticker']}: moneda {p['moneda']} sin choque de TRM (la TRM cotiza USD/COP)"
+                for p in posiciones if p["moneda"] not in (MONEDA_LOCAL, MONEDA_TRM)
+            )
+        advertencias.extend(
+            f"{p['ticker']}: bono sin {', '.join(c for c in CAMPOS_BONO if p[c] is None)}; se mantiene su valor"
+            for p in posiciones
+            if p["tipo_activo"] == TIPO_BONO and any(p[c] is None for c in CAMPOS_BONO)
+        )
+        if indices_bonos:
+            bonos = EstresPortafolioService._factores_bonos(
+                [posiciones[i] for i in indices_bonos], choque_pb, fecha_valoracion, tirs_base or {}
+            )
+            factor_precio[indices_bonos] = bonos["factores"]
+            advertencias.extend(
+                f"{posiciones[i]['ticker']}: {error}; se mantiene su valor"
+                for i, error in zip(indices_bonos, bonos["errores"]) if error
+            )
+
+        posicion_ticker = {t: i for i, t in enumerate(tickers)}
+        for j, escenario in enumerate(escenarios):
+            for ticker, choque in (escenario.get("choques_activos") or {}).items():
+                if ticker not in posicion_ticker:
+                    raise ValueError(f"El activo {ticker} del escenario '{escenario['nombre']}' no está en el portafolio")
+                factor_precio[posicion_ticker[ticker], j] = 1.0 + float(choque) / 100.0
+
+        if np.any(factor_precio < 0) or np.any(choque_trm <= -1):
+            raise ValueError("Los choques no pueden llevar precios o TRM por debajo de cero")
+
+        factor_trm = np.where(es_dolar[:, None], 1.0 + choque_trm[None, :], 1.0)
+        pnl = valores[:, None] * (factor_precio * factor_trm - 1.0)
+        valor_inicial = float(valores.sum())
+        pnl_total = pnl.sum(axis=0)
+
+        resultados = [
+            {
+                "nombre": escenario["nombre"],
+                "valor_estresado": round(valor_inicial + float(pnl_total[j]), 2),
+                "pnl": round(float(pnl_total[j]), 2),
+                "pnl_porcentaje": round(float(pnl_total[j]) / valor_inicial * 100, 4) if valor_inicial else 0.0,
+                "por_activo": [
+                    {"ticker": tickers[i], "pnl": round(float(pnl[i, j]), 2)}
+                    for i in range(len(tickers))
+                ],
+            }
+            for j, escenario in enumerate(escenarios)
+        ]
+
+        return {
+            "fecha_valoracion": fecha_valoracion,
+            "valor_inicial": round(valor_inicial, 2),
+            "posiciones": [
+                {"ticker": p["ticker"], "tipo_activo": p["tipo_activo"], "moneda": p["moneda"],
+                 "valor": round(p["valor"], 2)}
+                for p in posiciones
+            ],
+            "escenarios": resultados,
+            "peor_escenario": min(resultados, key=lambda r: r["pnl"])["nombre"],
+            "advertencias": advertencias,
+        }
@@ -0,0 +1,214 @@
+"""
+Historial de Cálculos de Bonos (write-behind)
+Saca del camino de la petición el registro de CalculoBono:
+- Cola en proceso, vaciada con inserciones masivas por tamaño o por tiempo
+- Vaciado final al apagar la aplicación
+- Escritura síncrona de respaldo si la cola no está activa o está llena
+- Un bloque rechazado se reintenta fila por fila; las filas que fallan
+  HISTORIAL_MAX_INTENTOS veces se descartan con log
+"""
+import logging
+import threading
+import uuid
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import CalculoBono
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_pendientes: List[Dict] = []
+_despertar = threading.Event()
+_detener = threading.Event()
+_hilo: Optional[threading.Thread] = None
+_fabrica_sesiones: Optional[Callable[[], Session]] = None
+_intentos: Dict[uuid.UUID, int] = {}
+_estadisticas = {
+    "encolados": 0, "escritos": 0, "vaciados": 0, "sincronos": 0, "errores": 0, "descartados": 0,
+}
+
+
+def _tomar_pendientes() -> List[Dict]:
+    global _pendientes
+    with _lock:
+        registros, _pendientes = _pendientes, []
+    return registros
+
+
+def _insertar_uno_a_uno(db: Session, registros: List[Dict]) -> List[Dict]:
+    """Inserta cada registro en su propia transacción; retorna los que fallaron"""
+    fallidos = []
+    for registro in registros:
+        try:
+            db.execute(insert(CalculoBono), [registro])
+            db.commit()
+        except Exception:
+            db.rollback()
+            fallidos.append(registro)
+    return fallidos
+
+
+def _reencolar(fallidos: List[Dict]) -> None:
+    """
+    Devuelve a la cola los registros con intentos restantes, sin superar
+    HISTORIAL_MAX_PENDIENTES; los demás se descartan y se registran en el log
+    """
+    reintentar, descartados = [], []
+    with _lock:
+        espacio = max(settings.HISTORIAL_MAX_PENDIENTES - len(_pendientes), 0)
+        for registro in fallidos:
+            intentos = _intentos.pop(registro["id_calculo"], 0) + 1
+            if intentos < settings.HISTORIAL_MAX_INTENTOS and len(reintentar) < espacio:
+                _intentos[registro["id_calculo"]] = intentos
+                reintentar.append(registro)
+            else:
+                descartados.append(registro)
+        _pendientes[:0] = reintentar
+        _estadisticas["descartados"] += len(descartados)
+
+    if descartados:
+        logger.error(
+            "Historial de cálculos: %d registros descartados (ids: %s)",
+            len(descartados), ", ".join(str(r["id_calculo"]) for r in descartados)
+        )
+
+
+def _vaciar() -> int:
+    """
+    Inserta en bloque lo pendiente
+
+    Si el bloque falla se reintenta registro por registro, para que una fila
+    que la BD rechaza no bloquee a las demás; las fallidas vuelven a la cola
+    hasta HISTORIAL_MAX_INTENTOS veces y luego se descartan con log.
+    """
+    registros = _tomar_pendientes()
+    if not registros:
+        return 0
+
+    db = _fabrica_sesiones()
+    try:
+        try:
+            db.execute(insert(CalculoBono), registros)
+            db.commit()
+            fallidos = []
+        except Exception:
+            db.rollback()
+            logger.exception("No se pudo escribir el historial de cálculos en bloque (%d registros)", len(registros))
+            with _lock:
+                _estadisticas["errores"] += 1
+            fallidos = _insertar_uno_a_uno(db, registros)
+    finally:
+        db.close()
+
+    escritos = len(registros) - len(fallidos)
+    ids_fallidos = {r["id_calculo"] for r in fallidos}
+    with _lock:
+        _estadisticas["escritos"] += escritos
+        _estadisticas["vaciados"] += 1
+        for registro in registros:
+            if registro["id_calculo"] not in ids_fallidos:
+                _intentos.pop(registro["id_calculo"], None)
+    if fallidos:
+        _reencolar(fallidos)
+    return escritos
+
+
+def _ciclo_vaciado() -> None:
+    while not _detener.is_set():
+        _despertar.wait(settings.HISTORIAL_INTERVALO_SEGUNDOS)
+        _despertar.clear()
+        _vaciar()
+
+
+class HistorialCalculosService:
+    """Registro diferido (write-behind) de cálculos de bonos"""
+
+    @staticmethod
+    def iniciar(fabrica_sesiones: Optional[Callable[[], Session]]) -> None:
+        """
+        Arranca el hilo de vaciado (se llama al iniciar la aplicación)
+
+        Args:
+            fabrica_sesiones: Callable que retorna una sesión nueva (SessionLocal);
+                con None no se arranca y el historial se escribe de forma síncrona
+        """
+        global _hilo, _fabrica_sesiones
+        if fabrica_sesiones is None or not settings.HISTORIAL_WRITE_BEHIND_HABILITADO or _hilo is not None:
+            return
+        _fabrica_sesiones = fabrica_sesiones
+        _detener.clear()
+        _hilo = threading.Thread(target=_ciclo_vaciado, name="historial-calculos", daemon=True)
+        _hilo.start()
+
+    @staticmethod
+    def detener() -> None:
+        """
+        Detiene el hilo y escribe todo lo pendiente (se llama al apagar)
+
+        Los registros rechazados se reintentan hasta agotar sus intentos; los
+        que no se pueden escribir quedan descartados en el log, no en silencio.
+        """
+        global _hilo
+        if _hilo is None:
+            return
+        _detener.set()
+        _despertar.set()
+        _hilo.join()
+        _hilo = None
+        while _pendientes:
+            _vaciar()
+
+    @staticmethod
+    def activo() -> bool:
+        """Indica si el write-behind está recibiendo registros"""
+        return _hilo is not None
+
+    @staticmethod
+    def registrar(db: Session, **valores) -> uuid.UUID:
+        """
+        Registra un CalculoBono sin esperar el commit si la cola está activa
+
+        El id se genera aquí para poder retornarlo de inmediato. Si la cola
+        no está activa o supera HISTORIAL_MAX_PENDIENTES, se escribe de forma
+        síncrona con la sesión de la petición.
+
+        Args:
+            db: Sesión de la petición (sólo para el respaldo síncrono)
+            **valores: Columnas de CalculoBono
+
+        Returns:
+            id_calculo del registro
+        """
+        valores.setdefault("id_calculo", uuid.uuid4())
+
+        if HistorialCalculosService.activo():
+            with _lock:
+                if len(_pendientes) < settings.HISTORIAL_MAX_PENDIENTES:
+                    _pendientes.append(valores)
+                    _estadisticas["encolados"] += 1
+                    if len(_pendientes) >= settings.HISTORIAL_LOTE_TAMANO:
+                        _despertar.set()
+                    return valores["id_calculo"]
+
+        db.add(CalculoBono(**valores))
+        db.commit()
+        with _lock:
+            _estadisticas["sincronos"] += 1
+        return valores["id_calculo"]
+
+    @staticmethod
+    def vaciar() -> int:
+        """Fuerza la escritura de lo pendiente; retorna el número de registros escritos"""
+        if _fabrica_sesiones is None:
+            return 0
+        return _vaciar()
+
+    @staticmethod
+    def estadisticas() -> Dict:
+        """Retorna contadores de la cola y registros pendientes"""
+        with _lock:
+            return dict(_estadisticas, pendientes=len(_pendientes), activo=_hilo is not None)
@@ -1,20 +1,96 @@
 """
 Servicio de Gestión de Lotes - Sistema de Inventario
 Implementa la lógica de compra/venta con sistema de semáforo (Verde/Amarillo/Rojo)
+
+Cada operación actualiza la tabla de posiciones en la misma transacción.
+
+Concurrencia: las filas que se modifican se bloquean con SELECT ... FOR UPDATE
+siempre en el mismo orden (lotes en orden FIFO, después la caja y por último
+las posiciones), así que
+operaciones de distintos usuarios o activos no se bloquean entre sí y no hay
+ciclos de espera. Los endpoints envuelven cada operación en `con_reintentos`.
 """
 from decimal import Decimal
 from typing import List, Optional, Dict
-from datetime import datetime
+from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, or_, func, insert
 
 from app.models import Lote, Transaccion, CajaAhorros, Activo, EstadoLote, TipoOperacion
+from app.services.posicion_service import (
+    PosicionService, acumular_compra, acumular_venta, nuevos_deltas
+)
 import uuid
 
+# Ventanas de la lectura FIFO: la primera es pequeña y se duplican hasta el máximo
+VENTANA_FIFO_INICIAL = 16
+VENTANA_FIFO_MAXIMA = 1024
+
 
 class LoteService:
     """Servicio para gestión de lotes de activos"""
     
+    @staticmethod
+    def _bloquear_caja(db: Session, id_usuario: uuid.UUID) -> Optional[CajaAhorros]:
+        """Lee la caja del usuario con SELECT ... FOR UPDATE (último lock de la transacción)"""
+        return db.query(CajaAhorros).filter(
+            CajaAhorros.id_usuario == id_usuario
+        ).with_for_update().populate_existing().first()
+    
+    @staticmethod
+    def _cantidad_disponible(db: Session, id_usuario: uuid.UUID, id_activo: uuid.UUID) -> Decimal:
+        """Cantidad abierta del activo (SUM en la BD, sin cargar lotes)"""
+        return db.query(func.coalesce(func.sum(Lote.cantidad_disponible), 0)).filter(
+            Lote.id_usuario == id_usuario,
+            Lote.id_activo == id_activo,
+            Lote.cantidad_disponible > 0
+        ).scalar()
+
+    @staticmethod
+    def _lotes_fifo(
+        db: Session,
+        id_usuario: uuid.UUID,
+        id_activo: uuid.UUID,
+        cantidad: Decimal
+    ) -> List[Lote]:
+        """
+        Lotes abiertos en orden FIFO, sólo los necesarios para cubrir `cantidad`
+
+        Se leen y bloquean (FOR UPDATE) por ventanas con paginación por llave
+        (fecha_compra, id_lote); id_lote desempata compras simultáneas para
+        que el orden de locks sea total. Retorna menos cantidad que la pedida
+        si no hay suficiente.
+        """
+        lotes = []
+        acumulado = Decimal('0')
+        ultimo = None
+        ventana = VENTANA_FIFO_INICIAL
+        while acumulado < cantidad:
+            consulta = db.query(Lote).filter(
+                Lote.id_usuario == id_usuario,
+                Lote.id_activo == id_activo,
+                Lote.cantidad_disponible > 0
+            )
+            if ultimo is not None:
+                consulta = consulta.filter(or_(
+                    Lote.fecha_compra > ultimo.fecha_compra,
+                    and_(Lote.fecha_compra == ultimo.fecha_compra, Lote.id_lote > ultimo.id_lote)
+                ))
+            bloque = consulta.order_by(
+                Lote.fecha_compra.asc(), Lote.id_lote.asc()
+            ).limit(ventana).with_for_update().populate_existing().all()
+
+            for lote in bloque:
+                lotes.append(lote)
+                acumulado += lote.cantidad_disponible
+                if acumulado >= cantidad:
+                    break
+            if len(bloque) < ventana:
+                break
+            ultimo = bloque[-1]
+            ventana = min(ventana * 2, VENTANA_FIFO_MAXIMA)
+        return lotes
+
     @staticmethod
     def comprar_activo(
         db: Session,
@@ -54,10 +130,8 @@ class LoteService:
         if precio_compra <= 0:
             raise ValueError("El precio debe ser mayor a cero")
         
-        # Obtener caja de ahorros
-        caja = db.query(CajaAhorros).filter(
-            CajaAhorros.id_usuario == id_usuario
-        ).first()
+        # Bloquear la caja: el saldo no puede cambiar entre la validación y el retiro
+        caja = LoteService._bloquear_caja(db, id_usuario)
         
         if not caja:
             raise ValueError("No se encontró la caja de ahorros del usuario")
@@ -116,6 +190,12 @@ class LoteService:
         )
         
         db.add(transaccion)
+        
+        # Actualizar la posición del activo
+        deltas = nuevos_deltas()
+        acumular_compra(deltas, id_activo, cantidad, precio_compra, trm, costo_total)
+        PosicionService.aplicar(db, id_usuario, deltas)
+        
         db.commit()
         db.refresh(nuevo_lote)
         db.refresh(transaccion)
@@ -125,7 +205,382 @@ class LoteService:
             "transaccion": transaccion,
             "mensaje": f"Compra exitosa. Lote {nuevo_lote.id_lote} creado en estado VERDE"
         }
-    
+
+    @staticmethod
+    def _costear_compras(compras: List[Dict]) -> List[Decimal]:
+        """Valida cada compra y retorna su costo: (cantidad * precio * TRM) + comisión"""
+        costos = []
+        for indice, compra in enumerate(compras):
+            if compra["cantidad"] <= 0:
+                raise ValueError(f"Compra {indice}: la cantidad debe ser mayor a cero")
+            if compra["precio_compra"] <= 0:
+                raise ValueError(f"Compra {indice}: el precio debe ser mayor a cero")
+            costos.append(
+                compra["cantidad"] * compra["precio_compra"] * compra.get("trm", Decimal('1'))
+                + compra.get("comision", Decimal('0'))
+            )
+        return costos
+
+    @staticmethod
+    def _obtener_tickers(db: Session, ids_activos) -> Dict[uuid.UUID, str]:
+        """Ticker de cada activo en una consulta; falla si alguno no existe"""
+        tickers = dict(
+            db.query(Activo.id_activo, Activo.ticker).filter(Activo.id_activo.in_(set(ids_activos)))
+        )
+        faltantes = set(ids_activos) - tickers.keys()
+        if faltantes:
+            raise ValueError(f"Activo no encontrado: {sorted(str(i) for i in faltantes)[0]}")
+        return tickers
+
+    @staticmethod
+    def _filas_compras(
+        id_usuario: uuid.UUID,
+        compras: List[Dict],
+        costos: List[Decimal],
+        saldo: Decimal,
+        ahora: datetime
+    ) -> Dict:
+        """
+        Filas de lotes y transacciones para INSERT masivo
+
+        El saldo de la caja se encadena compra a compra a partir de `saldo`.
+        La compra i se fecha en `ahora` + i µs: FIFO ordena por fecha_compra
+        y el id_lote aleatorio no conserva el orden de la solicitud.
+        """
+        filas_lotes = []
+        filas_transacciones = []
+        resultados = []
+        for indice, (compra, costo) in enumerate(zip(compras, costos)):
+            id_lote = uuid.uuid4()
+            id_transaccion = uuid.uuid4()
+            fecha = ahora + timedelta(microseconds=indice)
+            comision = compra.get("comision", Decimal('0'))
+            trm = compra.get("trm", Decimal('1'))
+            filas_lotes.append({
+                "id_lote": id_lote,
+                "id_usuario": id_usuario,
+                "id_activo": compra["id_activo"],
+                "cantidad_inicial": compra["cantidad"],
+                "cantidad_disponible": compra["cantidad"],
+                "precio_compra": compra["precio_compra"],
+                "comision_compra": comision,
+                "trm": trm,
+                "costo_total": costo,
+                "fecha_compra": fecha,
+                "estado": EstadoLote.VERDE.value,
+                "url_evidencia": compra.get("url_evidencia"),
+                "notas": compra.get("notas"),
+            })
+            filas_transacciones.append({
+                "id_transaccion": id_transaccion,
+                "id_usuario": id_usuario,
+                "id_activo": compra["id_activo"],
+                "tipo_operacion": TipoOperacion.COMPRA.value,
+                "cantidad": compra["cantidad"],
+                "precio": compra["precio_compra"],
+                "comision": comision,
+                "trm": trm,
+                "monto_operacion": costo,
+                "saldo_caja_antes": saldo,
+                "saldo_caja_despues": saldo - costo,
+                "fecha_transaccion": fecha,
+                "id_lote": id_lote,
+                "url_evidencia": compra.get("url_evidencia"),
+                "notas": compra.get("notas"),
+            })
+            resultados.append({
+                "indice": indice,
+                "id_activo": compra["id_activo"],
+                "id_lote": id_lote,
+                "id_transaccion": id_transaccion,
+                "cantidad": compra["cantidad"],
+                "costo_total": costo,
+                "saldo_caja_antes": saldo,
+                "saldo_caja_despues": saldo - costo,
+            })
+            saldo -= costo
+        return {
+            "lotes": filas_lotes,
+            "transacciones": filas_transacciones,
+            "resultados": resultados,
+            "saldo_final": saldo,
+        }
+
+    @staticmethod
+    def _deltas_compras(filas_lotes: List[Dict]) -> Dict:
+        """Deltas de posiciones de los lotes nuevos de una compra masiva"""
+        deltas = nuevos_deltas()
+        for fila in filas_lotes:
+            acumular_compra(deltas, fila["id_activo"], fila["cantidad_inicial"],
+                            fila["precio_compra"], fila["trm"], fila["costo_total"])
+        return deltas
+
+    @staticmethod
+    def comprar_activos_lote(
+        db: Session,
+        id_usuario: uuid.UUID,
+        compras: List[Dict]
+    ) -> Dict:
+        """
+        Ejecuta muchas compras en una sola transacción (todo o nada)
+
+        Valida el costo total contra la caja una sola vez e inserta todos los
+        lotes y transacciones con dos INSERT masivos. Cada compra registra el
+        saldo de la caja antes y después, como si se ejecutaran en orden.
+
+        Args:
+            db: Sesión de base de datos
+            id_usuario: UUID del usuario
+            compras: Lista de dicts con id_activo, cantidad, precio_compra y,
+                     opcionales, comision, trm, url_evidencia y notas
+
+        Returns:
+            Dict con el costo total, saldos y el resultado de cada compra
+
+        Raises:
+            ValueError: Si alguna compra es inválida o no hay saldo para el total
+        """
+        if not compras:
+            raise ValueError("Debe enviar al menos una compra")
+
+        # Validar y costear todas las compras antes de tocar la caja
+        costos = LoteService._costear_compras(compras)
+        LoteService._obtener_tickers(db, [compra["id_activo"] for compra in compras])
+
+        caja = LoteService._bloquear_caja(db, id_usuario)
+        if not caja:
+            raise ValueError("No se encontró la caja de ahorros del usuario")
+
+        costo_total = sum(costos, Decimal('0'))
+        if not caja.tiene_saldo_suficiente(costo_total):
+            raise ValueError(
+                f"Saldo insuficiente. Disponible: {caja.saldo_actual}, "
+                f"Requerido: {costo_total}"
+            )
+
+        saldo_anterior = caja.saldo_actual
+        filas = LoteService._filas_compras(id_usuario, compras, costos, saldo_anterior, datetime.utcnow())
+
+        if not caja.retirar(costo_total):
+            raise ValueError("Error al retirar el dinero de la caja")
+        db.execute(insert(Lote), filas["lotes"])
+        db.execute(insert(Transaccion), filas["transacciones"])
+        PosicionService.aplicar(db, id_usuario, LoteService._deltas_compras(filas["lotes"]))
+        db.commit()
+
+        return {
+            "total_compras": len(compras),
+            "costo_total": costo_total,
+            "saldo_anterior": saldo_anterior,
+            "saldo_nuevo": caja.saldo_actual,
+            "resultados": filas["resultados"],
+            "mensaje": f"Compra masiva exitosa. {len(compras)} lotes creados en estado VERDE"
+        }
+
+    @staticmethod
+    def rebalancear(
+        db: Session,
+        id_usuario: uuid.UUID,
+        ventas: List[Dict],
+        compras: List[Dict],
+        simular: bool = False
+    ) -> Dict:
+        """
+        Ejecuta una canasta de órdenes: primero las ventas (FIFO), luego las compras
+
+        La disponibilidad se valida con un agregado y de cada activo vendido
+        se leen (y bloquean) sólo los lotes que consumen las ventas, junto con
+        la caja, una sola vez; las ventas se aplican en memoria, las
+        compras se validan contra el saldo resultante y todo se escribe en un
+        único commit, con las transacciones y lotes nuevos en INSERT masivos.
+        Con `simular=True` se calcula el resultado sin escribir nada.
+
+        Args:
+            db: Sesión de base de datos
+            id_usuario: UUID del usuario
+            ventas: Lista de dicts con id_activo, cantidad, precio_venta y,
+                    opcionales, comision, trm, url_evidencia y notas
+            compras: Lista de dicts como en `comprar_activos_lote`
+            simular: Si True no se escribe nada (dry-run)
+
+        Returns:
+            Dict con saldos, resultado de cada venta y compra y las posiciones
+            resultantes por activo
+
+        Raises:
+            ValueError: Si alguna orden es inválida, no hay cantidad para una
+                        venta o el saldo tras las ventas no cubre las compras
+        """
+        if not ventas and not compras:
+            raise ValueError("Debe enviar al menos una orden")
+
+        for indice, venta in enumerate(ventas):
+            if venta["cantidad"] <= 0:
+                raise ValueError(f"Venta {indice}: la cantidad debe ser mayor a cero")
+            if venta["precio_venta"] <= 0:
+                raise ValueError(f"Venta {indice}: el precio debe ser mayor a cero")
+        costos = LoteService._costear_compras(compras)
+
+        ids_vendidos = {venta["id_activo"] for venta in ventas}
+        ids_afectados = ids_vendidos | {compra["id_activo"] for compra in compras}
+        tickers = LoteService._obtener_tickers(db, ids_afectados)
+        cantidades_anteriores = dict(
+            db.query(Lote.id_activo, func.sum(Lote.cantidad_disponible)).filter(
+                Lote.id_usuario == id_usuario,
+                Lote.id_activo.in_(ids_afectados),
+                Lote.cantidad_disponible > 0
+            ).group_by(Lote.id_activo)
+        )
+
+        # Disponibilidad con el agregado: ninguna venta acumulada puede superar lo abierto
+        solicitado: Dict[uuid.UUID, Decimal] = {}
+        for indice, venta in enumerate(ventas):
+            id_activo = venta["id_activo"]
+            solicitado[id_activo] = solicitado.get(id_activo, Decimal('0')) + venta["cantidad"]
+            disponible = cantidades_anteriores.get(id_activo, Decimal('0'))
+            if solicitado[id_activo] > disponible:
+                raise ValueError(
+                    f"Venta {indice}: cantidad insuficiente de {tickers[id_activo]}. "
+                    f"Disponible: {disponible - solicitado[id_activo] + venta['cantidad']}, "
+                    f"Solicitado: {venta['cantidad']}"
+                )
+
+        # Sólo los lotes que consumen las ventas, bloqueados en orden FIFO por
+        # activo (activos en orden de id) y antes que la caja
+        lotes_por_activo: Dict[uuid.UUID, List[Lote]] = {}
+        for id_activo in sorted(solicitado, key=str):
+            lotes = LoteService._lotes_fifo(db, id_usuario, id_activo, solicitado[id_activo])
+            if sum((l.cantidad_disponible for l in lotes), Decimal('0')) < solicitado[id_activo]:
+                raise ValueError(f"Cantidad insuficiente de {tickers[id_activo]}: cambió durante la operación")
+            lotes_por_activo[id_activo] = lotes
+
+        caja = LoteService._bloquear_caja(db, id_usuario)
+        if not caja:
+            raise ValueError("No se encontró la caja de ahorros del usuario")
+
+        saldo_anterior = caja.saldo_actual
+        saldo = saldo_anterior
+        ahora = datetime.utcnow()
+        restantes = {l.id_lote: l.cantidad_disponible for lotes in lotes_por_activo.values() for l in lotes}
+        consumos = []              # (lote, cantidad) en el orden en que se venden
+        filas_ventas = []
+        resultados_ventas = []
+
+        for indice, venta in enumerate(ventas):
+            cantidad_venta = venta["cantidad"]
+            lotes = lotes_por_activo[venta["id_activo"]]
+            comision = venta.get("comision", Decimal('0'))
+            trm = venta.get("trm", Decimal('1'))
+            monto_venta = (cantidad_venta * venta["precio_venta"] * trm) - comision
+            cantidad_restante = cantidad_venta
+            lotes_afectados = []
+            for lote in lotes:
+                if cantidad_restante <= 0:
+                    break
+                cantidad_de_este_lote = min(cantidad_restante, restantes[lote.id_lote])
+                if cantidad_de_este_lote <= 0:
+                    continue
+                restantes[lote.id_lote] -= cantidad_de_este_lote
+                consumos.append((lote, cantidad_de_este_lote))
+
+                proporcion = cantidad_de_este_lote / cantidad_venta
+                monto_este_lote = monto_venta * proporcion
+                filas_ventas.append({
+                    "id_transaccion": uuid.uuid4(),
+                    "id_usuario": id_usuario,
+                    "id_activo": venta["id_activo"],
+                    "tipo_operacion": TipoOperacion.VENTA.value,
+                    "cantidad": cantidad_de_este_lote,
+                    "precio": venta["precio_venta"],
+                    "comision": comision * proporcion,
+                    "trm": trm,
+                    "monto_operacion": monto_este_lote,
+                    "saldo_caja_antes": saldo,
+                    "saldo_caja_despues": saldo + monto_este_lote,
+                    "fecha_transaccion": ahora,
+                    "id_lote": lote.id_lote,
+                    "url_evidencia": venta.get("url_evidencia"),
+                    "notas": venta.get("notas") or f"Venta FIFO - Lote {lote.id_lote}",
+                })
+                saldo += monto_este_lote
+                lotes_afectados.append({
+                    "id_lote": lote.id_lote,
+                    "cantidad_vendida": cantidad_de_este_lote,
+                    "cantidad_restante": restantes[lote.id_lote],
+                    "estado_nuevo": (
+                        EstadoLote.AMARILLO if restantes[lote.id_lote] > 0 else EstadoLote.ROJO
+                    ).value,
+                })
+                cantidad_restante -= cantidad_de_este_lote
+
+            resultados_ventas.append({
+                "indice": indice,
+                "id_activo": venta["id_activo"],
+                "cantidad": cantidad_venta,
+                "monto_total": monto_venta,
+                "lotes_afectados": lotes_afectados,
+            })
+
+        total_ventas = saldo - saldo_anterior
+        costo_compras = sum(costos, Decimal('0'))
+        if saldo < costo_compras:
+            raise ValueError(
+                f"Saldo insuficiente tras las ventas. Disponible: {saldo}, "
+                f"Requerido: {costo_compras}"
+            )
+        filas_compras = LoteService._filas_compras(id_usuario, compras, costos, saldo, ahora)
+        saldo_nuevo = filas_compras["saldo_final"]
+
+        cantidades_nuevas = {i: cantidades_anteriores.get(i, Decimal('0')) for i in ids_afectados}
+        for venta in ventas:
+            cantidades_nuevas[venta["id_activo"]] -= venta["cantidad"]
+        for compra in compras:
+            cantidades_nuevas[compra["id_activo"]] += compra["cantidad"]
+
+        if simular:
+            db.rollback()  # Libera los locks; no se escribió nada
+            for resultado in filas_compras["resultados"]:
+                resultado["id_lote"] = resultado["id_transaccion"] = None
+        else:
+            deltas = LoteService._deltas_compras(filas_compras["lotes"])
+            for lote, cantidad in consumos:
+                acumular_venta(deltas, lote, cantidad)
+                if not lote.restar_cantidad(cantidad):
+                    raise ValueError(f"Error al procesar el lote {lote.id_lote}")
+            caja.depositar(total_ventas)
+            if not caja.retirar(costo_compras):
+                raise ValueError("Error al retirar el dinero de la caja")
+            if filas_ventas:
+                db.execute(insert(Transaccion), filas_ventas)
+            if filas_compras["lotes"]:
+                db.execute(insert(Lote), filas_compras["lotes"])
+                db.execute(insert(Transaccion), filas_compras["transacciones"])
+            PosicionService.aplicar(db, id_usuario, deltas)
+            db.commit()
+
+        return {
+            "simulacion": simular,
+            "saldo_anterior": saldo_anterior,
+            "total_ventas": total_ventas,
+            "total_compras": costo_compras,
+            "saldo_nuevo": saldo_nuevo,
+            "ventas": resultados_ventas,
+            "compras": filas_compras["resultados"],
+            "posiciones": [
+                {
+                    "id_activo": id_activo,
+                    "ticker": tickers[id_activo],
+                    "cantidad_anterior": cantidades_anteriores.get(id_activo, Decimal('0')),
+                    "cantidad_nueva": cantidades_nuevas[id_activo],
+                }
+                for id_activo in sorted(ids_afectados, key=lambda i: tickers[i])
+            ],
+            "mensaje": (
+                f"{'Simulación de rebalanceo' if simular else 'Rebalanceo exitoso'}: "
+                f"{len(ventas)} ventas y {len(compras)} compras"
+            )
+        }
+
     @staticmethod
     def vender_activo(
         db: Session,
@@ -166,33 +621,30 @@ class LoteService:
         if precio_venta <= 0:
             raise ValueError("El precio debe ser mayor a cero")
         
-        # Obtener lotes disponibles (FIFO - más antiguos primero)
-        lotes_disponibles = db.query(Lote).filter(
-            and_(
-                Lote.id_usuario == id_usuario,
-                Lote.id_activo == id_activo,
-                Lote.cantidad_disponible > 0
-            )
-        ).order_by(Lote.fecha_compra.asc()).all()
+        # Verificar cantidad total disponible con un agregado (sin cargar lotes)
+        cantidad_total_disponible = LoteService._cantidad_disponible(db, id_usuario, id_activo)
         
-        if not lotes_disponibles:
+        if cantidad_total_disponible <= 0:
             raise ValueError("No hay lotes disponibles para este activo")
         
-        # Verificar cantidad total disponible
-        cantidad_total_disponible = sum(
-            lote.cantidad_disponible for lote in lotes_disponibles
-        )
-        
         if cantidad_total_disponible < cantidad_venta:
             raise ValueError(
                 f"Cantidad insuficiente. Disponible: {cantidad_total_disponible}, "
                 f"Solicitado: {cantidad_venta}"
             )
         
-        # Obtener caja de ahorros
-        caja = db.query(CajaAhorros).filter(
-            CajaAhorros.id_usuario == id_usuario
-        ).first()
+        # Obtener y bloquear sólo los lotes que consume la venta (FIFO - más antiguos primero)
+        lotes_disponibles = LoteService._lotes_fifo(db, id_usuario, id_activo, cantidad_venta)
+        cantidad_bloqueada = sum((lote.cantidad_disponible for lote in lotes_disponibles), Decimal('0'))
+        if cantidad_bloqueada < cantidad_venta:
+            # Otra operación vendió entre el agregado y el bloqueo
+            raise ValueError(
+                f"Cantidad insuficiente. Disponible: {cantidad_bloqueada}, "
+                f"Solicitado: {cantidad_venta}"
+            )
+        
+        # Bloquear la caja después de los lotes (orden consistente de locks)
+        caja = LoteService._bloquear_caja(db, id_usuario)
         
         if not caja:
             raise ValueError("No se encontró la caja de ahorros del usuario")
@@ -205,6 +657,7 @@ class LoteService:
         cantidad_restante = cantidad_venta
         lotes_afectados = []
         transacciones_creadas = []
+        deltas = nuevos_deltas()
         
         for lote in lotes_disponibles:
             if cantidad_restante <= 0:
@@ -214,11 +667,13 @@ class LoteService:
             cantidad_de_este_lote = min(cantidad_restante, lote.cantidad_disponible)
             
             # Restar cantidad del lote (actualiza estado automáticamente)
+            estado_anterior = lote.estado
+            acumular_venta(deltas, lote, cantidad_de_este_lote)
             if lote.restar_cantidad(cantidad_de_este_lote):
                 lotes_afectados.append({
                     "id_lote": lote.id_lote,
                     "cantidad_vendida": cantidad_de_este_lote,
-                    "estado_anterior": lote.estado,
+                    "estado_anterior": estado_anterior,
                     "estado_nuevo": lote.calcular_estado().value,
                     "cantidad_restante": lote.cantidad_disponible
                 })
@@ -252,12 +707,13 @@ class LoteService:
             else:
                 raise ValueError(f"Error al procesar el lote {lote.id_lote}")
         
-        # Agregar dinero a la caja
+        # Agregar dinero a la caja y actualizar la posición
         caja.depositar(monto_venta)
+        PosicionService.aplicar(db, id_usuario, deltas)
         
         db.commit()
         
-        # Refrescar objetos
+        # Refrescar sólo los lotes modificados (todos los leídos se consumen)
         for lote in lotes_disponibles:
             db.refresh(lote)
         db.refresh(caja)
@@ -318,51 +774,25 @@ class LoteService:
         Returns:
             Lista de diccionarios con resumen por activo
         """
-        lotes = db.query(Lote).filter(
-            and_(
-                Lote.id_usuario == id_usuario,
-                Lote.cantidad_disponible > 0
-            )
-        ).all()
-        
-        # Agrupar por activo
-        resumen = {}
-        for lote in lotes:
-            activo_id = str(lote.id_activo)
-            
-            if activo_id not in resumen:
-                resumen[activo_id] = {
-                    "activo": lote.activo,
-                    "cantidad_total": Decimal('0'),
-                    "inversion_total": Decimal('0'),
-                    "precio_promedio": Decimal('0'),
-                    "lotes_verdes": 0,
-                    "lotes_amarillos": 0,
-                    "lotes_rojos": 0,
-                    "numero_lotes": 0
-                }
-            
-            resumen[activo_id]["cantidad_total"] += lote.cantidad_disponible
-            resumen[activo_id]["inversion_total"] += lote.costo_total
-            resumen[activo_id]["numero_lotes"] += 1
-            
-            # Contar estados
-            if lote.estado == EstadoLote.VERDE.value:
-                resumen[activo_id]["lotes_verdes"] += 1
-            elif lote.estado == EstadoLote.AMARILLO.value:
-                resumen[activo_id]["lotes_amarillos"] += 1
-            elif lote.estado == EstadoLote.ROJO.value:
-                resumen[activo_id]["lotes_rojos"] += 1
-        
-        # Calcular precio promedio
-        for activo_id in resumen:
-            if resumen[activo_id]["cantidad_total"] > 0:
-                resumen[activo_id]["precio_promedio"] = (
-                    resumen[activo_id]["inversion_total"] / 
-                    resumen[activo_id]["cantidad_total"]
-                )
-        
-        return list(resumen.values())
+        # Una fila por activo: posiciones ⋈ activos ⋈ tipos_activos en una consulta
+        resumen = []
+        for posicion in PosicionService.obtener_posiciones(db, id_usuario):
+            resumen.append({
+                "id_activo": posicion["id_activo"],
+                "ticker": posicion["ticker"],
+                "nombre_activo": posicion["nombre_activo"],
+                "tipo_activo": posicion["tipo_activo"],
+                "moneda": posicion["moneda"],
+                "cantidad_total": posicion["cantidad_total"],
+                "inversion_total": posicion["costo_total"],
+                "precio_promedio": posicion["costo_total"] / posicion["cantidad_total"],
+                "lotes_verdes": posicion["lotes_verdes"],
+                "lotes_amarillos": posicion["lotes_amarillos"],
+                "lotes_rojos": posicion["lotes_rojos"],
+                "numero_lotes": posicion["numero_lotes"]
+            })
+        
+        return resumen
     
     @staticmethod
     def obtener_estadisticas_lotes(
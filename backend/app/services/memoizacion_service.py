@@ -0,0 +1,140 @@
+"""
+Memoización de Cálculos Puros
+Caché opcional de resultados para funciones del motor que dependen sólo de
+sus argumentos (precio de bonos, liquidación de CDT, conversión de divisas):
+- Llave con los Decimal normalizados (7.25 y 7.250 son la misma entrada)
+- LRU acotado por tamaño y expiración por TTL
+- Contadores de aciertos/fallos y switch en configuración
+"""
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from copy import copy
+from datetime import date
+from decimal import Decimal
+from functools import wraps
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+from app.config import settings
+
+# Argumentos que no forman parte de la llave (sesión de BD)
+ARGUMENTOS_EXCLUIDOS = frozenset({"db"})
+
+
+def _normalizar(valor: Any) -> Hashable:
+    """Convierte un argumento en una parte de llave estable y hashable"""
+    if isinstance(valor, Decimal):
+        return valor.normalize()
+    if isinstance(valor, float):
+        return Decimal(repr(valor)).normalize()
+    if isinstance(valor, (list, tuple)):
+        return tuple(_normalizar(v) for v in valor)
+    if isinstance(valor, dict):
+        return tuple(sorted((k, _normalizar(v)) for k, v in valor.items()))
+    if isinstance(valor, (int, str, bool, date)) or valor is None:
+        return valor
+    if hasattr(valor, "llave_cache"):
+        return valor.llave_cache
+    raise TypeError(f"Argumento no memoizable: {type(valor).__name__}")
+
+
+class _CacheLRU:
+    """Diccionario LRU con TTL, seguro entre hilos"""
+
+    def __init__(self):
+        self._datos: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.expirados = 0
+
+    def obtener(self, llave: Tuple) -> Tuple[bool, Any]:
+        ahora = time.monotonic()
+        with self._lock:
+            entrada = self._datos.get(llave)
+            if entrada is not None:
+                expira, valor = entrada
+                if expira > ahora:
+                    self._datos.move_to_end(llave)
+                    self.aciertos += 1
+                    return True, valor
+                del self._datos[llave]
+                self.expirados += 1
+            self.fallos += 1
+            return False, None
+
+    def guardar(self, llave: Tuple, valor: Any) -> None:
+        expira = time.monotonic() + settings.CACHE_CALCULOS_TTL_SEGUNDOS
+        with self._lock:
+            self._datos[llave] = (expira, valor)
+            self._datos.move_to_end(llave)
+            while len(self._datos) > settings.CACHE_CALCULOS_TAMANO:
+                self._datos.popitem(last=False)
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self._datos.clear()
+            self.aciertos = self.fallos = self.expirados = 0
+
+    def __len__(self) -> int:
+        return len(self._datos)
+
+
+_cache = _CacheLRU()
+
+
+def memoizar_calculo(funcion: Callable) -> Callable:
+    """
+    Decorador: sirve resultados repetidos desde la caché de cálculos
+
+    Sólo actúa si CACHE_CALCULOS_HABILITADA está activo. Los errores
+    (ValueError) no se guardan. Se retorna una copia superficial del
+    resultado para que el llamador pueda modificarlo sin alterar la caché.
+    """
+    firma = inspect.signature(funcion)
+
+    @wraps(funcion)
+    def envoltura(*args, **kwargs):
+        if not settings.CACHE_CALCULOS_HABILITADA:
+            return funcion(*args, **kwargs)
+
+        argumentos = firma.bind(*args, **kwargs)
+        argumentos.apply_defaults()
+        llave = (funcion.__qualname__,) + tuple(
+            (nombre, _normalizar(valor))
+            for nombre, valor in argumentos.arguments.items()
+            if nombre not in ARGUMENTOS_EXCLUIDOS
+        )
+
+        encontrado, resultado = _cache.obtener(llave)
+        if not encontrado:
+            resultado = funcion(*args, **kwargs)
+            _cache.guardar(llave, resultado)
+        return copy(resultado)
+
+    return envoltura
+
+
+class MemoizacionService:
+    """Consulta y administración de la caché de cálculos"""
+
+    @staticmethod
+    def estadisticas() -> Dict:
+        """Retorna estado, aciertos, fallos, expirados y tamaño de la caché"""
+        total = _cache.aciertos + _cache.fallos
+        return {
+            "habilitada": settings.CACHE_CALCULOS_HABILITADA,
+            "aciertos": _cache.aciertos,
+            "fallos": _cache.fallos,
+            "expirados": _cache.expirados,
+            "tasa_aciertos": round(_cache.aciertos / total, 4) if total else 0.0,
+            "tamano": len(_cache),
+            "tamano_maximo": settings.CACHE_CALCULOS_TAMANO,
+            "ttl_segundos": settings.CACHE_CALCULOS_TTL_SEGUNDOS,
+        }
+
+    @staticmethod
+    def limpiar() -> None:
+        """Vacía la caché y reinicia los contadores"""
+        _cache.limpiar()
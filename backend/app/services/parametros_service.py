@@ -0,0 +1,117 @@
+"""
+Registro de Parámetros del Sistema
+Carga una sola vez la tabla parametros_sistema y sirve los valores desde memoria:
+- Valores tipados con la semántica de get_valor_numeric / get_valor_bool
+- Invalidación por versión (número de filas + máxima fecha_actualizacion)
+- Hook explícito de invalidación para cambios hechos por el Admin
+"""
+import threading
+import time
+from decimal import Decimal
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import ParametroSistema
+
+# Nombres de parámetros usados por el motor de cálculos
+PARAM_PENALIZACION_CDT_60_DIAS = 'PENALIZACION_CDT_60_DIAS'
+PARAM_PENALIZACION_CDT_MAS_60_DIAS = 'PENALIZACION_CDT_MAS_60_DIAS'
+PARAM_META_RENDIMIENTO = 'META_RENDIMIENTO'
+PARAM_TRM_ACTUAL = 'TRM_ACTUAL'
+
+_lock = threading.Lock()
+_registro: Dict[str, ParametroSistema] = {}
+_version: Optional[Tuple] = None
+_ultima_verificacion: float = 0.0
+_estadisticas = {"recargas": 0, "verificaciones": 0, "lecturas": 0}
+
+
+def _consultar_version(db: Session) -> Tuple:
+    """Versión barata de la tabla: (número de filas, última fecha_actualizacion)"""
+    total, ultima = db.query(
+        func.count(ParametroSistema.id_parametro),
+        func.max(ParametroSistema.fecha_actualizacion)
+    ).one()
+    return (total, ultima)
+
+
+def _recargar(db: Session, version: Tuple) -> None:
+    """Carga todas las filas como copias desligadas de la sesión"""
+    global _registro, _version
+    _registro = {
+        p.nombre_parametro: ParametroSistema(
+            nombre_parametro=p.nombre_parametro,
+            valor_parametro=p.valor_parametro,
+            tipo_dato=p.tipo_dato,
+        )
+        for p in db.query(ParametroSistema).all()
+    }
+    _version = version
+    _estadisticas["recargas"] += 1
+
+
+class ParametrosService:
+    """Servicio de lectura de parámetros del sistema con caché en proceso"""
+
+    @staticmethod
+    def _asegurar_vigente(db: Session) -> None:
+        """
+        Recarga el registro si está vacío, invalidado o si cambió la versión
+
+        La versión sólo se consulta cada PARAMETROS_CACHE_SEGUNDOS; entre
+        verificaciones los valores se sirven sin tocar la base de datos.
+        """
+        global _ultima_verificacion
+        ahora = time.monotonic()
+        if _version is not None and ahora - _ultima_verificacion < settings.PARAMETROS_CACHE_SEGUNDOS:
+            return
+
+        with _lock:
+            if _version is not None and ahora - _ultima_verificacion < settings.PARAMETROS_CACHE_SEGUNDOS:
+                return
+            version = _consultar_version(db)
+            _estadisticas["verificaciones"] += 1
+            if version != _version:
+                _recargar(db, version)
+            _ultima_verificacion = ahora
+
+    @staticmethod
+    def obtener(db: Session, nombre: str) -> Optional[ParametroSistema]:
+        """
+        Retorna el parámetro cacheado (copia desligada) o None si no existe
+
+        Args:
+            db: Sesión de base de datos (sólo se usa al verificar/recargar)
+            nombre: Nombre del parámetro
+        """
+        ParametrosService._asegurar_vigente(db)
+        with _lock:
+            _estadisticas["lecturas"] += 1
+        return _registro.get(nombre)
+
+    @staticmethod
+    def obtener_numerico(db: Session, nombre: str, defecto: Decimal) -> Decimal:
+        """Valor NUMERIC del parámetro como Decimal, o `defecto` si no existe"""
+        param = ParametrosService.obtener(db, nombre)
+        return param.get_valor_numeric() if param else defecto
+
+    @staticmethod
+    def obtener_bool(db: Session, nombre: str, defecto: bool) -> bool:
+        """Valor BOOLEAN del parámetro, o `defecto` si no existe"""
+        param = ParametrosService.obtener(db, nombre)
+        return param.get_valor_bool() if param else defecto
+
+    @staticmethod
+    def invalidar() -> None:
+        """Fuerza la recarga en la próxima lectura (usar tras modificar parámetros)"""
+        global _version
+        with _lock:
+            _version = None
+
+    @staticmethod
+    def estadisticas() -> Dict:
+        """Retorna recargas, verificaciones de versión, lecturas y tamaño del registro"""
+        return dict(_estadisticas, parametros=len(_registro))
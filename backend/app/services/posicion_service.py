@@ -0,0 +1,212 @@
+"""
+Posiciones por (usuario, activo)
+Agregado de los lotes mantenido en la misma transacción que cada compra/venta:
+- Deltas acumulados en memoria y aplicados con UPDATE col = col + delta
+  (INSERT si la posición aún no existe)
+- Reconstrucción desde lotes con un INSERT ... SELECT ... GROUP BY
+- Verificación de la tabla contra el agregado de lotes
+Los resúmenes del portafolio leen esta tabla: O(activos) en vez de O(lotes).
+
+Las escrituras de un usuario ya están serializadas por el lock de su caja
+(compras y ventas la bloquean antes de tocar las posiciones), por lo que el
+UPDATE-o-INSERT no compite consigo mismo.
+"""
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import and_, case, delete, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.models import Activo, EstadoLote, Lote, Posicion, TipoActivo
+
+CAMPOS_ACUMULADOS = (
+    "cantidad_total", "costo_total", "valor_compra", "valor_compra_moneda",
+    "numero_lotes", "lotes_verdes", "lotes_amarillos", "lotes_rojos",
+)
+CAMPO_ESTADO = {
+    EstadoLote.VERDE: "lotes_verdes",
+    EstadoLote.AMARILLO: "lotes_amarillos",
+    EstadoLote.ROJO: "lotes_rojos",
+}
+TOLERANCIA_VERIFICACION = Decimal('0.01')
+
+
+def _estado(disponible: Decimal, inicial: Decimal) -> EstadoLote:
+    """Estado del semáforo según cantidades (misma regla que Lote.calcular_estado)"""
+    if disponible == inicial:
+        return EstadoLote.VERDE
+    return EstadoLote.AMARILLO if disponible > 0 else EstadoLote.ROJO
+
+
+def nuevos_deltas() -> Dict[UUID, Dict]:
+    """Acumulador de deltas por activo para `PosicionService.aplicar` (conteos enteros)"""
+    return defaultdict(lambda: defaultdict(int))
+
+
+def acumular_compra(
+    deltas: Dict,
+    id_activo: UUID,
+    cantidad: Decimal,
+    precio_compra: Decimal,
+    trm: Decimal,
+    costo_total: Decimal
+) -> None:
+    """Suma a `deltas` el lote nuevo (VERDE) de una compra"""
+    delta = deltas[id_activo]
+    delta["cantidad_total"] += cantidad
+    delta["costo_total"] += costo_total
+    delta["valor_compra"] += precio_compra * cantidad * trm
+    delta["valor_compra_moneda"] += precio_compra * cantidad
+    delta["numero_lotes"] += 1
+    delta["lotes_verdes"] += 1
+
+
+def acumular_venta(deltas: Dict, lote: Lote, cantidad: Decimal) -> None:
+    """Suma a `deltas` la venta de `cantidad` del lote (llamar antes de modificarlo)"""
+    antes = lote.cantidad_disponible
+    despues = antes - cantidad
+    delta = deltas[lote.id_activo]
+    delta["cantidad_total"] -= cantidad
+    delta["valor_compra"] -= lote.precio_compra * cantidad * lote.trm
+    delta["valor_compra_moneda"] -= lote.precio_compra * cantidad
+    delta[CAMPO_ESTADO[_estado(antes, lote.cantidad_inicial)]] -= 1
+    delta[CAMPO_ESTADO[_estado(despues, lote.cantidad_inicial)]] += 1
+    if despues == 0:
+        delta["numero_lotes"] -= 1
+        delta["costo_total"] -= lote.costo_total
+
+
+def _agregado_lotes(id_usuario: Optional[UUID] = None):
+    """SELECT ... GROUP BY que calcula las posiciones desde lotes"""
+    abierto = Lote.cantidad_disponible > 0
+    columnas = [
+        Lote.id_usuario,
+        Lote.id_activo,
+        func.sum(Lote.cantidad_disponible).label("cantidad_total"),
+        func.sum(case((abierto, Lote.costo_total), else_=0)).label("costo_total"),
+        func.sum(Lote.precio_compra * Lote.cantidad_disponible * Lote.trm).label("valor_compra"),
+        func.sum(Lote.precio_compra * Lote.cantidad_disponible).label("valor_compra_moneda"),
+        func.sum(case((abierto, 1), else_=0)).label("numero_lotes"),
+        func.sum(case((Lote.cantidad_disponible == Lote.cantidad_inicial, 1), else_=0)).label("lotes_verdes"),
+        func.sum(case(
+            (and_(abierto, Lote.cantidad_disponible < Lote.cantidad_inicial), 1), else_=0
+        )).label("lotes_amarillos"),
+        func.sum(case((Lote.cantidad_disponible == 0, 1), else_=0)).label("lotes_rojos"),
+    ]
+    consulta = select(*columnas).group_by(Lote.id_usuario, Lote.id_activo)
+    if id_usuario is not None:
+        consulta = consulta.where(Lote.id_usuario == id_usuario)
+    return consulta
+
+
+class PosicionService:
+    """Servicio de la tabla de posiciones por usuario y activo"""
+
+    @staticmethod
+    def aplicar(db: Session, id_usuario: UUID, deltas: Dict) -> None:
+        """
+        Aplica los deltas acumulados en la transacción en curso (sin commit)
+
+        Cada activo es un UPDATE atómico col = col + delta; si la posición
+        no existe se inserta con los deltas como valores iniciales.
+        """
+        for id_activo in sorted(deltas, key=str):
+            delta = {campo: valor for campo, valor in deltas[id_activo].items() if valor}
+            if not delta:
+                continue
+            resultado = db.execute(
+                update(Posicion).where(
+                    Posicion.id_usuario == id_usuario, Posicion.id_activo == id_activo
+                ).values(
+                    **{campo: getattr(Posicion, campo) + valor for campo, valor in delta.items()}
+                ).execution_options(synchronize_session=False)
+            )
+            if resultado.rowcount == 0:
+                db.execute(insert(Posicion).values(
+                    id_usuario=id_usuario, id_activo=id_activo,
+                    **{campo: delta.get(campo, 0) for campo in CAMPOS_ACUMULADOS}
+                ))
+
+    @staticmethod
+    def obtener_posiciones(db: Session, id_usuario: UUID) -> List[Dict]:
+        """
+        Posiciones abiertas del usuario con ticker, nombre, tipo y moneda del activo
+
+        Una sola consulta de columnas (posiciones ⋈ activos ⋈ tipos_activos):
+        no se cargan objetos ORM ni relaciones perezosas.
+        """
+        filas = db.query(
+            Posicion.id_activo,
+            Activo.ticker,
+            Activo.nombre.label("nombre_activo"),
+            TipoActivo.nombre.label("tipo_activo"),
+            Activo.moneda,
+            *(getattr(Posicion, campo) for campo in CAMPOS_ACUMULADOS),
+        ).join(
+            Activo, Activo.id_activo == Posicion.id_activo
+        ).outerjoin(
+            TipoActivo, TipoActivo.id_tipo_activo == Activo.id_tipo_activo
+        ).filter(
+            Posicion.id_usuario == id_usuario,
+            Posicion.cantidad_total > 0
+        ).order_by(Activo.ticker).all()
+        return [dict(fila._mapping) for fila in filas]
+
+    @staticmethod
+    def reconstruir(db: Session, id_usuario: Optional[UUID] = None) -> int:
+        """
+        Reemplaza las posiciones (de un usuario o de todos) por el agregado de lotes
+
+        Returns:
+            Número de posiciones escritas
+        """
+        borrado = delete(Posicion)
+        if id_usuario is not None:
+            borrado = borrado.where(Posicion.id_usuario == id_usuario)
+        db.execute(borrado)
+        resultado = db.execute(insert(Posicion).from_select(
+            ["id_usuario", "id_activo", *CAMPOS_ACUMULADOS, "fecha_actualizacion"],
+            _agregado_lotes(id_usuario).add_columns(func.now())
+        ))
+        db.commit()
+        return resultado.rowcount
+
+    @staticmethod
+    def verificar(
+        db: Session,
+        id_usuario: Optional[UUID] = None,
+        tolerancia: Decimal = TOLERANCIA_VERIFICACION
+    ) -> List[Dict]:
+        """
+        Compara la tabla de posiciones con el agregado de lotes
+
+        Returns:
+            Lista de diferencias (usuario, activo, campo, valor en la tabla y
+            valor esperado); vacía si la tabla está reconciliada
+        """
+        esperadas = {
+            (fila.id_usuario, fila.id_activo): fila._mapping
+            for fila in db.execute(_agregado_lotes(id_usuario))
+        }
+        consulta = db.query(Posicion)
+        if id_usuario is not None:
+            consulta = consulta.filter(Posicion.id_usuario == id_usuario)
+        actuales = {(p.id_usuario, p.id_activo): p for p in consulta}
+
+        diferencias = []
+        for llave in sorted(esperadas.keys() | actuales.keys(), key=str):
+            esperada, actual = esperadas.get(llave), actuales.get(llave)
+            for campo in CAMPOS_ACUMULADOS:
+                valor_esperado = Decimal(str(esperada[campo] or 0)) if esperada else Decimal('0')
+                valor_actual = Decimal(str(getattr(actual, campo) or 0)) if actual else Decimal('0')
+                if abs(valor_actual - valor_esperado) > tolerancia:
+                    diferencias.append({
+                        "id_usuario": llave[0],
+                        "id_activo": llave[1],
+                        "campo": campo,
+                        "tabla": valor_actual,
+                        "lotes": valor_esperado,
+                    })
+        return diferencias
@@ -0,0 +1,218 @@
+"""
+Métricas de Riesgo del Portafolio
+Calcula el riesgo histórico a partir de las valoraciones diarias:
+- Serie de valores en una sola consulta de columnas (arreglo NumPy)
+- VaR y CVaR (Expected Shortfall) histórico y paramétrico (normal)
+- Volatilidad diaria y anualizada, máximo drawdown con sus fechas
+- Caché por usuario, invalidada al guardar un nuevo snapshot y por versión
+  de la serie (para los snapshots escritos en otros workers)
+"""
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+import numpy as np
+from scipy.stats import norm
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import ValoracionDiaria
+
+DIAS_HABILES_ANIO = 252
+MIN_RETORNOS_RIESGO = 2
+MAX_USUARIOS_EN_CACHE = 1024
+# Niveles de confianza distintos guardados por usuario (los más recientes)
+MAX_NIVELES_POR_USUARIO = 8
+# El nivel de confianza se redondea antes de calcular y de usarse como llave
+DECIMALES_NIVEL_CONFIANZA = 4
+
+_lock = threading.Lock()
+# id_usuario -> {"version", "verificado" (instante), "niveles": {nivel: métricas}}
+_cache: "OrderedDict[UUID, Dict]" = OrderedDict()
+_estadisticas = {"aciertos": 0, "fallos": 0, "verificaciones": 0}
+
+
+def _consultar_version(db: Session, id_usuario: UUID) -> Tuple:
+    """Versión barata de la serie del usuario: (filas, última fecha, último cálculo)"""
+    return tuple(db.query(
+        func.count(ValoracionDiaria.id_valoracion),
+        func.max(ValoracionDiaria.fecha_valoracion),
+        func.max(ValoracionDiaria.fecha_calculo)
+    ).filter(ValoracionDiaria.id_usuario == id_usuario).one())
+
+
+class RiesgoPortafolioService:
+    """Servicio de métricas de riesgo sobre valoraciones_diarias"""
+
+    @staticmethod
+    def cargar_serie(db: Session, id_usuario: UUID) -> Tuple[List[date], np.ndarray]:
+        """Fechas y valores de mercado del usuario, en orden cronológico"""
+        filas = db.query(
+            ValoracionDiaria.fecha_valoracion, ValoracionDiaria.valor_mercado_total
+        ).filter(
+            ValoracionDiaria.id_usuario == id_usuario
+        ).order_by(ValoracionDiaria.fecha_valoracion).all()
+
+        fechas = [f for f, _ in filas]
+        valores = np.fromiter((float(v) for _, v in filas), dtype=np.float64, count=len(filas))
+        return fechas, valores
+
+    @staticmethod
+    def calcular_metricas(
+        fechas: List[date],
+        valores: np.ndarray,
+        nivel_confianza: float = 0.95
+    ) -> Dict:
+        """
+        Métricas de riesgo de una serie de valores diarios
+
+        Retornos simples r_t = V_t / V_{t-1} - 1 (se omiten los valores no
+        positivos). Las pérdidas se reportan como números positivos:
+
+            VaR histórico  = -percentil(r, 1 - c)
+            CVaR histórico = -media(r | r ≤ -VaR)
+            VaR normal     = -(μ + z_{1-c} σ)
+            CVaR normal    = -(μ - σ φ(z_{1-c}) / (1 - c))
+
+        Args:
+            fechas: Fechas de la serie
+            valores: Valor de mercado por fecha
+            nivel_confianza: c en (0, 1)
+
+        Returns:
+            Dict con métricas en porcentaje y en pesos sobre el último valor
+        """
+        if not 0.5 <= nivel_confianza < 1:
+            raise ValueError("El nivel de confianza debe estar en [0.5, 1)")
+
+        positivos = valores > 0
+        fechas = [f for f, ok in zip(fechas, positivos) if ok]
+        valores = valores[positivos]
+        retornos = valores[1:] / valores[:-1] - 1.0
+        if retornos.size < MIN_RETORNOS_RIESGO:
+            raise ValueError(
+                f"Se requieren al menos {MIN_RETORNOS_RIESGO + 1} valoraciones diarias "
+                "para calcular el riesgo"
+            )
+
+        alfa = 1.0 - nivel_confianza
+        media = float(retornos.mean())
+        desviacion = float(retornos.std(ddof=1))
+
+        var_historico = -float(np.quantile(retornos, alfa))
+        cola = retornos[retornos <= -var_historico]
+        cvar_historico = -float(cola.mean())
+
+        z = norm.ppf(alfa)
+        var_parametrico = -(media + z * desviacion)
+        cvar_parametrico = -(media - desviacion * norm.pdf(z) / alfa)
+
+        pico = np.maximum.accumulate(valores)
+        drawdowns = valores / pico - 1.0
+        valle = int(np.argmin(drawdowns))
+        inicio = int(np.argmax(valores[:valle + 1])) if valle else 0
+
+        ultimo = float(valores[-1])
+
+        def _metrica(perdida: float) -> Dict:
+            return {
+                "porcentaje": round(perdida * 100, 4),
+                "valor": round(perdida * ultimo, 2),
+            }
+
+        return {
+            "nivel_confianza": nivel_confianza,
+            "observaciones": int(valores.size),
+            "fecha_inicio": fechas[0],
+            "fecha_fin": fechas[-1],
+            "valor_actual": round(ultimo, 2),
+            "retorno_medio_diario": round(media * 100, 6),
+            "volatilidad_diaria": round(desviacion * 100, 6),
+            "volatilidad_anual": round(desviacion * np.sqrt(DIAS_HABILES_ANIO) * 100, 4),
+            "var_historico": _metrica(var_historico),
+            "cvar_historico": _metrica(cvar_historico),
+            "var_parametrico": _metrica(var_parametrico),
+            "cvar_parametrico": _metrica(cvar_parametrico),
+            "max_drawdown": {
+                "porcentaje": round(float(-drawdowns[valle]) * 100, 4),
+                "fecha_pico": fechas[inicio],
+                "fecha_valle": fechas[valle],
+            },
+        }
+
+    @staticmethod
+    def obtener_riesgo(db: Session, id_usuario: UUID, nivel_confianza: float = 0.95) -> Dict:
+        """
+        Métricas de riesgo del usuario (desde caché o calculándolas)
+
+        La caché del usuario se descarta con `invalidar` al escribir un nuevo
+        snapshot en este worker; además su versión se verifica cada
+        RIESGO_CACHE_SEGUNDOS para ver los snapshots escritos en otros.
+        El nivel de confianza se redondea a DECIMALES_NIVEL_CONFIANZA y sólo
+        se guardan MAX_NIVELES_POR_USUARIO niveles por usuario.
+        """
+        nivel = round(float(nivel_confianza), DECIMALES_NIVEL_CONFIANZA)
+        ahora = time.monotonic()
+        with _lock:
+            entrada = _cache.get(id_usuario)
+
+        if entrada is not None and ahora - entrada["verificado"] >= settings.RIESGO_CACHE_SEGUNDOS:
+            version = _consultar_version(db, id_usuario)
+            with _lock:
+                _estadisticas["verificaciones"] += 1
+                if version == entrada["version"]:
+                    entrada["verificado"] = ahora
+                else:
+                    if _cache.get(id_usuario) is entrada:
+                        del _cache[id_usuario]
+                    entrada = None
+
+        with _lock:
+            resultado = entrada["niveles"].get(nivel) if entrada is not None else None
+            if resultado is not None:
+                entrada["niveles"].move_to_end(nivel)
+                if id_usuario in _cache:
+                    _cache.move_to_end(id_usuario)
+                _estadisticas["aciertos"] += 1
+                return dict(resultado, desde_cache=True)
+            _estadisticas["fallos"] += 1
+
+        # La versión se lee antes que la serie: un snapshot concurrente fuerza recarga
+        version = _consultar_version(db, id_usuario)
+        fechas, valores = RiesgoPortafolioService.cargar_serie(db, id_usuario)
+        resultado = RiesgoPortafolioService.calcular_metricas(fechas, valores, nivel)
+
+        with _lock:
+            entrada = _cache.get(id_usuario)
+            if entrada is None or entrada["version"] != version:
+                entrada = {"version": version, "verificado": ahora, "niveles": OrderedDict()}
+                _cache[id_usuario] = entrada
+            entrada["niveles"][nivel] = resultado
+            entrada["niveles"].move_to_end(nivel)
+            while len(entrada["niveles"]) > MAX_NIVELES_POR_USUARIO:
+                entrada["niveles"].popitem(last=False)
+            _cache.move_to_end(id_usuario)
+            while len(_cache) > MAX_USUARIOS_EN_CACHE:
+                _cache.popitem(last=False)
+        return dict(resultado, desde_cache=False)
+
+    @staticmethod
+    def invalidar(id_usuario: Optional[UUID] = None) -> None:
+        """Descarta las métricas del usuario (o de todos si no se indica)"""
+        with _lock:
+            if id_usuario is None:
+                _cache.clear()
+                for contador in _estadisticas:
+                    _estadisticas[contador] = 0
+            else:
+                _cache.pop(id_usuario, None)
+
+    @staticmethod
+    def estadisticas_cache() -> Dict:
+        """Retorna aciertos, fallos, verificaciones de versión y usuarios en caché"""
+        with _lock:
+            return dict(_estadisticas, usuarios=len(_cache), usuarios_maximos=MAX_USUARIOS_EN_CACHE)
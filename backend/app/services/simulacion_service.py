@@ -0,0 +1,304 @@
+"""
+Simulación Monte Carlo del Portafolio
+Genera trayectorias futuras del valor del portafolio a partir de los lotes abiertos:
+- Movimiento browniano geométrico (GBM) por activo, con correlación común
+- Bootstrap de los retornos diarios históricos del portafolio (valoraciones_diarias)
+- Bloques de trayectorias con semillas deterministas (SeedSequence.spawn), repartidos
+  en un pool de procesos; el resultado no depende del número de procesos
+- Memoria acotada: sólo se guardan los valores en los puntos de la banda
+"""
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Dict, List, Optional
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models import Activo, Lote, TipoActivo, ValoracionDiaria
+
+DIAS_HABILES_ANIO = 252
+MAX_TRAYECTORIAS = 200_000
+TAMANO_BLOQUE = 10_000
+MAX_ELEMENTOS_BLOQUE = 4_000_000   # números aleatorios por bloque (~32 MB en float64)
+MIN_RETORNOS_BOOTSTRAP = 20
+PERCENTILES_BANDA = (5, 25, 50, 75, 95)
+
+# (rendimiento esperado anual, volatilidad anual) por tipo de activo
+PARAMETROS_GBM_DEFECTO = {
+    'ACCION': (0.10, 0.30),
+    'ACCION_EXT': (0.09, 0.28),
+    'ETF': (0.08, 0.18),
+    'BONO': (0.07, 0.06),
+    'CDT': (0.10, 0.0),
+}
+PARAMETROS_GBM_OTROS = (0.06, 0.20)
+
+
+def _simular_bloque_gbm(
+    semilla: np.random.SeedSequence,
+    trayectorias: int,
+    valores_iniciales: np.ndarray,
+    mu: np.ndarray,
+    sigma: np.ndarray,
+    cholesky: np.ndarray,
+    tiempos: np.ndarray
+) -> np.ndarray:
+    """
+    Valor del portafolio en cada punto de la banda para un bloque de trayectorias (GBM)
+
+    El GBM es exacto para cualquier paso, así que sólo se simulan los
+    puntos de la banda: log S(t+Δ) = log S(t) + (μ - σ²/2)Δ + σ√Δ·Z.
+
+    Returns:
+        Matriz trayectorias × puntos
+    """
+    rng = np.random.default_rng(semilla)
+    delta = np.diff(tiempos, prepend=0.0)[:, None]
+    z = rng.standard_normal((trayectorias, tiempos.size, mu.size)) @ cholesky.T
+    incrementos = (mu - 0.5 * sigma ** 2) * delta + sigma * np.sqrt(delta) * z
+    return np.exp(np.cumsum(incrementos, axis=1)) @ valores_iniciales
+
+
+def _simular_bloque_bootstrap(
+    semilla: np.random.SeedSequence,
+    trayectorias: int,
+    valor_inicial: float,
+    retornos_log: np.ndarray,
+    dias_banda: np.ndarray
+) -> np.ndarray:
+    """
+    Valor del portafolio en cada punto de la banda remuestreando retornos diarios
+
+    Returns:
+        Matriz trayectorias × puntos
+    """
+    rng = np.random.default_rng(semilla)
+    muestras = retornos_log[rng.integers(0, retornos_log.size, size=(trayectorias, int(dias_banda[-1])))]
+    acumulado = np.cumsum(muestras, axis=1)[:, dias_banda - 1]
+    return valor_inicial * np.exp(acumulado)
+
+
+def _simular_bloque(argumentos: tuple) -> np.ndarray:
+    """Despacha un bloque al núcleo del método (punto de entrada del pool)"""
+    metodo, *resto = argumentos
+    if metodo == 'gbm':
+        return _simular_bloque_gbm(*resto)
+    return _simular_bloque_bootstrap(*resto)
+
+
+class SimulacionMonteCarloService:
+    """Servicio de simulación Monte Carlo del portafolio"""
+
+    @staticmethod
+    def cargar_posiciones(db: Session, id_usuario: UUID) -> List[Dict]:
+        """
+        Valor actual por activo de los lotes abiertos del usuario (una consulta)
+
+        Usa la misma aproximación de valor de mercado del resumen del
+        portafolio: precio de compra × cantidad disponible × TRM.
+        """
+        filas = db.query(
+            Activo.ticker,
+            TipoActivo.nombre,
+            func.sum(Lote.cantidad_disponible * Lote.precio_compra * Lote.trm)
+        ).join(Activo, Lote.id_activo == Activo.id_activo).outerjoin(
+            TipoActivo, Activo.id_tipo_activo == TipoActivo.id_tipo_activo
+        ).filter(
+            Lote.id_usuario == id_usuario,
+            Lote.cantidad_disponible > 0
+        ).group_by(Activo.ticker, TipoActivo.nombre).order_by(Activo.ticker).all()
+
+        return [
+            {"ticker": ticker, "tipo_activo": tipo, "valor": float(valor)}
+            for ticker, tipo, valor in filas
+        ]
+
+    @staticmethod
+    def cargar_retornos_historicos(db: Session, id_usuario: UUID) -> np.ndarray:
+        """Retornos logarítmicos entre valoraciones diarias consecutivas del usuario"""
+        valores = np.array([
+            float(v) for (v,) in db.query(ValoracionDiaria.valor_mercado_total).filter(
+                ValoracionDiaria.id_usuario == id_usuario
+            ).order_by(ValoracionDiaria.fecha_valoracion).all()
+        ])
+        valores = valores[valores > 0]
+        return np.diff(np.log(valores)) if valores.size > 1 else np.empty(0)
+
+    @staticmethod
+    def simular_trayectorias(
+        posiciones: List[Dict],
+        trayectorias: int,
+        horizonte_dias: int,
+        puntos_banda: int = 12,
+        metodo: str = 'gbm',
+        retornos_log: Optional[np.ndarray] = None,
+        parametros: Optional[Dict[str, Dict]] = None,
+        correlacion: float = 0.0,
+        semilla: Optional[int] = None,
+        procesos: int = 1
+    ) -> Dict:
+        """
+        Genera las trayectorias y retorna los valores en los puntos de la banda
+
+        Args:
+            posiciones: Salida de `cargar_posiciones`
+            trayectorias: Número de trayectorias
+            horizonte_dias: Horizonte en días hábiles
+            puntos_banda: Número de puntos (días) en los que se guarda el valor
+            metodo: 'gbm' o 'bootstrap'
+            retornos_log: Retornos diarios históricos (requeridos en bootstrap)
+            parametros: {ticker: {"mu": ..., "sigma": ...}} para reemplazar los de defecto
+            correlacion: Correlación común entre activos (GBM)
+            semilla: Semilla raíz (None = aleatoria; se retorna la usada)
+            procesos: Procesos del pool
+
+        Returns:
+            Dict con dias_banda, valores (trayectorias × puntos), semilla, bloques
+            y los parámetros usados por activo
+        """
+        if not posiciones:
+            raise ValueError("El portafolio no tiene lotes abiertos")
+        if not 1 <= trayectorias <= MAX_TRAYECTORIAS:
+            raise ValueError(f"Las trayectorias deben estar entre 1 y {MAX_TRAYECTORIAS}")
+        if horizonte_dias < 1:
+            raise ValueError("El horizonte debe ser de al menos un día")
+        if metodo not in ('gbm', 'bootstrap'):
+            raise ValueError("Método inválido. Use gbm o bootstrap")
+        if not 0.0 <= correlacion < 1.0:
+            raise ValueError("La correlación debe estar en [0, 1)")
+
+        dias_banda = np.unique(np.round(
+            np.linspace(0, horizonte_dias, min(puntos_banda, horizonte_dias) + 1)[1:]
+        ).astype(np.int64))
+        valores_iniciales = np.array([p["valor"] for p in posiciones])
+
+        parametros = parametros or {}
+        usados = []
+        for p in posiciones:
+            mu, sigma = PARAMETROS_GBM_DEFECTO.get(p["tipo_activo"], PARAMETROS_GBM_OTROS)
+            propio = parametros.get(p["ticker"], {})
+            usados.append(dict(p, mu=float(propio.get("mu", mu)), sigma=float(propio.get("sigma", sigma))))
+
+        if metodo == 'gbm':
+            mu = np.array([u["mu"] for u in usados])
+            sigma = np.array([u["sigma"] for u in usados])
+            n = mu.size
+            matriz = (1.0 - correlacion) * np.eye(n) + correlacion * np.ones((n, n))
+            cholesky = np.linalg.cholesky(matriz)
+            datos = ('gbm', valores_iniciales, mu, sigma, cholesky, dias_banda / DIAS_HABILES_ANIO)
+            elementos_por_trayectoria = dias_banda.size * n
+        else:
+            if retornos_log is None or retornos_log.size < MIN_RETORNOS_BOOTSTRAP:
+                raise ValueError(
+                    f"El bootstrap requiere al menos {MIN_RETORNOS_BOOTSTRAP} retornos diarios "
+                    "(valoraciones diarias del portafolio)"
+                )
+            datos = ('bootstrap', float(valores_iniciales.sum()), retornos_log, dias_banda)
+            elementos_por_trayectoria = int(dias_banda[-1])
+
+        tamano_bloque = max(1, min(TAMANO_BLOQUE, MAX_ELEMENTOS_BLOQUE // elementos_por_trayectoria))
+        tamanos = [tamano_bloque] * (trayectorias // tamano_bloque)
+        if trayectorias % tamano_bloque:
+            tamanos.append(trayectorias % tamano_bloque)
+
+        raiz = np.random.SeedSequence(semilla)
+        semillas = raiz.spawn(len(tamanos))
+        tareas = [
+            (datos[0], semilla_bloque, tamano) + datos[1:]
+            for semilla_bloque, tamano in zip(semillas, tamanos)
+        ]
+
+        valores = np.empty((trayectorias, dias_banda.size))
+        procesos = max(1, min(procesos, len(tareas)))
+        if procesos == 1:
+            resultados = map(_simular_bloque, tareas)
+        else:
+            pool = ProcessPoolExecutor(max_workers=procesos, mp_context=get_context("spawn"))
+            resultados = pool.map(_simular_bloque, tareas)
+        try:
+            inicio = 0
+            for bloque in resultados:
+                valores[inicio:inicio + bloque.shape[0]] = bloque
+                inicio += bloque.shape[0]
+        finally:
+            if procesos > 1:
+                pool.shutdown()
+
+        return {
+            "dias_banda": dias_banda,
+            "valores": valores,
+            "valor_inicial": float(valores_iniciales.sum()),
+            "semilla": raiz.entropy,
+            "bloques": len(tareas),
+            "procesos": procesos,
+            "posiciones": usados,
+        }
+
+    @staticmethod
+    def simular_portafolio(
+        db: Session,
+        id_usuario: UUID,
+        trayectorias: int = 10_000,
+        horizonte_dias: int = DIAS_HABILES_ANIO,
+        puntos_banda: int = 12,
+        metodo: str = 'gbm',
+        parametros: Optional[Dict[str, Dict]] = None,
+        correlacion: float = 0.0,
+        semilla: Optional[int] = None,
+        procesos: int = 1
+    ) -> Dict:
+        """
+        Simula el valor futuro del portafolio y resume las bandas de percentiles
+
+        Returns:
+            Dict con bandas (percentiles 5/25/50/75/95 y media por día),
+            resumen al horizonte, posiciones y semilla para reproducir
+        """
+        inicio = time.perf_counter()
+        posiciones = SimulacionMonteCarloService.cargar_posiciones(db, id_usuario)
+        retornos = (
+            SimulacionMonteCarloService.cargar_retornos_historicos(db, id_usuario)
+            if metodo == 'bootstrap' else None
+        )
+        simulacion = SimulacionMonteCarloService.simular_trayectorias(
+            posiciones, trayectorias, horizonte_dias, puntos_banda, metodo,
+            retornos_log=retornos, parametros=parametros, correlacion=correlacion,
+            semilla=semilla, procesos=procesos
+        )
+
+        valores = simulacion["valores"]
+        percentiles = np.percentile(valores, PERCENTILES_BANDA, axis=0)
+        medias = valores.mean(axis=0)
+        bandas = [
+            dict(
+                {"dia": int(dia), "media": round(float(medias[k]), 2)},
+                **{f"p{p}": round(float(percentiles[j, k]), 2) for j, p in enumerate(PERCENTILES_BANDA)}
+            )
+            for k, dia in enumerate(simulacion["dias_banda"])
+        ]
+        final = valores[:, -1]
+
+        return {
+            "metodo": metodo,
+            "trayectorias": trayectorias,
+            "horizonte_dias": horizonte_dias,
+            "semilla": simulacion["semilla"],
+            "bloques": simulacion["bloques"],
+            "procesos": simulacion["procesos"],
+            "valor_inicial": round(simulacion["valor_inicial"], 2),
+            "posiciones": simulacion["posiciones"] if metodo == 'gbm' else [
+                {k: v for k, v in p.items() if k not in ("mu", "sigma")} for p in simulacion["posiciones"]
+            ],
+            "bandas": bandas,
+            "resumen_final": {
+                "media": round(float(final.mean()), 2),
+                "p5": bandas[-1]["p5"],
+                "p50": bandas[-1]["p50"],
+                "p95": bandas[-1]["p95"],
+                "probabilidad_perdida": round(float((final < simulacion["valor_inicial"]).mean()), 4),
+            },
+            "tiempo_segundos": round(time.perf_counter() - inicio, 4),
+        }
@@ -0,0 +1,133 @@
+"""
+Solver Vectorizado de TIR
+Núcleos NumPy compartidos por la valoración de bonos y el motor de cálculos:
+- Descuento de flujos bonos × periodos a la TIR de cada bono
+- TIR por periodo que reproduce un precio (Newton con salvaguarda)
+
+Sólo depende de NumPy, así que cualquier servicio puede importarlo sin
+crear importaciones circulares.
+"""
+from typing import Dict, Tuple
+
+import numpy as np
+
+
+# Intervalo de búsqueda de la TIR por periodo y criterios de parada del solver
+TIR_PERIODO_MINIMA = -0.5
+TIR_PERIODO_MAXIMA = 10.0
+MAX_ITERACIONES_TIR = 100
+TOLERANCIA_PRECIO = 1e-9   # relativa al valor nominal
+TOLERANCIA_TIR = 1e-14     # ancho mínimo del intervalo (tasa por periodo)
+
+
+class SolverTirService:
+    """Núcleos vectorizados de descuento y de resolución de la TIR"""
+
+    @staticmethod
+    def descontar_flujos(
+        nominal: np.ndarray,
+        cupon: np.ndarray,
+        periodos: np.ndarray,
+        tir_periodo: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Descuenta los flujos de cada bono a su propia TIR en una sola pasada
+
+        Construye la matriz bonos × periodos con los flujos (cupón en cada
+        periodo, cupón + nominal en el último) y los factores v^t = (1+r)^-t.
+        De la misma pasada salen las sumas ponderadas que necesitan la
+        derivada del precio y las medidas de riesgo:
+
+            precio   = Σ F_t v^t
+            suma_t   = Σ t F_t v^t
+            suma_tt  = Σ t (t+1) F_t v^t
+
+        Args:
+            nominal, cupon, periodos, tir_periodo: Arreglos de igual largo (uno por bono)
+
+        Returns:
+            Tupla (precio, suma_t, suma_tt)
+        """
+        max_periodos = int(periodos.max()) if periodos.size else 0
+        t = np.arange(1, max_periodos + 1, dtype=np.float64)[None, :]
+
+        vigente = t <= periodos[:, None]
+        flujos = np.where(vigente, cupon[:, None], 0.0)
+        flujos = flujos + np.where(t == periodos[:, None], nominal[:, None], 0.0)
+
+        descuento = np.exp(-t * np.log1p(tir_periodo)[:, None])
+        flujos_descontados = flujos * descuento
+
+        precio = flujos_descontados.sum(axis=1)
+        suma_t = (flujos_descontados * t).sum(axis=1)
+        suma_tt = (flujos_descontados * t * (t + 1)).sum(axis=1)
+        return precio, suma_t, suma_tt
+
+    @staticmethod
+    def resolver_tir_periodo(
+        nominal: np.ndarray,
+        cupon: np.ndarray,
+        periodos: np.ndarray,
+        precio_objetivo: np.ndarray
+    ) -> Dict:
+        """
+        Resuelve P(r) = precio_objetivo para todos los bonos a la vez
+
+        Newton-Raphson con salvaguarda de bisección: cada bono mantiene un
+        intervalo [bajo, alto] que encierra la raíz (el precio es decreciente
+        en r). Si el paso de Newton sale del intervalo se usa el punto medio,
+        así la iteración siempre converge. Los bonos ya convergidos dejan de
+        iterar.
+
+        Returns:
+            Dict con tir_periodo, iteraciones, convergio y fuera_de_rango
+        """
+        total = nominal.size
+        bajo = np.full(total, TIR_PERIODO_MINIMA)
+        alto = np.full(total, TIR_PERIODO_MAXIMA)
+
+        # El precio objetivo debe estar entre P(alto) y P(bajo)
+        precio_bajo, _, _ = SolverTirService.descontar_flujos(nominal, cupon, periodos, bajo)
+        precio_alto, _, _ = SolverTirService.descontar_flujos(nominal, cupon, periodos, alto)
+        fuera_de_rango = (precio_objetivo > precio_bajo) | (precio_objetivo < precio_alto)
+
+        # Punto de partida: tasa cupón por periodo
+        tir = np.clip(cupon / nominal, 1e-6, TIR_PERIODO_MAXIMA / 2)
+        iteraciones = np.zeros(total, dtype=np.int64)
+        activos = ~fuera_de_rango
+        tolerancia = TOLERANCIA_PRECIO * nominal
+
+        for _ in range(MAX_ITERACIONES_TIR):
+            if not activos.any():
+                break
+            idx = np.nonzero(activos)[0]
+            r = tir[idx]
+            precio, suma_t, _ = SolverTirService.descontar_flujos(
+                nominal[idx], cupon[idx], periodos[idx], r
+            )
+            error = precio - precio_objetivo[idx]
+            iteraciones[idx] += 1
+
+            convergido = np.abs(error) <= tolerancia[idx]
+
+            # Actualizar intervalo: precio alto => la raíz está a la derecha
+            b = np.where(error > 0, r, bajo[idx])
+            a = np.where(error > 0, alto[idx], r)
+            bajo[idx], alto[idx] = b, a
+
+            derivada = -suma_t / (1.0 + r)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                newton = r - error / derivada
+            dentro = np.isfinite(newton) & (newton > b) & (newton < a)
+            nuevo = np.where(dentro, newton, 0.5 * (b + a))
+
+            tir[idx] = np.where(convergido, r, nuevo)
+            activos[idx] = ~convergido & ((a - b) > TOLERANCIA_TIR)
+
+        convergio = ~activos & ~fuera_de_rango
+        return {
+            "tir_periodo": tir,
+            "iteraciones": iteraciones,
+            "convergio": convergio,
+            "fuera_de_rango": fuera_de_rango,
+        }
@@ -0,0 +1,176 @@
+"""
+Histórico de la TRM
+Serie diaria de la tasa de cambio servida desde memoria:
+- Carga masiva (reemplaza las fechas ya existentes)
+- Caché en arreglos ordenados (ordinales de fecha y valores)
+- TRM vigente a una fecha ("as-of") por búsqueda binaria, una o muchas fechas
+- Invalidación por versión (filas, última fecha y última actualización)
+"""
+import threading
+import time
+from datetime import date
+from decimal import Decimal
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import HistoricoTRM
+from app.services.parametros_service import PARAM_TRM_ACTUAL, ParametrosService
+
+# Moneda que cotiza la serie (TRM = pesos por dólar)
+MONEDA_TRM = 'USD'
+
+# Fechas por sentencia DELETE ... IN (...) en la carga masiva
+TAMANO_BLOQUE_BORRADO = 1000
+
+_lock = threading.Lock()
+# (ordinales de fecha, valores): se reemplaza completa para que los lectores no vean mezclas
+_serie: Tuple[np.ndarray, List[Decimal]] = (np.empty(0, dtype=np.int64), [])
+_version: Optional[Tuple] = None
+_ultima_verificacion: float = 0.0
+_estadisticas = {"recargas": 0, "verificaciones": 0, "consultas": 0}
+
+
+def _consultar_version(db: Session) -> Tuple:
+    """Versión barata de la tabla: (filas, última fecha, última actualización)"""
+    return tuple(db.query(
+        func.count(HistoricoTRM.fecha),
+        func.max(HistoricoTRM.fecha),
+        func.max(HistoricoTRM.fecha_actualizacion)
+    ).one())
+
+
+def _recargar(db: Session, version: Tuple) -> None:
+    """Carga la serie completa en arreglos ordenados por fecha"""
+    global _serie, _version
+    filas = db.query(HistoricoTRM.fecha, HistoricoTRM.valor).order_by(HistoricoTRM.fecha).all()
+    _serie = (
+        np.fromiter((f.toordinal() for f, _ in filas), dtype=np.int64, count=len(filas)),
+        [Decimal(v) for _, v in filas],
+    )
+    _version = version
+    _estadisticas["recargas"] += 1
+
+
+class TRMService:
+    """Servicio del histórico de TRM con caché en proceso"""
+
+    @staticmethod
+    def _asegurar_vigente(db: Session) -> None:
+        """Recarga la serie si está vacía, invalidada o si cambió la versión"""
+        global _ultima_verificacion
+        ahora = time.monotonic()
+        if _version is not None and ahora - _ultima_verificacion < settings.TRM_CACHE_SEGUNDOS:
+            return
+
+        with _lock:
+            if _version is not None and ahora - _ultima_verificacion < settings.TRM_CACHE_SEGUNDOS:
+                return
+            version = _consultar_version(db)
+            _estadisticas["verificaciones"] += 1
+            if version != _version:
+                _recargar(db, version)
+            _ultima_verificacion = ahora
+
+    @staticmethod
+    def cargar_historico(
+        db: Session,
+        registros: Sequence[Tuple[date, Decimal]],
+        fuente: Optional[str] = None
+    ) -> Dict:
+        """
+        Carga masiva de la serie: inserta las fechas nuevas y reemplaza las existentes
+
+        Si una fecha viene repetida gana el último valor.
+
+        Args:
+            registros: Pares (fecha, TRM)
+            fuente: Origen de los datos (ej: 'BANREP')
+
+        Returns:
+            Dict con registros cargados, reemplazados y rango de fechas
+        """
+        serie = {fecha: Decimal(valor) for fecha, valor in registros}
+        if not serie:
+            raise ValueError("Debe enviar al menos un registro de TRM")
+        invalidos = [f for f, v in serie.items() if v <= 0]
+        if invalidos:
+            raise ValueError(f"La TRM debe ser mayor a cero (fecha {min(invalidos)})")
+
+        fechas = sorted(serie)
+        reemplazados = 0
+        for inicio in range(0, len(fechas), TAMANO_BLOQUE_BORRADO):
+            reemplazados += db.query(HistoricoTRM).filter(
+                HistoricoTRM.fecha.in_(fechas[inicio:inicio + TAMANO_BLOQUE_BORRADO])
+            ).delete(synchronize_session=False)
+        db.execute(insert(HistoricoTRM), [
+            {"fecha": f, "valor": serie[f], "fuente": fuente} for f in fechas
+        ])
+        db.commit()
+        TRMService.invalidar()
+
+        return {
+            "cargados": len(fechas),
+            "reemplazados": reemplazados,
+            "fecha_inicio": fechas[0],
+            "fecha_fin": fechas[-1],
+        }
+
+    @staticmethod
+    def trms_en_fechas(db: Session, fechas: Sequence[date]) -> List[Optional[Decimal]]:
+        """
+        TRM vigente a cada fecha: la del último registro en o antes de la fecha
+
+        Una sola búsqueda binaria vectorizada (searchsorted) para todas las
+        fechas. Retorna None para fechas anteriores al inicio de la serie.
+        """
+        TRMService._asegurar_vigente(db)
+        with _lock:
+            _estadisticas["consultas"] += len(fechas)
+        ordinales, valores = _serie
+        posiciones = np.searchsorted(
+            ordinales, np.fromiter((f.toordinal() for f in fechas), dtype=np.int64, count=len(fechas)),
+            side="right"
+        ) - 1
+        return [valores[p] if p >= 0 else None for p in posiciones.tolist()]
+
+    @staticmethod
+    def trm_en_fecha(db: Session, fecha: date) -> Optional[Decimal]:
+        """TRM vigente a la fecha, o None si es anterior al inicio de la serie"""
+        return TRMService.trms_en_fechas(db, [fecha])[0]
+
+    @staticmethod
+    def trm_vigente(db: Session, fecha: Optional[date] = None) -> Decimal:
+        """
+        TRM para operar a una fecha (default: hoy)
+
+        Usa el histórico; sin datos a esa fecha recurre al parámetro
+        TRM_ACTUAL y, en último caso, a DEFAULT_TRM de la configuración.
+        """
+        trm = TRMService.trm_en_fecha(db, fecha or date.today())
+        if trm is not None:
+            return trm
+        return ParametrosService.obtener_numerico(
+            db, PARAM_TRM_ACTUAL, Decimal(str(settings.DEFAULT_TRM))
+        )
+
+    @staticmethod
+    def invalidar() -> None:
+        """Fuerza la recarga en la próxima consulta (usar tras cargar datos)"""
+        global _version
+        with _lock:
+            _version = None
+
+    @staticmethod
+    def estadisticas() -> Dict:
+        """Retorna recargas, verificaciones, consultas y rango de la serie en memoria"""
+        ordinales = _serie[0]
+        return dict(
+            _estadisticas,
+            registros=int(ordinales.size),
+            fecha_inicio=date.fromordinal(int(ordinales[0])) if ordinales.size else None,
+            fecha_fin=date.fromordinal(int(ordinales[-1])) if ordinales.size else None,
+        )
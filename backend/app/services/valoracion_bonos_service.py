@@ -0,0 +1,609 @@
+"""
+Motor Vectorizado de Valoración de Bonos
+Valora muchos bonos a muchas TIR con operaciones de arreglos NumPy (float64):
+- Matriz de precios bonos × TIR (precio limpio, cupón acumulado, precio sucio)
+- Precios de un portafolio contra una curva cero cupón (matriz bonos × tiempos)
+- Re-verificación opcional contra el motor Decimal exacto
+- TIR implícita a partir de un precio de mercado (Newton con salvaguarda)
+- Duración, convexidad y DV01 en la misma pasada de descuento
+- Curva precio/TIR de un bono en una sola evaluación
+"""
+from decimal import Decimal
+from datetime import date
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.services.calculo_service import CalculoFinancieroService
+from app.services.curva_rendimiento_service import CurvaCeroCupon
+from app.services.solver_tir_service import SolverTirService
+
+
+# Límite de puntos de la curva precio/TIR por solicitud
+MAX_PUNTOS_CURVA = 2000
+
+
+class ValoracionBonosService:
+    """Servicio de valoración masiva de bonos con NumPy"""
+
+    @staticmethod
+    def _preparar_bonos(bonos: List[Dict], fecha_valoracion: date) -> Dict:
+        """
+        Extrae los parámetros de cada bono a arreglos NumPy
+
+        Los periodos restantes y el cupón acumulado no dependen de la TIR,
+        así que se calculan una sola vez por bono.
+
+        Args:
+            bonos: Lista de dicts con valor_nominal, tasa_cupon, frecuencia_cupon,
+                   fecha_emision, fecha_vencimiento (e identificador opcional)
+            fecha_valoracion: Fecha a la que se valoran los bonos
+
+        Returns:
+            Dict con arreglos (nominal, cupon, frecuencia, periodos, cupon_acumulado,
+            dias) y la lista de errores por bono (None si el bono es válido)
+        """
+        total = len(bonos)
+        nominal = np.zeros(total)
+        cupon = np.zeros(total)
+        frecuencia = np.ones(total)
+        periodos = np.zeros(total)
+        cupon_acumulado = np.zeros(total)
+        dias = np.zeros(total, dtype=np.int64)
+        errores: List[Optional[str]] = [None] * total
+
+        for i, bono in enumerate(bonos):
+            f = int(bono["frecuencia_cupon"])
+            n = CalculoFinancieroService._calcular_num_periodos(
+                bono["fecha_emision"], bono["fecha_vencimiento"], fecha_valoracion, f
+            )
+            if n <= 0:
+                errores[i] = "El bono ya venció o la fecha de valoración es incorrecta"
+                continue
+
+            dias_cupon = CalculoFinancieroService._calcular_dias_desde_ultimo_cupon(
+                bono["fecha_emision"], fecha_valoracion, f, bono["fecha_vencimiento"]
+            )
+
+            nominal[i] = float(bono["valor_nominal"])
+            cupon[i] = nominal[i] * float(bono["tasa_cupon"]) / 100.0 / f
+            frecuencia[i] = f
+            periodos[i] = n
+            dias[i] = dias_cupon
+            cupon_acumulado[i] = cupon[i] * dias_cupon / (365 / f)
+
+        return {
+            "nominal": nominal,
+            "cupon": cupon,
+            "frecuencia": frecuencia,
+            "periodos": periodos,
+            "cupon_acumulado": cupon_acumulado,
+            "dias": dias,
+            "errores": errores,
+        }
+
+    @staticmethod
+    def _precio_limpio_vectorizado(
+        nominal: np.ndarray,
+        cupon: np.ndarray,
+        tir_periodo: np.ndarray,
+        periodos: np.ndarray
+    ) -> np.ndarray:
+        """
+        Forma cerrada de la anualidad evaluada sobre arreglos (con broadcasting)
+
+            VP = Cupón × (1 - v) / r + Nominal × v,   v = (1 + r)^-n
+
+        Usa log1p/expm1 para que (1 - v) no pierda dígitos con tasas pequeñas.
+        """
+        log_v = -periodos * np.log1p(tir_periodo)
+        v = np.exp(log_v)
+        uno_menos_v = -np.expm1(log_v)
+
+        es_cero = tir_periodo == 0
+        anualidad = np.where(
+            es_cero, periodos, uno_menos_v / np.where(es_cero, 1.0, tir_periodo)
+        )
+        return cupon * anualidad + nominal * v
+
+    @staticmethod
+    def calcular_precios_lote(
+        bonos: List[Dict],
+        tirs: List[Decimal],
+        fecha_valoracion: date,
+        verificar_exacto: bool = False
+    ) -> Dict:
+        """
+        Valora la matriz bonos × TIR en una sola pasada vectorizada
+
+        Args:
+            bonos: Lista de bonos (mismos campos que CalculoBonoRequest, sin TIR)
+            tirs: TIRs anuales en porcentaje (ej: 8.5 para 8.5%)
+            fecha_valoracion: Fecha de valoración común
+            verificar_exacto: Si True, recalcula cada celda con el motor Decimal
+                              y reporta la diferencia máxima encontrada
+
+        Returns:
+            Dict con una fila por bono (precios por TIR) y metadatos del cálculo
+        """
+        if not bonos:
+            raise ValueError("Debe enviar al menos un bono")
+        if not tirs:
+            raise ValueError("Debe enviar al menos una TIR")
+
+        datos = ValoracionBonosService._preparar_bonos(bonos, fecha_valoracion)
+        tir_anual = np.array([float(t) for t in tirs]) / 100.0
+
+        # Broadcasting: (bonos, 1) con (1, tirs) -> (bonos, tirs)
+        tir_periodo = tir_anual[None, :] / datos["frecuencia"][:, None]
+        precio_limpio = ValoracionBonosService._precio_limpio_vectorizado(
+            datos["nominal"][:, None],
+            datos["cupon"][:, None],
+            tir_periodo,
+            datos["periodos"][:, None],
+        )
+        precio_sucio = precio_limpio + datos["cupon_acumulado"][:, None]
+
+        precio_limpio = np.round(precio_limpio, 2)
+        precio_sucio = np.round(precio_sucio, 2)
+        cupon_acumulado = np.round(datos["cupon_acumulado"], 2)
+
+        resultados = []
+        for i, bono in enumerate(bonos):
+            error = datos["errores"][i]
+            resultados.append({
+                "indice": i,
+                "identificador": bono.get("identificador"),
+                "num_periodos": int(datos["periodos"][i]),
+                "dias_desde_ultimo_cupon": int(datos["dias"][i]),
+                "cupon_acumulado": None if error else float(cupon_acumulado[i]),
+                "precios_limpios": None if error else precio_limpio[i].tolist(),
+                "precios_sucios": None if error else precio_sucio[i].tolist(),
+                "error": error,
+            })
+
+        respuesta = {
+            "fecha_valoracion": fecha_valoracion,
+            "tirs": [float(t) for t in tirs],
+            "total_bonos": len(bonos),
+            "total_precios": sum(1 for e in datos["errores"] if e is None) * len(tirs),
+            "resultados": resultados,
+            "diferencia_maxima_exacto": None,
+        }
+
+        if verificar_exacto:
+            respuesta["diferencia_maxima_exacto"] = ValoracionBonosService._verificar_contra_decimal(
+                bonos, tirs, fecha_valoracion, precio_sucio, datos["errores"]
+            )
+
+        return respuesta
+
+    @staticmethod
+    def _verificar_contra_decimal(
+        bonos: List[Dict],
+        tirs: List[Decimal],
+        fecha_valoracion: date,
+        precio_sucio: np.ndarray,
+        errores: List[Optional[str]]
+    ) -> float:
+        """
+        Recalcula cada celda con CalculoFinancieroService (Decimal) y retorna
+        la mayor diferencia absoluta en precio sucio
+        """
+        diferencia_maxima = 0.0
+        for i, bono in enumerate(bonos):
+            if errores[i]:
+                continue
+            for j, tir in enumerate(tirs):
+                exacto = CalculoFinancieroService.calcular_precio_bono_sucio(
+                    valor_nominal=Decimal(str(bono["valor_nominal"])),
+                    tasa_cupon=Decimal(str(bono["tasa_cupon"])),
+                    frecuencia_cupon=int(bono["frecuencia_cupon"]),
+                    tir=Decimal(str(tir)),
+                    fecha_emision=bono["fecha_emision"],
+                    fecha_vencimiento=bono["fecha_vencimiento"],
+                    fecha_valoracion=fecha_valoracion
+                )
+                diferencia = abs(float(exacto["precio_sucio"]) - float(precio_sucio[i, j]))
+                diferencia_maxima = max(diferencia_maxima, diferencia)
+        return round(diferencia_maxima, 6)
+
+    @staticmethod
+    def calcular_precios_curva_lote(
+        bonos: List[Dict],
+        curva: CurvaCeroCupon,
+        fecha_valoracion: date
+    ) -> Dict:
+        """
+        Valora muchos bonos contra una misma curva cero cupón
+
+        Arma la matriz bonos × periodos de tiempos t = k / f (en años) y de
+        flujos, evalúa los factores de descuento de la curva una sola vez
+        sobre toda la matriz y suma por fila:
+
+            Precio limpio = Σ_k F_k × DF(k / f)
+
+        Args:
+            bonos: Lista de bonos (mismos campos que CalculoBonoRequest, sin TIR)
+            curva: Curva cero cupón construida (ver CurvaRendimientoService)
+            fecha_valoracion: Fecha de valoración común
+
+        Returns:
+            Dict con precio limpio, cupón acumulado y precio sucio por bono
+        """
+        if not bonos:
+            raise ValueError("Debe enviar al menos un bono")
+
+        datos = ValoracionBonosService._preparar_bonos(bonos, fecha_valoracion)
+        errores = datos["errores"]
+        idx = np.nonzero([e is None for e in errores])[0]
+
+        precio = np.zeros(len(bonos))
+        if idx.size:
+            periodos = datos["periodos"][idx]
+            k = np.arange(1, int(periodos.max()) + 1, dtype=np.float64)[None, :]
+            vigente = k <= periodos[:, None]
+            flujos = np.where(vigente, datos["cupon"][idx][:, None], 0.0)
+            flujos = flujos + np.where(k == periodos[:, None], datos["nominal"][idx][:, None], 0.0)
+
+            # Los tiempos fuera del cronograma se anulan para no extrapolar la curva
+            tiempos = np.where(vigente, k / datos["frecuencia"][idx][:, None], 0.0)
+            precio[idx] = (flujos * curva.factores_descuento(tiempos)).sum(axis=1)
+
+        resultados = []
+        for i, bono in enumerate(bonos):
+            if errores[i]:
+                resultados.append({
+                    "indice": i,
+                    "identificador": bono.get("identificador"),
+                    "error": errores[i],
+                })
+                continue
+            resultados.append({
+                "indice": i,
+                "identificador": bono.get("identificador"),
+                "num_periodos": int(datos["periodos"][i]),
+                "precio_limpio": round(float(precio[i]), 2),
+                "cupon_acumulado": round(float(datos["cupon_acumulado"][i]), 2),
+                "precio_sucio": round(float(precio[i] + datos["cupon_acumulado"][i]), 2),
+                "error": None,
+            })
+
+        return {
+            "fecha_valoracion": fecha_valoracion,
+            "total_bonos": len(bonos),
+            "resultados": resultados,
+        }
+
+    @staticmethod
+    def calcular_tir_implicita_lote(
+        bonos: List[Dict],
+        fecha_valoracion: date
+    ) -> Dict:
+        """
+        Calcula la TIR implícita de muchos bonos a partir de su precio de mercado
+
+        Args:
+            bonos: Lista de dicts con los campos del bono más precio_mercado y
+                   tipo_precio ('sucio' o 'limpio')
+            fecha_valoracion: Fecha de valoración común
+
+        Returns:
+            Dict con la TIR anual (%) por bono y estadísticas del solver
+        """
+        if not bonos:
+            raise ValueError("Debe enviar al menos un bono")
+
+        datos = ValoracionBonosService._preparar_bonos(bonos, fecha_valoracion)
+        errores = list(datos["errores"])
+
+        precio_mercado = np.array([float(b["precio_mercado"]) for b in bonos])
+        es_sucio = np.array([b.get("tipo_precio", "sucio") == "sucio" for b in bonos])
+        precio_objetivo = np.where(es_sucio, precio_mercado - datos["cupon_acumulado"], precio_mercado)
+
+        validos = np.array([e is None for e in errores])
+        for i in np.nonzero(validos & (precio_objetivo <= 0))[0]:
+            errores[i] = "El precio de mercado es menor o igual al cupón acumulado"
+            validos[i] = False
+
+        tir_anual = np.full(len(bonos), np.nan)
+        iteraciones = np.zeros(len(bonos), dtype=np.int64)
+        convergio = np.zeros(len(bonos), dtype=bool)
+
+        idx = np.nonzero(validos)[0]
+        if idx.size:
+            solucion = SolverTirService.resolver_tir_periodo(
+                datos["nominal"][idx], datos["cupon"][idx],
+                datos["periodos"][idx], precio_objetivo[idx]
+            )
+            tir_anual[idx] = solucion["tir_periodo"] * datos["frecuencia"][idx] * 100.0
+            iteraciones[idx] = solucion["iteraciones"]
+            convergio[idx] = solucion["convergio"]
+            for k in np.nonzero(solucion["fuera_de_rango"])[0]:
+                errores[idx[k]] = "El precio está fuera del rango de TIR soportado"
+
+        resultados = []
+        for i, bono in enumerate(bonos):
+            resultados.append({
+                "indice": i,
+                "identificador": bono.get("identificador"),
+                "tir": None if errores[i] else round(float(tir_anual[i]), 6),
+                "precio_objetivo_limpio": None if errores[i] else round(float(precio_objetivo[i]), 2),
+                "cupon_acumulado": None if errores[i] else round(float(datos["cupon_acumulado"][i]), 2),
+                "iteraciones": int(iteraciones[i]),
+                "convergio": bool(convergio[i]),
+                "error": errores[i],
+            })
+
+        return {
+            "fecha_valoracion": fecha_valoracion,
+            "total_bonos": len(bonos),
+            "total_convergidos": int(convergio.sum()),
+            "iteraciones_maximas": int(iteraciones.max()) if iteraciones.size else 0,
+            "resultados": resultados,
+        }
+
+    @staticmethod
+    def calcular_tir_implicita(
+        valor_nominal: Decimal,
+        tasa_cupon: Decimal,
+        frecuencia_cupon: int,
+        precio_mercado: Decimal,
+        fecha_emision: date,
+        fecha_vencimiento: date,
+        fecha_valoracion: date,
+        tipo_precio: str = "sucio"
+    ) -> Dict:
+        """
+        Calcula la TIR que reproduce un precio de mercado (sucio o limpio)
+
+        Resuelve con el mismo solver del modo lote y luego revalora el bono
+        con el motor Decimal a la TIR encontrada para reportar el desglose.
+
+        Args:
+            valor_nominal: Valor nominal del bono
+            tasa_cupon: Tasa de cupón anual (ej: 7.25 para 7.25%)
+            frecuencia_cupon: Pagos al año (1=anual, 2=semestral, 4=trimestral)
+            precio_mercado: Precio observado en el mercado
+            fecha_emision: Fecha de emisión del bono
+            fecha_vencimiento: Fecha de vencimiento del bono
+            fecha_valoracion: Fecha a la que se valora el bono
+            tipo_precio: 'sucio' (incluye cupón acumulado) o 'limpio'
+
+        Returns:
+            Dict con la TIR implícita (%) y la valoración del bono a esa TIR
+        """
+        bono = {
+            "valor_nominal": valor_nominal,
+            "tasa_cupon": tasa_cupon,
+            "frecuencia_cupon": frecuencia_cupon,
+            "fecha_emision": fecha_emision,
+            "fecha_vencimiento": fecha_vencimiento,
+            "precio_mercado": precio_mercado,
+            "tipo_precio": tipo_precio,
+        }
+        fila = ValoracionBonosService.calcular_tir_implicita_lote([bono], fecha_valoracion)["resultados"][0]
+
+        if fila["error"]:
+            raise ValueError(fila["error"])
+        if not fila["convergio"]:
+            raise ValueError("No se encontró una TIR que reproduzca el precio de mercado")
+
+        tir = Decimal(str(fila["tir"]))
+        resultado = CalculoFinancieroService.calcular_precio_bono_sucio(
+            valor_nominal=valor_nominal,
+            tasa_cupon=tasa_cupon,
+            frecuencia_cupon=frecuencia_cupon,
+            tir=tir,
+            fecha_emision=fecha_emision,
+            fecha_vencimiento=fecha_vencimiento,
+            fecha_valoracion=fecha_valoracion
+        )
+        resultado["tir_implicita"] = tir
+        resultado["precio_mercado"] = precio_mercado
+        resultado["tipo_precio"] = tipo_precio
+        resultado["iteraciones"] = fila["iteraciones"]
+        return resultado
+
+    @staticmethod
+    def calcular_analitica_lote(
+        bonos: List[Dict],
+        fecha_valoracion: date
+    ) -> Dict:
+        """
+        Calcula precio y sensibilidades de muchos bonos en una sola pasada
+
+        Cada bono se descuenta a su propia TIR con SolverTirService.descontar_flujos; de las
+        mismas sumas salen (r = TIR por periodo, f = frecuencia):
+
+            Duración Macaulay   = Σ t F_t v^t / (P × f)              [años]
+            Duración Modificada = Macaulay / (1 + r)
+            Convexidad          = Σ t (t+1) F_t v^t / (P × (1+r)² × f²)
+            DV01                = Modificada × P × 0.0001            [$ por pb]
+
+        P es el valor presente de los flujos (precio limpio); el cupón
+        acumulado no depende de la TIR, así que la sensibilidad del precio
+        sucio es la misma.
+
+        Args:
+            bonos: Lista de dicts con los campos del bono más su tir (%)
+            fecha_valoracion: Fecha de valoración común
+
+        Returns:
+            Dict con precio y medidas de riesgo por bono
+        """
+        if not bonos:
+            raise ValueError("Debe enviar al menos un bono")
+
+        datos = ValoracionBonosService._preparar_bonos(bonos, fecha_valoracion)
+        errores = datos["errores"]
+        validos = np.array([e is None for e in errores])
+        idx = np.nonzero(validos)[0]
+
+        tir_anual = np.array([float(b["tir"]) for b in bonos]) / 100.0
+        total = len(bonos)
+        precio = np.zeros(total)
+        macaulay = np.zeros(total)
+        modificada = np.zeros(total)
+        convexidad = np.zeros(total)
+        dv01 = np.zeros(total)
+
+        if idx.size:
+            f = datos["frecuencia"][idx]
+            r = tir_anual[idx] / f
+            p, suma_t, suma_tt = SolverTirService.descontar_flujos(
+                datos["nominal"][idx], datos["cupon"][idx], datos["periodos"][idx], r
+            )
+            precio[idx] = p
+            macaulay[idx] = suma_t / (p * f)
+            modificada[idx] = macaulay[idx] / (1.0 + r)
+            convexidad[idx] = suma_tt / (p * (1.0 + r) ** 2 * f ** 2)
+            dv01[idx] = modificada[idx] * p * 0.0001
+
+        resultados = []
+        for i, bono in enumerate(bonos):
+            if errores[i]:
+                resultados.append({
+                    "indice": i,
+                    "identificador": bono.get("identificador"),
+                    "error": errores[i],
+                })
+                continue
+            resultados.append({
+                "indice": i,
+                "identificador": bono.get("identificador"),
+                "tir_utilizada": float(bono["tir"]),
+                "num_periodos": int(datos["periodos"][i]),
+                "precio_limpio": round(float(precio[i]), 2),
+                "cupon_acumulado": round(float(datos["cupon_acumulado"][i]), 2),
+                "precio_sucio": round(float(precio[i] + datos["cupon_acumulado"][i]), 2),
+                "duracion_macaulay": round(float(macaulay[i]), 6),
+                "duracion_modificada": round(float(modificada[i]), 6),
+                "convexidad": round(float(convexidad[i]), 6),
+                "dv01": round(float(dv01[i]), 4),
+                "error": None,
+            })
+
+        return {
+            "fecha_valoracion": fecha_valoracion,
+            "total_bonos": total,
+            "resultados": resultados,
+        }
+
+    @staticmethod
+    def calcular_analitica(
+        valor_nominal: Decimal,
+        tasa_cupon: Decimal,
+        frecuencia_cupon: int,
+        tir: Decimal,
+        fecha_emision: date,
+        fecha_vencimiento: date,
+        fecha_valoracion: date
+    ) -> Dict:
+        """
+        Calcula precio, duración, convexidad y DV01 de un bono
+
+        Args:
+            valor_nominal: Valor nominal del bono
+            tasa_cupon: Tasa de cupón anual (ej: 7.25 para 7.25%)
+            frecuencia_cupon: Pagos al año (1=anual, 2=semestral, 4=trimestral)
+            tir: Tasa Interna de Retorno (ej: 8.5 para 8.5%)
+            fecha_emision: Fecha de emisión del bono
+            fecha_vencimiento: Fecha de vencimiento del bono
+            fecha_valoracion: Fecha a la que se valora el bono
+
+        Returns:
+            Dict con precio y medidas de riesgo del bono
+        """
+        bono = {
+            "valor_nominal": valor_nominal,
+            "tasa_cupon": tasa_cupon,
+            "frecuencia_cupon": frecuencia_cupon,
+            "tir": tir,
+            "fecha_emision": fecha_emision,
+            "fecha_vencimiento": fecha_vencimiento,
+        }
+        fila = ValoracionBonosService.calcular_analitica_lote([bono], fecha_valoracion)["resultados"][0]
+
+        if fila["error"]:
+            raise ValueError(fila["error"])
+
+        fila["fecha_valoracion"] = fecha_valoracion
+        return fila
+
+    @staticmethod
+    def calcular_curva_precio_tir(
+        valor_nominal: Decimal,
+        tasa_cupon: Decimal,
+        frecuencia_cupon: int,
+        fecha_emision: date,
+        fecha_vencimiento: date,
+        fecha_valoracion: date,
+        tir_minima: Decimal,
+        tir_maxima: Decimal,
+        paso: Decimal
+    ) -> Dict:
+        """
+        Genera la curva precio vs TIR de un bono en una sola pasada
+
+        Los flujos del bono (periodos y cupón acumulado salen del cronograma
+        cacheado) se descuentan a todas las TIR del rango a la vez: cada
+        punto es una fila de la matriz TIR × periodos.
+
+        Args:
+            valor_nominal, tasa_cupon, frecuencia_cupon, fecha_emision,
+            fecha_vencimiento, fecha_valoracion: Datos del bono
+            tir_minima: TIR inicial del rango (%)
+            tir_maxima: TIR final del rango (%), incluida
+            paso: Incremento entre puntos (%)
+
+        Returns:
+            Dict con los puntos (tir, precio limpio, precio sucio, duración modificada)
+        """
+        if paso <= 0:
+            raise ValueError("El paso debe ser mayor a cero")
+        if tir_maxima < tir_minima:
+            raise ValueError("La TIR máxima debe ser mayor o igual a la mínima")
+
+        num_puntos = int((tir_maxima - tir_minima) / paso) + 1
+        if num_puntos > MAX_PUNTOS_CURVA:
+            raise ValueError(f"El rango genera {num_puntos} puntos; el máximo es {MAX_PUNTOS_CURVA}")
+
+        bono = {
+            "valor_nominal": valor_nominal,
+            "tasa_cupon": tasa_cupon,
+            "frecuencia_cupon": frecuencia_cupon,
+            "fecha_emision": fecha_emision,
+            "fecha_vencimiento": fecha_vencimiento,
+        }
+        datos = ValoracionBonosService._preparar_bonos([bono], fecha_valoracion)
+        if datos["errores"][0]:
+            raise ValueError(datos["errores"][0])
+
+        tirs = float(tir_minima) + float(paso) * np.arange(num_puntos)
+        r = tirs / 100.0 / frecuencia_cupon
+        unos = np.ones(num_puntos)
+
+        precio, suma_t, _ = SolverTirService.descontar_flujos(
+            datos["nominal"][0] * unos, datos["cupon"][0] * unos, datos["periodos"][0] * unos, r
+        )
+        duracion_modificada = suma_t / (precio * frecuencia_cupon * (1.0 + r))
+        cupon_acumulado = float(datos["cupon_acumulado"][0])
+
+        puntos = [
+            {
+                "tir": round(float(tirs[k]), 6),
+                "precio_limpio": round(float(precio[k]), 2),
+                "precio_sucio": round(float(precio[k]) + cupon_acumulado, 2),
+                "duracion_modificada": round(float(duracion_modificada[k]), 6),
+            }
+            for k in range(num_puntos)
+        ]
+
+        return {
+            "fecha_valoracion": fecha_valoracion,
+            "num_periodos": int(datos["periodos"][0]),
+            "cupon_acumulado": round(cupon_acumulado, 2),
+            "total_puntos": num_puntos,
+            "puntos": puntos,
+        }
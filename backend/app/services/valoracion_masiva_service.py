@@ -0,0 +1,159 @@
+"""
+Valoración Masiva de Bonos
+Valora en un solo proceso por lotes todo el universo de bonos del catálogo:
+- Una sola consulta de los bonos activos (sin carga perezosa de tipo_activo)
+- Valoración repartida en un pool de procesos (motor Decimal exacto)
+- Inserción masiva del resultado en calculos_bonos
+- Reporte de tiempos y throughput
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from decimal import Decimal
+from multiprocessing import get_context
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models import Activo, CalculoBono, TipoActivo
+from app.services.calculo_service import CalculoFinancieroService
+
+# Por debajo de este número de bonos no compensa arrancar procesos
+MIN_BONOS_POR_PROCESO = 50
+
+
+def _valorar_bloque(
+    bonos: List[Tuple],
+    tir: Optional[Decimal],
+    fecha_valoracion: date
+) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Valora un bloque de bonos (se ejecuta dentro de un proceso del pool)
+
+    Args:
+        bonos: Tuplas (id_activo, ticker, valor_nominal, tasa_cupon,
+               frecuencia_cupon, fecha_emision, fecha_vencimiento)
+        tir: TIR común (%) o None para usar la tasa cupón de cada bono
+        fecha_valoracion: Fecha de valoración
+
+    Returns:
+        Tupla (registros para calculos_bonos, errores por bono)
+    """
+    registros, errores = [], []
+    for id_activo, ticker, nominal, cupon, frecuencia, emision, vencimiento in bonos:
+        tir_bono = tir if tir is not None else cupon
+        try:
+            resultado = CalculoFinancieroService.calcular_precio_bono_sucio(
+                valor_nominal=nominal,
+                tasa_cupon=cupon,
+                frecuencia_cupon=frecuencia,
+                tir=tir_bono,
+                fecha_emision=emision,
+                fecha_vencimiento=vencimiento,
+                fecha_valoracion=fecha_valoracion
+            )
+        except (ValueError, ArithmeticError) as e:
+            errores.append({"ticker": ticker, "error": str(e)})
+            continue
+        registros.append({
+            "id_activo": id_activo,
+            "fecha_calculo": fecha_valoracion,
+            "tir": tir_bono,
+            "precio_limpio": resultado["precio_limpio"],
+            "cupon_acumulado": resultado["cupon_acumulado"],
+            "precio_sucio": resultado["precio_sucio"],
+            "dias_desde_ultimo_cupon": resultado["dias_desde_ultimo_cupon"],
+        })
+    return registros, errores
+
+
+class ValoracionMasivaService:
+    """Servicio de valoración de todo el universo de bonos"""
+
+    @staticmethod
+    def cargar_bonos(db: Session) -> List[Tuple]:
+        """
+        Carga en una sola consulta los datos de valoración de los bonos activos
+
+        Returns:
+            Lista de tuplas (id_activo, ticker, valor_nominal, tasa_cupon,
+            frecuencia_cupon, fecha_emision, fecha_vencimiento)
+        """
+        filas = db.query(
+            Activo.id_activo, Activo.ticker, Activo.valor_nominal, Activo.tasa_cupon,
+            Activo.frecuencia_cupon, Activo.fecha_emision, Activo.fecha_vencimiento
+        ).join(TipoActivo, Activo.id_tipo_activo == TipoActivo.id_tipo_activo).filter(
+            TipoActivo.nombre == 'BONO',
+            Activo.activo.is_(True),
+            Activo.valor_nominal.isnot(None),
+            Activo.tasa_cupon.isnot(None),
+            Activo.frecuencia_cupon.isnot(None),
+            Activo.fecha_emision.isnot(None),
+            Activo.fecha_vencimiento.isnot(None),
+        ).order_by(Activo.ticker).all()
+        return [tuple(fila) for fila in filas]
+
+    @staticmethod
+    def valorar_universo_bonos(
+        db: Session,
+        fecha_valoracion: Optional[date] = None,
+        tir: Optional[Decimal] = None,
+        procesos: Optional[int] = None
+    ) -> Dict:
+        """
+        Valora todos los bonos activos y guarda el resultado en calculos_bonos
+
+        Args:
+            db: Sesión de base de datos
+            fecha_valoracion: Fecha de valoración (por defecto hoy)
+            tir: TIR común (%); si es None cada bono se valora a su tasa cupón
+            procesos: Tamaño del pool (por defecto núcleos disponibles)
+
+        Returns:
+            Dict con conteos, errores, tiempos por etapa y bonos por segundo
+        """
+        if fecha_valoracion is None:
+            fecha_valoracion = date.today()
+        if procesos is not None and procesos < 1:
+            raise ValueError("El número de procesos debe ser al menos 1")
+
+        inicio = time.perf_counter()
+        bonos = ValoracionMasivaService.cargar_bonos(db)
+        t_carga = time.perf_counter()
+
+        procesos = min(procesos or os.cpu_count() or 1, max(1, len(bonos) // MIN_BONOS_POR_PROCESO))
+        registros, errores = [], []
+        if procesos == 1:
+            registros, errores = _valorar_bloque(bonos, tir, fecha_valoracion)
+        else:
+            bloques = [bonos[k::procesos] for k in range(procesos)]
+            with ProcessPoolExecutor(max_workers=procesos, mp_context=get_context("spawn")) as pool:
+                for reg, err in pool.map(
+                    _valorar_bloque, bloques, [tir] * procesos, [fecha_valoracion] * procesos
+                ):
+                    registros.extend(reg)
+                    errores.extend(err)
+        t_valoracion = time.perf_counter()
+
+        if registros:
+            db.execute(insert(CalculoBono), registros)
+            db.commit()
+        fin = time.perf_counter()
+
+        segundos_valoracion = t_valoracion - t_carga
+        return {
+            "fecha_valoracion": fecha_valoracion,
+            "total_bonos": len(bonos),
+            "valorados": len(registros),
+            "errores": errores,
+            "procesos": procesos,
+            "tiempos_segundos": {
+                "carga": round(t_carga - inicio, 4),
+                "valoracion": round(segundos_valoracion, 4),
+                "insercion": round(fin - t_valoracion, 4),
+                "total": round(fin - inicio, 4),
+            },
+            "bonos_por_segundo": round(len(bonos) / segundos_valoracion, 1) if segundos_valoracion > 0 else None,
+        }
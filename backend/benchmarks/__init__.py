@@ -0,0 +1,8 @@
+"""
+Benchmarks de las rutas críticas del motor (calculo_service y lote_service)
+
+Uso (desde backend/):
+    python -m benchmarks                                  # imprime y guarda benchmarks/resultados.json
+    python -m benchmarks --lotes 10,1000 --salida base.json
+    python -m benchmarks --comparar base.json --tolerancia 0.25
+"""
@@ -0,0 +1,84 @@
+"""
+Punto de entrada: python -m benchmarks (desde backend/)
+"""
+import argparse
+import json
+import platform
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import sqlalchemy
+
+from app.config import settings
+from benchmarks import bench_calculos, bench_lotes
+from benchmarks.comun import SEMILLA, llave_caso
+
+SALIDA_DEFECTO = Path(__file__).parent / "resultados.json"
+
+
+def comparar(actuales: list, base: dict, tolerancia: float) -> int:
+    """Imprime la variación de la mediana contra la base; retorna el número de regresiones"""
+    previos = {llave_caso(r): r for r in base["resultados"]}
+    regresiones = 0
+    for resultado in actuales:
+        previo = previos.get(llave_caso(resultado))
+        if previo is None:
+            continue
+        cambio = resultado["mediana_us"] / previo["mediana_us"] - 1 if previo["mediana_us"] else 0.0
+        marca = "❌" if cambio > tolerancia else "✅"
+        regresiones += cambio > tolerancia
+        print(f"{marca} {llave_caso(resultado)}: {previo['mediana_us']:.1f} → "
+              f"{resultado['mediana_us']:.1f} µs ({cambio:+.1%})")
+    return regresiones
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks del motor de cálculos y de lotes")
+    parser.add_argument("--repeticiones", type=int, default=7, help="Repeticiones por caso (default: 7)")
+    parser.add_argument("--iteraciones", type=int, default=200,
+                        help="Llamadas por repetición en los cálculos puros (default: 200)")
+    parser.add_argument("--lotes", type=lambda s: [int(x) for x in s.split(",")], default=[10, 1000, 100000],
+                        help="Tamaños de portafolio para las ventas FIFO (default: 10,1000,100000)")
+    parser.add_argument("--salida", type=Path, default=SALIDA_DEFECTO, help="Archivo JSON de resultados")
+    parser.add_argument("--comparar", type=Path, default=None, help="JSON de una corrida base para comparar")
+    parser.add_argument("--tolerancia", type=float, default=0.25,
+                        help="Aumento relativo de la mediana que cuenta como regresión (default: 0.25)")
+    args = parser.parse_args()
+
+    # Los benchmarks miden el cálculo, no la caché de resultados
+    settings.CACHE_CALCULOS_HABILITADA = False
+
+    resultados = bench_calculos.ejecutar(args.repeticiones, args.iteraciones)
+    resultados += bench_lotes.ejecutar(args.repeticiones, args.lotes)
+
+    for r in resultados:
+        print(f"{llave_caso(r)}: mediana {r['mediana_us']:.1f} µs | p95 {r['p95_us']:.1f} µs")
+
+    reporte = {
+        "metadatos": {
+            "fecha": datetime.now().isoformat(timespec="seconds"),
+            "semilla": SEMILLA,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "sqlalchemy": sqlalchemy.__version__,
+            "plataforma": platform.platform(),
+            "repeticiones": args.repeticiones,
+            "iteraciones": args.iteraciones,
+        },
+        "resultados": resultados,
+    }
+    args.salida.write_text(json.dumps(reporte, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"💾 Resultados guardados en {args.salida}")
+
+    if args.comparar:
+        base = json.loads(args.comparar.read_text(encoding="utf-8"))
+        regresiones = comparar(resultados, base, args.tolerancia)
+        print(f"{'❌' if regresiones else '✅'} {regresiones} regresión(es) sobre {args.tolerancia:.0%}")
+        return 1 if regresiones else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
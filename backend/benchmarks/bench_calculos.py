@@ -0,0 +1,77 @@
+"""
+Benchmarks de CalculoFinancieroService: bonos, CDT y conversión de divisas
+"""
+from datetime import date
+from decimal import Decimal
+from typing import Dict, List
+
+import numpy as np
+from dateutil.relativedelta import relativedelta
+
+from app.services.calculo_service import CalculoFinancieroService, MODOS_PRECISION
+from benchmarks.comun import SEMILLA, crear_sesion, medir
+
+GRUPO = "calculo_service"
+FECHA_VALORACION = date(2026, 2, 6)
+PLAZOS_BONO_ANIOS = (1, 5, 10, 30)  # plazo restante al vencimiento
+FRECUENCIAS_BONO = (2, 12)
+PLAZOS_CDT_DIAS = (30, 90, 360)
+
+
+def ejecutar(repeticiones: int, iteraciones: int) -> List[Dict]:
+    """Corre todos los casos del motor de cálculos"""
+    rng = np.random.default_rng(SEMILLA)
+    resultados = []
+
+    for anios in PLAZOS_BONO_ANIOS:
+        for frecuencia in FRECUENCIAS_BONO:
+            for modo in MODOS_PRECISION:
+                datos = {
+                    "valor_nominal": Decimal('1000000'),
+                    "tasa_cupon": Decimal(str(round(rng.uniform(4, 12), 2))),
+                    "frecuencia_cupon": frecuencia,
+                    "tir": Decimal(str(round(rng.uniform(4, 14), 3))),
+                    "fecha_emision": FECHA_VALORACION - relativedelta(months=2),
+                    "fecha_vencimiento": FECHA_VALORACION + relativedelta(years=anios),
+                    "fecha_valoracion": FECHA_VALORACION,
+                    "modo_precision": modo,
+                }
+                resultados.append(medir(
+                    GRUPO, "precio_bono_sucio",
+                    {"anios": anios, "frecuencia": frecuencia, "modo": modo},
+                    lambda datos=datos: CalculoFinancieroService.calcular_precio_bono_sucio(**datos),
+                    repeticiones, iteraciones
+                ))
+
+    db = crear_sesion()
+    try:
+        for plazo in PLAZOS_CDT_DIAS:
+            for anticipada in (False, True):
+                datos = {
+                    "capital_invertido": Decimal('10000000'),
+                    "tasa_interes_anual": Decimal(str(round(rng.uniform(8, 14), 2))),
+                    "fecha_inicio": date(2026, 1, 1),
+                    "fecha_liquidacion": date(2026, 1, 1) + relativedelta(days=plazo // 2 if anticipada else plazo),
+                    "plazo_dias_original": plazo,
+                    "db": db,
+                }
+                resultados.append(medir(
+                    GRUPO, "liquidacion_cdt", {"plazo_dias": plazo, "anticipada": anticipada},
+                    lambda datos=datos: CalculoFinancieroService.calcular_liquidacion_cdt(**datos),
+                    repeticiones, iteraciones
+                ))
+    finally:
+        db.close()
+
+    datos = {
+        "cantidad": Decimal('137'),
+        "precio_unitario": Decimal(str(round(rng.uniform(50, 500), 2))),
+        "trm": Decimal('4185.37'),
+        "comision": Decimal('25000'),
+    }
+    resultados.append(medir(
+        GRUPO, "convertir_divisa", {},
+        lambda: CalculoFinancieroService.convertir_divisa(**datos),
+        repeticiones, iteraciones
+    ))
+    return resultados
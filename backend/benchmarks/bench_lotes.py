@@ -0,0 +1,49 @@
+"""
+Benchmarks de LoteService: ventas FIFO sobre portafolios de distinto tamaño
+"""
+from decimal import Decimal
+from typing import Dict, List, Sequence
+
+from app.services.lote_service import LoteService
+from benchmarks.comun import CANTIDAD_POR_LOTE, crear_sesion, medir, sembrar_portafolio
+
+GRUPO = "lote_service"
+
+# Fracción de los lotes que consume cada venta
+VENTAS = {"un_lote": None, "mitad": 0.5}
+
+# Por encima de este tamaño se hace una sola repetición (sembrar la BD es lo costoso)
+MAX_LOTES_REPETIDOS = 1000
+
+
+def ejecutar(repeticiones: int, tamanos: Sequence[int]) -> List[Dict]:
+    """Corre una venta FIFO por tamaño de portafolio y tipo de venta"""
+    resultados = []
+    for num_lotes in tamanos:
+        for nombre_venta, fraccion in VENTAS.items():
+            lotes_vendidos = 1 if fraccion is None else max(1, int(num_lotes * fraccion))
+
+            def preparar(num_lotes=num_lotes):
+                db = crear_sesion()
+                return db, sembrar_portafolio(db, num_lotes)
+
+            def vender(estado, lotes_vendidos=lotes_vendidos):
+                db, ids = estado
+                try:
+                    LoteService.vender_activo(
+                        db, ids["id_usuario"], ids["id_activo"],
+                        cantidad_venta=CANTIDAD_POR_LOTE * lotes_vendidos,
+                        precio_venta=Decimal('25000'),
+                        comision=Decimal('1000')
+                    )
+                finally:
+                    db.close()
+
+            resultados.append(medir(
+                GRUPO, "venta_fifo",
+                {"lotes": num_lotes, "venta": nombre_venta, "lotes_vendidos": lotes_vendidos},
+                vender,
+                repeticiones if num_lotes <= MAX_LOTES_REPETIDOS else 1,
+                preparar=preparar
+            ))
+    return resultados
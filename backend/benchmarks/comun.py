@@ -0,0 +1,110 @@
+"""
+Utilidades de los benchmarks: medición, BD SQLite en memoria y datos sembrados
+"""
+import statistics
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Callable, Dict, Optional
+
+import numpy as np
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models import Activo, CajaAhorros, Lote, TipoActivo, Usuario
+
+SEMILLA = 20260206
+CANTIDAD_POR_LOTE = Decimal('10')
+
+
+def medir(
+    grupo: str,
+    nombre: str,
+    parametros: Dict,
+    funcion: Callable[[], object],
+    repeticiones: int,
+    iteraciones: int = 1,
+    preparar: Optional[Callable[[], object]] = None
+) -> Dict:
+    """
+    Mide `funcion` y retorna las estadísticas por llamada en microsegundos
+
+    Cada repetición ejecuta `iteraciones` llamadas seguidas; si se indica
+    `preparar`, se ejecuta antes de cada repetición (fuera del tiempo
+    medido) y su resultado se pasa a `funcion`. Se descarta una corrida de
+    calentamiento cuando no hay preparación.
+    """
+    if preparar is None:
+        funcion()
+
+    muestras = []
+    for _ in range(repeticiones):
+        estado = preparar() if preparar else None
+        inicio = time.perf_counter_ns()
+        for _ in range(iteraciones):
+            funcion(estado) if preparar else funcion()
+        muestras.append((time.perf_counter_ns() - inicio) / iteraciones / 1000.0)
+
+    muestras.sort()
+    return {
+        "grupo": grupo,
+        "nombre": nombre,
+        "parametros": parametros,
+        "repeticiones": repeticiones,
+        "iteraciones": iteraciones,
+        "mediana_us": round(statistics.median(muestras), 3),
+        "min_us": round(muestras[0], 3),
+        "max_us": round(muestras[-1], 3),
+        "p95_us": round(float(np.percentile(muestras, 95)), 3),
+    }
+
+
+def llave_caso(resultado: Dict) -> str:
+    """Identificador estable de un caso (para comparar corridas)"""
+    parametros = ",".join(f"{k}={v}" for k, v in sorted(resultado["parametros"].items()))
+    return f"{resultado['grupo']}.{resultado['nombre']}[{parametros}]"
+
+
+def crear_sesion() -> Session:
+    """Sesión sobre una BD SQLite en memoria nueva con todas las tablas"""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+
+
+def sembrar_portafolio(db: Session, num_lotes: int, semilla: int = SEMILLA) -> Dict:
+    """
+    Crea un usuario con caja, un activo y `num_lotes` lotes abiertos
+
+    Los lotes se insertan en bloque con fechas de compra crecientes (orden
+    FIFO conocido) y precios aleatorios con semilla fija.
+    """
+    rng = np.random.default_rng(semilla)
+    usuario = Usuario(nombre="Benchmark", email="bench@simulador.local", password_hash="x")
+    tipo = TipoActivo(nombre="ACCION", descripcion="Acciones")
+    db.add_all([usuario, tipo])
+    db.flush()
+    activo = Activo(id_tipo_activo=tipo.id_tipo_activo, ticker="BENCH", nombre="Activo benchmark", moneda="COP")
+    db.add(activo)
+    db.add(CajaAhorros(id_caja=usuario.id_usuario, id_usuario=usuario.id_usuario, saldo_actual=Decimal('0')))
+    db.flush()
+
+    inicio = datetime(2020, 1, 1)
+    precios = np.round(rng.uniform(1_000, 50_000, num_lotes), 2)
+    db.execute(insert(Lote), [
+        {
+            "id_usuario": usuario.id_usuario,
+            "id_activo": activo.id_activo,
+            "cantidad_inicial": CANTIDAD_POR_LOTE,
+            "cantidad_disponible": CANTIDAD_POR_LOTE,
+            "precio_compra": Decimal(str(precio)),
+            "trm": Decimal('1'),
+            "costo_total": CANTIDAD_POR_LOTE * Decimal(str(precio)),
+            "fecha_compra": inicio + timedelta(minutes=k),
+        }
+        for k, precio in enumerate(precios)
+    ])
+    db.commit()
+    return {"id_usuario": usuario.id_usuario, "id_activo": activo.id_activo}
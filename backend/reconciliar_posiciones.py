@@ -0,0 +1,46 @@
+"""
+Reconciliación de la tabla de posiciones contra los lotes
+
+Uso (desde backend/):
+    python reconciliar_posiciones.py                  # sólo verificar (todos los usuarios)
+    python reconciliar_posiciones.py --reconstruir    # reconstruir desde lotes y verificar
+    python reconciliar_posiciones.py --usuario <uuid> --reconstruir
+
+Ejecutar --reconstruir una vez al desplegar la tabla sobre una BD con lotes.
+Retorna código 1 si quedan diferencias.
+"""
+import argparse
+import sys
+from uuid import UUID
+
+from app.database import SessionLocal
+from app.services.posicion_service import PosicionService
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Verifica o reconstruye la tabla de posiciones")
+    parser.add_argument("--usuario", type=UUID, default=None,
+                        help="UUID del usuario (default: todos)")
+    parser.add_argument("--reconstruir", action="store_true",
+                        help="Reemplazar las posiciones por el agregado de lotes antes de verificar")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.reconstruir:
+            escritas = PosicionService.reconstruir(db, args.usuario)
+            print(f"🔧 Posiciones reconstruidas: {escritas}")
+        diferencias = PosicionService.verificar(db, args.usuario)
+    finally:
+        db.close()
+
+    for d in diferencias:
+        print(f"❌ usuario {d['id_usuario']} activo {d['id_activo']} {d['campo']}: "
+              f"tabla {d['tabla']} ≠ lotes {d['lotes']}")
+    if not diferencias:
+        print("✅ Posiciones reconciliadas con los lotes")
+    return 1 if diferencias else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,6 +7,11 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.database import Base, get_db
 from app.main import app
+from app.services.parametros_service import ParametrosService
+from app.services.curva_rendimiento_service import CurvaRendimientoService
+from app.services.riesgo_service import RiesgoPortafolioService
+from app.services.trm_service import TRMService
+from app.services.clasificacion_service import ClasificacionService
 
 # Base de datos de prueba en memoria (SQLite)
 SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
@@ -22,6 +27,12 @@ def db_session():
     TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
     Base.metadata.create_all(bind=engine)
+    # Cada test usa una BD nueva: las cachés ligadas a la BD no deben sobrevivir
+    ParametrosService.invalidar()
+    CurvaRendimientoService.limpiar_cache()
+    RiesgoPortafolioService.invalidar()
+    TRMService.invalidar()
+    ClasificacionService.invalidar()
 
     db = TestingSessionLocal()
     try:
@@ -43,8 +54,11 @@ def client(db_session):
             pass
 
     app.dependency_overrides[get_db] = _override_get_db
+    # Sin write-behind: el historial se escribe de forma síncrona en la BD de prueba
+    fabrica_sesiones, app.state.fabrica_sesiones = app.state.fabrica_sesiones, None
     with TestClient(app) as c:
         yield c
+    app.state.fabrica_sesiones = fabrica_sesiones
     app.dependency_overrides.clear()
 
 
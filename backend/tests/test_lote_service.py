@@ -0,0 +1,465 @@
+"""
+Tests del servicio de lotes — compra/venta FIFO, reintentos y concurrencia
+"""
+import os
+import threading
+import time
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.database import con_reintentos, es_error_reintentable
+from app.models import Activo, CajaAhorros, Lote, TipoActivo, Transaccion, Usuario
+from app.services.lote_service import LoteService
+from app.services.posicion_service import PosicionService
+
+# Postgres real para la prueba de concurrencia (SQLite no tiene FOR UPDATE)
+TEST_POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+
+
+def _crear_usuario(db, email, saldo=Decimal('10000000')):
+    usuario = Usuario(nombre=email, email=email, password_hash="x")
+    db.add(usuario)
+    db.flush()
+    db.add(CajaAhorros(id_caja=usuario.id_usuario, id_usuario=usuario.id_usuario, saldo_actual=saldo))
+    db.commit()
+    return usuario
+
+
+def _crear_activos(db, tickers):
+    tipo = TipoActivo(nombre="ACCION", descripcion="Acciones")
+    db.add(tipo)
+    db.flush()
+    activos = [
+        Activo(id_tipo_activo=tipo.id_tipo_activo, ticker=t, nombre=t, moneda="COP")
+        for t in tickers
+    ]
+    db.add_all(activos)
+    db.commit()
+    return activos
+
+
+class _ErrorPG(Exception):
+    """Excepción del driver con SQLSTATE, como las de psycopg2"""
+
+    def __init__(self, pgcode):
+        super().__init__(f"pgcode {pgcode}")
+        self.pgcode = pgcode
+
+
+# ═══════════════════════════════════════════════
+# Reintentos de transacciones
+# ═══════════════════════════════════════════════
+class TestReintentos:
+    """Tests para es_error_reintentable / con_reintentos"""
+
+    def test_clasifica_errores(self):
+        assert es_error_reintentable(OperationalError("SELECT", {}, _ErrorPG("40001")))
+        assert es_error_reintentable(OperationalError("SELECT", {}, _ErrorPG("40P01")))
+        assert not es_error_reintentable(OperationalError("SELECT", {}, _ErrorPG("23505")))
+        assert not es_error_reintentable(ValueError("Saldo insuficiente"))
+
+    def test_reintenta_serializacion_y_luego_exito(self):
+        db = MagicMock()
+        llamadas = []
+
+        def operacion():
+            llamadas.append(1)
+            if len(llamadas) < 3:
+                raise OperationalError("UPDATE", {}, _ErrorPG("40P01"))
+            return "ok"
+
+        assert con_reintentos(db, operacion, intentos=5, espera_base=0) == "ok"
+        assert len(llamadas) == 3
+        assert db.rollback.call_count == 2
+
+    def test_no_reintenta_errores_de_negocio(self):
+        db = MagicMock()
+        operacion = MagicMock(side_effect=ValueError("Saldo insuficiente"))
+        with pytest.raises(ValueError):
+            con_reintentos(db, operacion, intentos=5, espera_base=0)
+        assert operacion.call_count == 1
+        db.rollback.assert_called_once()
+
+    def test_agota_intentos(self):
+        db = MagicMock()
+        operacion = MagicMock(side_effect=OperationalError("UPDATE", {}, _ErrorPG("40001")))
+        with pytest.raises(OperationalError):
+            con_reintentos(db, operacion, intentos=3, espera_base=0)
+        assert operacion.call_count == 3
+
+
+# ═══════════════════════════════════════════════
+# Compra y venta FIFO
+# ═══════════════════════════════════════════════
+class TestCompraVentaFIFO:
+    """Tests para LoteService.comprar_activo / vender_activo"""
+
+    def test_venta_consume_lotes_en_orden_fifo(self, db_session):
+        usuario = _crear_usuario(db_session, "fifo@test.com")
+        activo, = _crear_activos(db_session, ["FIFO"])
+        for precio in ("100", "200", "300"):
+            LoteService.comprar_activo(db_session, usuario.id_usuario, activo.id_activo,
+                                       Decimal('10'), Decimal(precio))
+
+        resultado = LoteService.vender_activo(db_session, usuario.id_usuario, activo.id_activo,
+                                              Decimal('15'), Decimal('400'))
+
+        assert [a["cantidad_vendida"] for a in resultado["lotes_afectados"]] == [Decimal('10'), Decimal('5')]
+        assert resultado["saldo_nuevo"] == Decimal('10000000') - Decimal('6000') + Decimal('6000')
+        disponibles = [
+            l.cantidad_disponible for l in
+            db_session.query(Lote).order_by(Lote.fecha_compra, Lote.id_lote)
+        ]
+        assert disponibles == [Decimal('0'), Decimal('5'), Decimal('10')]
+
+    def test_venta_lee_solo_los_lotes_necesarios(self, db_session):
+        from app.services import lote_service
+        usuario = _crear_usuario(db_session, "ventanas@test.com")
+        activo, = _crear_activos(db_session, ["VENT"])
+        LoteService.comprar_activos_lote(db_session, usuario.id_usuario, [
+            {"id_activo": activo.id_activo, "cantidad": Decimal('1'), "precio_compra": Decimal('10')}
+            for _ in range(3 * lote_service.VENTANA_FIFO_INICIAL)
+        ])
+        # Misma fecha de compra para todos: el orden lo desempata id_lote entre ventanas
+        db_session.query(Lote).update({Lote.fecha_compra: datetime(2026, 1, 1)})
+        db_session.commit()
+        orden = [l.id_lote for l in db_session.query(Lote).order_by(Lote.fecha_compra, Lote.id_lote)]
+        cantidad = Decimal(lote_service.VENTANA_FIFO_INICIAL + 5)
+
+        lotes = LoteService._lotes_fifo(db_session, usuario.id_usuario, activo.id_activo, cantidad)
+        assert [l.id_lote for l in lotes] == orden[:int(cantidad)]
+        db_session.rollback()
+
+        resultado = LoteService.vender_activo(db_session, usuario.id_usuario, activo.id_activo,
+                                              cantidad, Decimal('10'))
+        assert [a["id_lote"] for a in resultado["lotes_afectados"]] == orden[:int(cantidad)]
+        assert all(a["estado_anterior"] == "VERDE" and a["estado_nuevo"] == "ROJO"
+                   for a in resultado["lotes_afectados"])
+        assert LoteService._cantidad_disponible(db_session, usuario.id_usuario, activo.id_activo) == \
+            Decimal(3 * lote_service.VENTANA_FIFO_INICIAL) - cantidad
+
+    def test_venta_sin_cantidad_no_modifica_nada(self, db_session):
+        usuario = _crear_usuario(db_session, "corto@test.com")
+        activo, = _crear_activos(db_session, ["CORTO"])
+        LoteService.comprar_activo(db_session, usuario.id_usuario, activo.id_activo,
+                                   Decimal('5'), Decimal('100'))
+
+        with pytest.raises(ValueError, match="insuficiente"):
+            con_reintentos(db_session, lambda: LoteService.vender_activo(
+                db_session, usuario.id_usuario, activo.id_activo, Decimal('6'), Decimal('100')
+            ))
+        assert db_session.query(Lote).one().cantidad_disponible == Decimal('5')
+
+
+# ═══════════════════════════════════════════════
+# Compra masiva
+# ═══════════════════════════════════════════════
+class TestCompraMasiva:
+    """Tests para LoteService.comprar_activos_lote"""
+
+    def test_crea_lotes_y_encadena_saldos(self, db_session):
+        usuario = _crear_usuario(db_session, "masiva@test.com", Decimal('100000'))
+        a, b = _crear_activos(db_session, ["MA", "MB"])
+        compras = [
+            {"id_activo": a.id_activo, "cantidad": Decimal('10'), "precio_compra": Decimal('100')},
+            {"id_activo": b.id_activo, "cantidad": Decimal('2'), "precio_compra": Decimal('5'),
+             "trm": Decimal('4000'), "comision": Decimal('500')},
+        ]
+
+        resultado = LoteService.comprar_activos_lote(db_session, usuario.id_usuario, compras)
+
+        assert resultado["costo_total"] == Decimal('41500')
+        assert resultado["saldo_nuevo"] == Decimal('58500')
+        primero, segundo = resultado["resultados"]
+        assert primero["saldo_caja_despues"] == segundo["saldo_caja_antes"] == Decimal('99000')
+        assert segundo["saldo_caja_despues"] == Decimal('58500')
+        assert db_session.query(Lote).count() == 2
+        transaccion = db_session.query(Transaccion).filter(Transaccion.id_lote == segundo["id_lote"]).one()
+        assert transaccion.monto_operacion == Decimal('40500')
+
+        # Los lotes creados en bloque se venden con el FIFO normal
+        venta = LoteService.vender_activo(db_session, usuario.id_usuario, a.id_activo,
+                                          Decimal('4'), Decimal('100'))
+        assert venta["lotes_afectados"][0]["id_lote"] == primero["id_lote"]
+
+    def test_fifo_respeta_el_orden_de_la_solicitud(self, db_session):
+        usuario = _crear_usuario(db_session, "ordenmasiva@test.com")
+        activo, = _crear_activos(db_session, ["ORD"])
+        resultado = LoteService.comprar_activos_lote(db_session, usuario.id_usuario, [
+            {"id_activo": activo.id_activo, "cantidad": Decimal('1'), "precio_compra": Decimal(precio)}
+            for precio in range(100, 120)
+        ])
+        orden_compra = [r["id_lote"] for r in resultado["resultados"]]
+
+        venta = LoteService.vender_activo(db_session, usuario.id_usuario, activo.id_activo,
+                                          Decimal('15'), Decimal('200'))
+        assert [a["id_lote"] for a in venta["lotes_afectados"]] == orden_compra[:15]
+
+    def test_saldo_insuficiente_no_registra_nada(self, db_session):
+        usuario = _crear_usuario(db_session, "sinsaldo@test.com", Decimal('1500'))
+        activo, = _crear_activos(db_session, ["SS"])
+        compras = [
+            {"id_activo": activo.id_activo, "cantidad": Decimal('10'), "precio_compra": Decimal('100')},
+            {"id_activo": activo.id_activo, "cantidad": Decimal('10'), "precio_compra": Decimal('100')},
+        ]
+
+        with pytest.raises(ValueError, match="Saldo insuficiente"):
+            con_reintentos(db_session, lambda: LoteService.comprar_activos_lote(
+                db_session, usuario.id_usuario, compras))
+        assert db_session.query(Lote).count() == 0
+        assert db_session.query(CajaAhorros).one().saldo_actual == Decimal('1500')
+
+    def test_activo_inexistente(self, db_session):
+        from uuid import uuid4
+        usuario = _crear_usuario(db_session, "noactivo@test.com")
+        with pytest.raises(ValueError, match="Activo no encontrado"):
+            LoteService.comprar_activos_lote(db_session, usuario.id_usuario, [
+                {"id_activo": uuid4(), "cantidad": Decimal('1'), "precio_compra": Decimal('1')}
+            ])
+
+
+# ═══════════════════════════════════════════════
+# Rebalanceo (canasta de órdenes)
+# ═══════════════════════════════════════════════
+class TestRebalanceo:
+    """Tests para LoteService.rebalancear"""
+
+    def _portafolio(self, db):
+        usuario = _crear_usuario(db, "rebalanceo@test.com", Decimal('1000'))
+        a, b = _crear_activos(db, ["RA", "RB"])
+        LoteService.comprar_activos_lote(db, usuario.id_usuario, [
+            {"id_activo": a.id_activo, "cantidad": Decimal('5'), "precio_compra": Decimal('100')},
+            {"id_activo": a.id_activo, "cantidad": Decimal('5'), "precio_compra": Decimal('80')},
+        ])
+        return usuario, a, b
+
+    def test_ventas_financian_compras(self, db_session):
+        usuario, a, b = self._portafolio(db_session)   # saldo 100
+        resultado = LoteService.rebalancear(
+            db_session, usuario.id_usuario,
+            ventas=[{"id_activo": a.id_activo, "cantidad": Decimal('7'), "precio_venta": Decimal('120')}],
+            compras=[{"id_activo": b.id_activo, "cantidad": Decimal('3'), "precio_compra": Decimal('250')}],
+        )
+
+        assert resultado["total_ventas"] == Decimal('840')
+        assert resultado["saldo_nuevo"] == Decimal('190')
+        afectados = resultado["ventas"][0]["lotes_afectados"]
+        assert [(l["cantidad_vendida"], l["estado_nuevo"]) for l in afectados] == [
+            (Decimal('5'), "ROJO"), (Decimal('2'), "AMARILLO")
+        ]
+        posiciones = {p["ticker"]: p for p in resultado["posiciones"]}
+        assert posiciones["RA"]["cantidad_nueva"] == Decimal('3')
+        assert posiciones["RB"]["cantidad_anterior"] == Decimal('0')
+        assert posiciones["RB"]["cantidad_nueva"] == Decimal('3')
+
+        assert db_session.query(CajaAhorros).one().saldo_actual == Decimal('190')
+        assert db_session.query(Transaccion).filter(Transaccion.tipo_operacion == "VENTA").count() == 2
+        abiertos = LoteService.obtener_resumen_por_activo(db_session, usuario.id_usuario)
+        assert {r["ticker"]: r["cantidad_total"] for r in abiertos} == {"RA": Decimal('3'), "RB": Decimal('3')}
+
+    def test_simulacion_no_escribe(self, db_session):
+        usuario, a, b = self._portafolio(db_session)
+        resultado = LoteService.rebalancear(
+            db_session, usuario.id_usuario,
+            ventas=[{"id_activo": a.id_activo, "cantidad": Decimal('10'), "precio_venta": Decimal('100')}],
+            compras=[{"id_activo": b.id_activo, "cantidad": Decimal('1'), "precio_compra": Decimal('1100')}],
+            simular=True,
+        )
+
+        assert resultado["simulacion"] is True
+        assert resultado["saldo_nuevo"] == Decimal('0')
+        assert resultado["compras"][0]["id_lote"] is None
+        assert db_session.query(CajaAhorros).one().saldo_actual == Decimal('100')
+        assert db_session.query(Lote).count() == 2
+        assert all(l.cantidad_disponible == Decimal('5') for l in db_session.query(Lote))
+
+    def test_compras_sin_saldo_tras_ventas(self, db_session):
+        usuario, a, b = self._portafolio(db_session)
+        with pytest.raises(ValueError, match="Saldo insuficiente tras las ventas"):
+            con_reintentos(db_session, lambda: LoteService.rebalancear(
+                db_session, usuario.id_usuario,
+                ventas=[{"id_activo": a.id_activo, "cantidad": Decimal('1'), "precio_venta": Decimal('100')}],
+                compras=[{"id_activo": b.id_activo, "cantidad": Decimal('1'), "precio_compra": Decimal('500')}],
+            ))
+        assert db_session.query(Transaccion).filter(Transaccion.tipo_operacion == "VENTA").count() == 0
+        assert db_session.query(CajaAhorros).one().saldo_actual == Decimal('100')
+
+    def test_ventas_acumuladas_no_superan_disponible(self, db_session):
+        usuario, a, _ = self._portafolio(db_session)
+        venta = {"id_activo": a.id_activo, "cantidad": Decimal('6'), "precio_venta": Decimal('100')}
+        with pytest.raises(ValueError, match="Venta 1: cantidad insuficiente de RA"):
+            LoteService.rebalancear(db_session, usuario.id_usuario, ventas=[venta, dict(venta)], compras=[])
+
+
+# ═══════════════════════════════════════════════
+# Tabla de posiciones
+# ═══════════════════════════════════════════════
+class TestPosiciones:
+    """Tests para PosicionService y su mantenimiento desde LoteService"""
+
+    def test_compras_y_ventas_mantienen_la_posicion(self, db_session):
+        from app.models import Posicion
+        usuario = _crear_usuario(db_session, "posiciones@test.com")
+        a, b = _crear_activos(db_session, ["PA", "PB"])
+        LoteService.comprar_activo(db_session, usuario.id_usuario, a.id_activo,
+                                   Decimal('10'), Decimal('100'), comision=Decimal('5'))
+        LoteService.comprar_activos_lote(db_session, usuario.id_usuario, [
+            {"id_activo": a.id_activo, "cantidad": Decimal('4'), "precio_compra": Decimal('50')},
+            {"id_activo": b.id_activo, "cantidad": Decimal('2'), "precio_compra": Decimal('20'),
+             "trm": Decimal('4000')},
+        ])
+        LoteService.vender_activo(db_session, usuario.id_usuario, a.id_activo, Decimal('12'), Decimal('90'))
+        LoteService.rebalancear(
+            db_session, usuario.id_usuario,
+            ventas=[{"id_activo": b.id_activo, "cantidad": Decimal('1'), "precio_venta": Decimal('25'),
+                     "trm": Decimal('4100')}],
+            compras=[{"id_activo": a.id_activo, "cantidad": Decimal('3'), "precio_compra": Decimal('60')}],
+        )
+
+        pa = db_session.get(Posicion, (usuario.id_usuario, a.id_activo))
+        assert pa.cantidad_total == Decimal('5')            # 10 + 4 - 12 + 3
+        assert pa.costo_total == Decimal('380')             # lotes abiertos: 4 × 50 + 3 × 60
+        assert pa.valor_compra == Decimal('280')            # 2 × 50 + 3 × 60
+        assert (pa.numero_lotes, pa.lotes_verdes, pa.lotes_amarillos, pa.lotes_rojos) == (2, 1, 1, 1)
+        pb = db_session.get(Posicion, (usuario.id_usuario, b.id_activo))
+        assert pb.valor_compra == Decimal('80000') and pb.valor_compra_moneda == Decimal('20')
+        assert PosicionService.verificar(db_session) == []
+
+        resumen = {r["ticker"]: r for r in LoteService.obtener_resumen_por_activo(db_session, usuario.id_usuario)}
+        assert resumen["PA"]["precio_promedio"] == Decimal('76')
+        assert resumen["PB"]["numero_lotes"] == 1
+
+    def test_resumen_por_activo_en_una_consulta(self, db_session):
+        from sqlalchemy import event
+        usuario = _crear_usuario(db_session, "resumen@test.com")
+        activos = _crear_activos(db_session, [f"S{k}" for k in range(5)])
+        LoteService.comprar_activos_lote(db_session, usuario.id_usuario, [
+            {"id_activo": activo.id_activo, "cantidad": Decimal('2'), "precio_compra": Decimal('10')}
+            for activo in activos for _ in range(4)
+        ])
+        id_usuario = usuario.id_usuario
+        db_session.expire_all()
+
+        sentencias = []
+        motor = db_session.get_bind()
+        registrar = lambda *args: sentencias.append(args[2])
+        event.listen(motor, "before_cursor_execute", registrar)
+        try:
+            resumen = LoteService.obtener_resumen_por_activo(db_session, id_usuario)
+        finally:
+            event.remove(motor, "before_cursor_execute", registrar)
+
+        assert len(sentencias) == 1
+        assert [r["ticker"] for r in resumen] == ["S0", "S1", "S2", "S3", "S4"]
+        assert resumen[0]["tipo_activo"] == "ACCION" and resumen[0]["numero_lotes"] == 4
+        assert resumen[0]["cantidad_total"] == Decimal('8') and resumen[0]["precio_promedio"] == Decimal('10')
+
+    def test_verificar_y_reconstruir(self, db_session):
+        from app.models import Posicion
+        usuario = _crear_usuario(db_session, "reconstruir@test.com")
+        activo, = _crear_activos(db_session, ["RC"])
+        LoteService.comprar_activo(db_session, usuario.id_usuario, activo.id_activo, Decimal('3'), Decimal('10'))
+        # Lote creado por fuera del servicio: la tabla queda desfasada
+        db_session.add(Lote(id_usuario=usuario.id_usuario, id_activo=activo.id_activo,
+                            cantidad_inicial=Decimal('2'), cantidad_disponible=Decimal('0'),
+                            precio_compra=Decimal('10'), trm=Decimal('1'), costo_total=Decimal('20'),
+                            estado="ROJO"))
+        db_session.commit()
+
+        diferencias = {d["campo"]: d for d in PosicionService.verificar(db_session, usuario.id_usuario)}
+        assert set(diferencias) == {"lotes_rojos"}
+        assert diferencias["lotes_rojos"]["tabla"] == 0 and diferencias["lotes_rojos"]["lotes"] == 1
+
+        db_session.query(Posicion).delete()
+        db_session.commit()
+        assert PosicionService.reconstruir(db_session) == 1
+        assert PosicionService.verificar(db_session) == []
+        assert db_session.query(Posicion).one().cantidad_total == Decimal('3')
+
+
+# ═══════════════════════════════════════════════
+# Concurrencia (requiere PostgreSQL)
+# ═══════════════════════════════════════════════
+@pytest.mark.skipif(not TEST_POSTGRES_URL, reason="Definir TEST_POSTGRES_URL para la prueba de concurrencia")
+class TestConcurrenciaPostgres:
+    """Muchos hilos comprando y vendiendo: sin sobreventa ni saldos inconsistentes"""
+
+    USUARIOS = 4
+    ACTIVOS = 3
+    HILOS_POR_PAR = 3
+    OPERACIONES_POR_HILO = 20
+
+    def test_compras_y_ventas_concurrentes(self):
+        from sqlalchemy import create_engine, func
+        from sqlalchemy.orm import sessionmaker
+        from app.database import Base
+
+        engine = create_engine(TEST_POSTGRES_URL, pool_size=40, max_overflow=0)
+        Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+        Sesion = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        saldo_inicial = Decimal('100000000')
+        with Sesion() as db:
+            usuarios = [_crear_usuario(db, f"u{i}@test.com", saldo_inicial).id_usuario
+                        for i in range(self.USUARIOS)]
+            activos = [a.id_activo for a in _crear_activos(db, [f"A{j}" for j in range(self.ACTIVOS)])]
+
+        errores = []
+
+        def trabajador(id_usuario, id_activo):
+            with Sesion() as db:
+                for k in range(self.OPERACIONES_POR_HILO):
+                    try:
+                        if k % 2 == 0:
+                            con_reintentos(db, lambda: LoteService.comprar_activo(
+                                db, id_usuario, id_activo, Decimal('3'), Decimal('100')))
+                        else:
+                            con_reintentos(db, lambda: LoteService.vender_activo(
+                                db, id_usuario, id_activo, Decimal('2'), Decimal('110')))
+                    except ValueError:
+                        pass  # venta sin cantidad suficiente: rechazo legítimo
+                    except Exception as error:  # pragma: no cover - se reporta abajo
+                        errores.append(error)
+
+        hilos = [
+            threading.Thread(target=trabajador, args=(u, a))
+            for u in usuarios for a in activos for _ in range(self.HILOS_POR_PAR)
+        ]
+        inicio = time.perf_counter()
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        duracion = time.perf_counter() - inicio
+
+        assert not errores, errores[:3]
+        with Sesion() as db:
+            assert PosicionService.verificar(db) == []
+            assert db.query(Lote).filter(Lote.cantidad_disponible < 0).count() == 0
+            for id_usuario in usuarios:
+                compras = db.query(func.sum(Transaccion.monto_operacion)).filter(
+                    Transaccion.id_usuario == id_usuario, Transaccion.tipo_operacion == "COMPRA").scalar() or 0
+                ventas = db.query(func.sum(Transaccion.monto_operacion)).filter(
+                    Transaccion.id_usuario == id_usuario, Transaccion.tipo_operacion == "VENTA").scalar() or 0
+                saldo = db.query(CajaAhorros.saldo_actual).filter(
+                    CajaAhorros.id_usuario == id_usuario).scalar()
+                assert saldo == saldo_inicial - compras + ventas
+                for id_activo in activos:
+                    vendido = db.query(func.sum(Transaccion.cantidad)).filter(
+                        Transaccion.id_usuario == id_usuario, Transaccion.id_activo == id_activo,
+                        Transaccion.tipo_operacion == "VENTA").scalar() or 0
+                    comprado = db.query(func.sum(Lote.cantidad_inicial)).filter(
+                        Lote.id_usuario == id_usuario, Lote.id_activo == id_activo).scalar() or 0
+                    disponible = db.query(func.sum(Lote.cantidad_disponible)).filter(
+                        Lote.id_usuario == id_usuario, Lote.id_activo == id_activo).scalar() or 0
+                    assert disponible == comprado - vendido
+
+        operaciones = len(hilos) * self.OPERACIONES_POR_HILO
+        print(f"\n{operaciones} operaciones en {duracion:.2f}s ({operaciones / duracion:.0f} op/s)")
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
@@ -0,0 +1,1253 @@
+"""
+Tests del motor de cálculos financieros (nivel servicio)
+"""
+import pytest
+import numpy as np
+from decimal import Decimal
+from datetime import date
+from uuid import uuid4
+
+from app.services.calculo_service import CalculoFinancieroService
+
+
+def _vp_suma_termino_a_termino(valor_nominal, cupon_periodo, tir_periodo, num_periodos):
+    """Implementación de referencia: una potencia Decimal por periodo"""
+    total = Decimal('0')
+    for t in range(1, num_periodos + 1):
+        total += cupon_periodo / ((Decimal('1') + tir_periodo) ** t)
+    return total + valor_nominal / ((Decimal('1') + tir_periodo) ** num_periodos)
+
+
+# ═══════════════════════════════════════════════
+# Bonos - núcleo de valoración
+# ═══════════════════════════════════════════════
+class TestKernelPrecioBono:
+    """Tests para CalculoFinancieroService._valor_presente_flujos"""
+
+    @pytest.mark.parametrize("nominal,cupon,tir,n", [
+        (Decimal('1000000'), Decimal('36250'), Decimal('0.0425'), 8),
+        (Decimal('1000000'), Decimal('6041.67'), Decimal('0.007083'), 360),
+        (Decimal('100000000'), Decimal('0.5'), Decimal('0.0000005'), 120),
+        (Decimal('500'), Decimal('50'), Decimal('0.45'), 1),
+    ])
+    def test_forma_cerrada_igual_a_suma(self, nominal, cupon, tir, n):
+        esperado = _vp_suma_termino_a_termino(nominal, cupon, tir, n)
+        obtenido = CalculoFinancieroService._valor_presente_flujos(nominal, cupon, tir, n)
+        assert abs(obtenido - esperado) <= esperado * Decimal('1e-20')
+        assert round(obtenido, 2) == round(esperado, 2)
+
+    def test_tir_cero(self):
+        obtenido = CalculoFinancieroService._valor_presente_flujos(
+            Decimal('1000'), Decimal('10'), Decimal('0'), 5
+        )
+        assert obtenido == Decimal('1050')
+
+    def test_precio_sucio_bono_ejemplo(self):
+        """Bono TES de docs/VALIDACION_FORMULAS.md"""
+        resultado = CalculoFinancieroService.calcular_precio_bono_sucio(
+            valor_nominal=Decimal('1000000'),
+            tasa_cupon=Decimal('7.25'),
+            frecuencia_cupon=2,
+            tir=Decimal('8.5'),
+            fecha_emision=date(2024, 1, 1),
+            fecha_vencimiento=date(2030, 1, 1),
+            fecha_valoracion=date(2026, 2, 6),
+        )
+        esperado = _vp_suma_termino_a_termino(
+            Decimal('1000000'), Decimal('36250'), Decimal('0.0425'), resultado["num_periodos"]
+        )
+        assert resultado["precio_limpio"] == round(esperado, 2)
+        assert abs(
+            resultado["precio_sucio"] - resultado["precio_limpio"] - resultado["cupon_acumulado"]
+        ) <= Decimal('0.01')
+
+
+# ═══════════════════════════════════════════════
+# Bonos - valoración vectorizada por lote
+# ═══════════════════════════════════════════════
+BONO_TES = {
+    "identificador": "TES2030",
+    "valor_nominal": Decimal('1000000'),
+    "tasa_cupon": Decimal('7.25'),
+    "frecuencia_cupon": 2,
+    "fecha_emision": date(2024, 1, 1),
+    "fecha_vencimiento": date(2030, 1, 1),
+}
+BONO_MENSUAL_30 = {
+    "identificador": "LARGO",
+    "valor_nominal": Decimal('1000000'),
+    "tasa_cupon": Decimal('6.5'),
+    "frecuencia_cupon": 12,
+    "fecha_emision": date(2025, 1, 15),
+    "fecha_vencimiento": date(2055, 1, 15),
+}
+
+
+class TestValoracionBonosLote:
+    """Tests para ValoracionBonosService.calcular_precios_lote"""
+
+    def test_matriz_coincide_con_motor_decimal(self):
+        from app.services.valoracion_bonos_service import ValoracionBonosService
+
+        tirs = [Decimal('0.5'), Decimal('7.25'), Decimal('8.5'), Decimal('15')]
+        fecha = date(2026, 2, 6)
+        resultado = ValoracionBonosService.calcular_precios_lote(
+            [BONO_TES, BONO_MENSUAL_30], tirs, fecha
+        )
+        assert resultado["total_precios"] == 8
+
+        for fila, bono in zip(resultado["resultados"], [BONO_TES, BONO_MENSUAL_30]):
+            for j, tir in enumerate(tirs):
+                exacto = CalculoFinancieroService.calcular_precio_bono_sucio(
+                    tir=tir, fecha_valoracion=fecha,
+                    **{k: v for k, v in bono.items() if k != "identificador"}
+                )
+                assert fila["precios_limpios"][j] == pytest.approx(float(exacto["precio_limpio"]), abs=0.011)
+                assert fila["precios_sucios"][j] == pytest.approx(float(exacto["precio_sucio"]), abs=0.011)
+
+    def test_bono_vencido_no_afecta_al_resto(self):
+        from app.services.valoracion_bonos_service import ValoracionBonosService
+
+        vencido = dict(BONO_TES, identificador="VENCIDO", fecha_vencimiento=date(2025, 1, 1))
+        resultado = ValoracionBonosService.calcular_precios_lote(
+            [vencido, BONO_TES], [Decimal('8.5')], date(2026, 2, 6)
+        )
+        assert resultado["resultados"][0]["error"] is not None
+        assert resultado["resultados"][0]["precios_sucios"] is None
+        assert resultado["resultados"][1]["precios_sucios"][0] > 0
+        assert resultado["total_precios"] == 1
+
+    def test_verificar_exacto(self):
+        from app.services.valoracion_bonos_service import ValoracionBonosService
+
+        resultado = ValoracionBonosService.calcular_precios_lote(
+            [BONO_TES], [Decimal('8.5'), Decimal('9')], date(2026, 2, 6), verificar_exacto=True
+        )
+        assert resultado["diferencia_maxima_exacto"] <= 0.01
+
+    @pytest.mark.parametrize("tir", [0, -200, 150])
+    def test_api_rechaza_tir_fuera_de_rango(self, client, sample_usuario, tir):
+        from app.auth import require_auth
+        from app.main import app
+
+        app.dependency_overrides[require_auth] = lambda: sample_usuario
+        bono = {k: str(v) for k, v in BONO_TES.items()}
+        resp = client.post("/api/calculos/bono/precio-sucio/lote", json={
+            "bonos": [bono], "tirs": [8.5, tir], "fecha_valoracion": "2026-02-06",
+        })
+        assert resp.status_code == 422
+        assert resp.json()["detail"][0]["loc"] == ["body", "tirs", 1]
+
+        resp = client.post("/api/calculos/bono/precio-sucio/lote", json={
+            "bonos": [bono], "tirs": [8.5], "fecha_valoracion": "2026-02-06",
+        })
+        assert resp.status_code == 200
+
+
+class TestTirImplicita:
+    """Tests para ValoracionBonosService.calcular_tir_implicita(_lote)"""
+
+    def test_recupera_tir_desde_precio_sucio(self):
+        from app.services.valoracion_bonos_service import ValoracionBonosService
+
+        campos = {k: v for k, v in BONO_TES.items() if k != "identificador"}
+        fecha = date(2026, 2, 6)
+        valoracion = CalculoFinancieroService.calcular_precio_bono_sucio(
+            tir=Decimal('8.5'), fecha_valoracion=fecha, **campos
+        )
+        resultado = ValoracionBonosService.calcular_tir_implicita(
+            precio_mercado=valoracion["precio_sucio"], fecha_valoracion=fecha, **campos
+        )
+        assert float(resultado["tir_implicita"]) == pytest.approx(8.5, abs=1e-4)
+        assert abs(resultado["precio_sucio"] - valoracion["precio_sucio"]) <= Decimal('0.02')
+
+    def test_precio_limpio_y_sucio_dan_la_misma_tir(self):
+        from app.services.valoracion_bonos_service import ValoracionBonosService
+
+        campos = {k: v for k, v in BONO_MENSUAL_30.items() if k != "identificador"}
+        fecha = date(2026, 2, 6)
+        valoracion = CalculoFinancieroService.calcular_precio_bono_sucio(
+            tir=Decimal('11'), fecha_valoracion=fecha, **campos
+        )
+        lote = ValoracionBonosService.calcular_tir_implicita_lote([
+            dict(BONO_MENSUAL_30, precio_mercado=valoracion["precio_sucio"], tipo_precio="sucio"),
+            dict(BONO_MENSUAL_30, precio_mercado=valoracion["precio_limpio"], tipo_precio="limpio"),
+        ], fecha)
+        assert lote["total_convergidos"] == 2
+        for fila in lote["resultados"]:
+            assert fila["tir"] == pytest.approx(11, abs=1e-3)
+
+    def test_lote_grande_converge(self):
+        from app.services.valoracion_bonos_service import ValoracionBonosService
+
+        rng = np.random.default_rng(7)
+        fecha = date(2026, 2, 6)
+        tirs = rng.uniform(0.5, 25, size=500)
+        bonos = []
+        for tir in tirs:
+            bono = dict(BONO_TES, tasa_cupon=Decimal(str(round(rng.uniform(1, 15), 2))))
+            precio = ValoracionBonosService.calcular_precios_lote(
+                [bono], [Decimal(str(tir))], fecha
+            )["resultados"][0]["precios_limpios"][0]
+            bonos.append(dict(bono, precio_mercado=Decimal(str(precio)), tipo_precio="limpio"))
+
+        lote = ValoracionBonosService.calcular_tir_implicita_lote(bonos, fecha)
+        assert lote["total_convergidos"] == 500
+        obtenidas = np.array([fila["tir"] for fila in lote["resultados"]])
+        # El precio está redondeado a centavos: la TIR se recupera a ~1e-5 %
+        assert np.max(np.abs(obtenidas - tirs)) < 1e-3
+
+    def test_precio_fuera_de_rango(self):
+        from app.services.valoracion_bonos_service import ValoracionBonosService
+
+        campos = {k: v for k, v in BONO_TES.items() if k != "identificador"}
+        with pytest.raises(ValueError):
+            ValoracionBonosService.calcular_tir_implicita(
+                precio_mercado=Decimal('1e15'), fecha_valoracion=date(2026, 2, 6), **campos
+            )
+
+
+class TestAnaliticaBono:
+    """Tests para ValoracionBonosService.calcular_analitica(_lote)"""
+
+    def _precio(self, tir):
+        from app.services.valoracion_bonos_service import ValoracionBonosService
+
+        return ValoracionBonosService.calcular_precios_lote(
+            [BONO_MENSUAL_30], [tir], date(2026, 2, 6)
+        )["resultados"][0]["precios_limpios"][0]
+
+    def test_sensibilidades_coinciden_con_desplazamientos(self):
+        from app.services.valoracion_bonos_service import ValoracionBonosService
+
+        campos = {k: v for k, v in BONO_MENSUAL_30.items() if k != "identificador"}
+        analitica = ValoracionBonosService.calcular_analitica(
+            tir=Decimal('9'), fecha_valoracion=date(2026, 2, 6), **campos
+        )
+        p0 = analitica["precio_limpio"]
+        p_arriba, p_abajo = self._precio(Decimal('9.01')), self._precio(Decimal('8.99'))
+
+        dv01_numerico = (p_abajo - p_arriba) / 2
+        convexidad_numerica = (p_arriba + p_abajo - 2 * p0) / (p0 * 0.0001 ** 2)
+
+        assert analitica["dv01"] == pytest.approx(dv01_numerico, rel=1e-3)
+        assert analitica["convexidad"] == pytest.approx(convexidad_numerica, rel=1e-2)
+        assert analitica["duracion_modificada"] < analitica["duracion_macaulay"]
+
+    def test_cupon_cero_macaulay_igual_al_plazo(self):
+        from app.services.valoracion_bonos_service import ValoracionBonosService
+
+        bono = dict(BONO_TES, tasa_cupon=Decimal('0.0000001'), tir=Decimal('8'), frecuencia_cupon=1)
+        fila = ValoracionBonosService.calcular_analitica_lote([bono], date(2026, 2, 6))["resultados"][0]
+        assert fila["duracion_macaulay"] == pytest.approx(fila["num_periodos"], rel=1e-6)
+
+
+class TestCurvaPrecioTir:
+    """Tests para ValoracionBonosService.calcular_curva_precio_tir"""
+
+    def _curva(self, **kwargs):
+        from app.services.valoracion_bonos_service import ValoracionBonosService
+
+        bono = {k: v for k, v in BONO_TES.items() if k != "identificador"}
+        return ValoracionBonosService.calcular_curva_precio_tir(
+            fecha_valoracion=date(2026, 2, 6), **bono, **kwargs
+        )
+
+    def test_puntos_coinciden_con_lote(self):
+        from app.services.valoracion_bonos_service import ValoracionBonosService
+
+        curva = self._curva(tir_minima=Decimal('4'), tir_maxima=Decimal('14'), paso=Decimal('0.25'))
+        assert curva["total_puntos"] == 41
+        assert curva["puntos"][0]["tir"] == 4 and curva["puntos"][-1]["tir"] == 14
+
+        tirs = [Decimal(str(p["tir"])) for p in curva["puntos"]]
+        lote = ValoracionBonosService.calcular_precios_lote([BONO_TES], tirs, date(2026, 2, 6))
+        assert [p["precio_limpio"] for p in curva["puntos"]] == pytest.approx(
+            lote["resultados"][0]["precios_limpios"], abs=0.011
+        )
+
+        precios = [p["precio_limpio"] for p in curva["puntos"]]
+        assert all(a > b for a, b in zip(precios, precios[1:]))
+
+    def test_rango_invalido(self):
+        with pytest.raises(ValueError):
+            self._curva(tir_minima=Decimal('10'), tir_maxima=Decimal('5'), paso=Decimal('1'))
+        with pytest.raises(ValueError):
+            self._curva(tir_minima=Decimal('0'), tir_maxima=Decimal('100'), paso=Decimal('0.001'))
+
+
+# ═══════════════════════════════════════════════
+# Cronograma de cupones
+# ═══════════════════════════════════════════════
+def _dias_recorriendo_cronograma(fecha_emision, fecha_actual, frecuencia_cupon):
+    """Implementación de referencia: recorre el cronograma desde la emisión"""
+    from dateutil.relativedelta import relativedelta
+
+    fecha_ultimo_cupon = fecha_emision
+    while fecha_ultimo_cupon < fecha_actual:
+        proxima_fecha = fecha_ultimo_cupon + relativedelta(months=12 // frecuencia_cupon)
+        if proxima_fecha > fecha_actual:
+            break
+        fecha_ultimo_cupon = proxima_fecha
+    return (fecha_actual - fecha_ultimo_cupon).days
+
+
+class TestCronogramaCupones:
+    """Tests para CronogramaCuponesService"""
+
+    @pytest.mark.parametrize("emision", [date(2010, 1, 31), date(2015, 8, 31), date(2020, 2, 29), date(2024, 1, 1)])
+    @pytest.mark.parametrize("frecuencia", [1, 2, 4, 12])
+    def test_mismos_dias_que_el_recorrido(self, emision, frecuencia):
+        from datetime import timedelta
+
+        vencimiento = date(2040, 12, 31)
+        fecha = emision
+        while fecha < date(2040, 6, 1):
+            esperado = _dias_recorriendo_cronograma(emision, fecha, frecuencia)
+            obtenido = CalculoFinancieroService._calcular_dias_desde_ultimo_cupon(
+                emision, fecha, frecuencia, vencimiento
+            )
+            assert obtenido == esperado, fecha
+            fecha += timedelta(days=37)
+
+    def test_anterior_y_siguiente(self):
+        from app.services.cronograma_service import CronogramaCuponesService
+
+        anterior, siguiente = CronogramaCuponesService.cupon_anterior_y_siguiente(
+            date(2024, 1, 1), date(2030, 1, 1), 2, date(2026, 2, 6)
+        )
+        assert anterior == date(2026, 1, 1)
+        assert siguiente == date(2026, 7, 1)
+
+    def test_num_periodos_cuenta_cupones_pendientes(self):
+        from datetime import timedelta
+        from app.services.cronograma_service import CronogramaCuponesService
+
+        emision, vencimiento = date(2020, 1, 15), date(2030, 1, 15)
+        cronograma = CronogramaCuponesService.obtener_cronograma(emision, vencimiento, 2)
+        fecha = date(2024, 1, 1)
+        for _ in range(700):
+            resultado = CalculoFinancieroService.calcular_precio_bono_sucio(
+                valor_nominal=Decimal('1000000'), tasa_cupon=Decimal('7'), frecuencia_cupon=2,
+                tir=Decimal('8'), fecha_emision=emision, fecha_vencimiento=vencimiento, fecha_valoracion=fecha,
+            )
+            pendientes = [f for f in cronograma if f > fecha]
+            assert resultado["num_periodos"] == len(pendientes), fecha
+            assert resultado["fecha_proximo_cupon"] == pendientes[0]
+            fecha += timedelta(days=1)
+
+    def test_ejemplo_documentado_ocho_periodos(self):
+        """docs/VALIDACION_FORMULAS.md: 8 periodos semestrales, precio limpio ≈ 958.420"""
+        resultado = CalculoFinancieroService.calcular_precio_bono_sucio(
+            valor_nominal=Decimal('1000000'), tasa_cupon=Decimal('7.25'), frecuencia_cupon=2,
+            tir=Decimal('8.5'), fecha_emision=date(2024, 1, 1), fecha_vencimiento=date(2030, 1, 1),
+            fecha_valoracion=date(2026, 2, 6),
+        )
+        assert resultado["num_periodos"] == 8
+        assert abs(resultado["precio_limpio"] - Decimal('958420')) < Decimal('100')
+
+    def test_cronograma_se_reutiliza(self):
+        from app.services.cronograma_service import CronogramaCuponesService
+
+        CronogramaCuponesService.limpiar_cache()
+        for dia in range(1, 29):
+            CalculoFinancieroService.calcular_precio_bono_sucio(
+                valor_nominal=Decimal('1000000'), tasa_cupon=Decimal('7.25'),
+                frecuencia_cupon=2, tir=Decimal('8.5'),
+                fecha_emision=date(2024, 1, 1), fecha_vencimiento=date(2030, 1, 1),
+                fecha_valoracion=date(2026, 2, dia),
+            )
+        estadisticas = CronogramaCuponesService.estadisticas_cache()
+        # Dos lecturas por valoración (periodos y cupón anterior/siguiente), una sola construcción
+        assert estadisticas["fallos"] == 1
+        assert estadisticas["aciertos"] == 2 * 28 - 1
+
+
+# ═══════════════════════════════════════════════
+# CDT - cronograma de liquidación
+# ═══════════════════════════════════════════════
+class TestCronogramaLiquidacionCDT:
+    """Tests para CalculoFinancieroService.calcular_cronograma_liquidacion_cdt"""
+
+    def test_filas_coinciden_con_liquidacion_puntual(self, db_session):
+        from datetime import timedelta
+
+        inicio = date(2025, 11, 1)
+        cronograma = CalculoFinancieroService.calcular_cronograma_liquidacion_cdt(
+            capital_invertido=Decimal('10000000'),
+            tasa_interes_anual=Decimal('12.5'),
+            fecha_inicio=inicio,
+            plazo_dias_original=90,
+            db=db_session,
+            paso_dias=7
+        )
+        filas = cronograma["cronograma"]
+        assert [f["dias_transcurridos"] for f in filas][-2:] == [84, 90]
+
+        for fila in filas:
+            puntual = CalculoFinancieroService.calcular_liquidacion_cdt(
+                capital_invertido=Decimal('10000000'),
+                tasa_interes_anual=Decimal('12.5'),
+                fecha_inicio=inicio,
+                fecha_liquidacion=inicio + timedelta(days=fila["dias_transcurridos"]),
+                plazo_dias_original=90,
+                db=db_session
+            )
+            assert fila["penalizacion_porcentaje"] == pytest.approx(puntual["penalizacion_porcentaje"])
+            assert fila["monto_total_recibir"] == pytest.approx(float(puntual["monto_total_recibir"]), abs=0.011)
+            assert fila["tasa_efectiva_anual"] == pytest.approx(float(puntual["tasa_efectiva_anual"]), abs=1e-4)
+
+        assert filas[0]["tramo_penalizacion"] == "HASTA_60_DIAS"
+        assert filas[-1]["tramo_penalizacion"] == "SIN_PENALIZACION"
+        assert cronograma["dia_optimo"]["dias_transcurridos"] == 90
+
+
+# ═══════════════════════════════════════════════
+# Parámetros del sistema - registro en memoria
+# ═══════════════════════════════════════════════
+class TestRegistroParametros:
+    """Tests para ParametrosService"""
+
+    def _agregar(self, db, nombre, valor):
+        from app.models import ParametroSistema
+
+        db.add(ParametroSistema(nombre_parametro=nombre, valor_parametro=valor, tipo_dato='NUMERIC'))
+        db.commit()
+
+    def test_sirve_desde_memoria_e_invalida(self, db_session):
+        from app.services.parametros_service import ParametrosService, PARAM_META_RENDIMIENTO
+
+        self._agregar(db_session, PARAM_META_RENDIMIENTO, '0.20')
+        assert ParametrosService.obtener_numerico(db_session, PARAM_META_RENDIMIENTO, Decimal('0.15')) == Decimal('0.20')
+        recargas = ParametrosService.estadisticas()["recargas"]
+
+        for _ in range(50):
+            CalculoFinancieroService.calcular_calificacion_final(Decimal('0.10'), db=db_session)
+        assert ParametrosService.estadisticas()["recargas"] == recargas
+
+        from app.models import ParametroSistema
+
+        param = db_session.query(ParametroSistema).first()
+        param.valor_parametro = '0.10'
+        db_session.commit()
+        ParametrosService.invalidar()
+        resultado = CalculoFinancieroService.calcular_calificacion_final(Decimal('0.10'), db=db_session)
+        assert resultado["nota"] == 5.0
+
+    def test_cambio_de_version_recarga(self, db_session, monkeypatch):
+        from app.config import settings
+        from app.services.parametros_service import ParametrosService, PARAM_PENALIZACION_CDT_60_DIAS
+
+        monkeypatch.setattr(settings, "PARAMETROS_CACHE_SEGUNDOS", 0)
+        assert ParametrosService.obtener(db_session, PARAM_PENALIZACION_CDT_60_DIAS) is None
+        self._agregar(db_session, PARAM_PENALIZACION_CDT_60_DIAS, '0.05')
+        assert CalculoFinancieroService._obtener_penalizaciones_cdt(db_session)[0] == Decimal('0.05')
+
+
+# ═══════════════════════════════════════════════
+# Memoización de cálculos puros
+# ═══════════════════════════════════════════════
+class TestMemoizacionCalculos:
+    """Tests para memoizar_calculo / MemoizacionService"""
+
+    @pytest.fixture(autouse=True)
+    def cache_habilitada(self, monkeypatch):
+        from app.config import settings
+        from app.services.memoizacion_service import MemoizacionService
+
+        monkeypatch.setattr(settings, "CACHE_CALCULOS_HABILITADA", True)
+        MemoizacionService.limpiar()
+        yield
+        MemoizacionService.limpiar()
+
+    def _precio(self, tir):
+        bono = {k: v for k, v in BONO_TES.items() if k != "identificador"}
+        return CalculoFinancieroService.calcular_precio_bono_sucio(
+            tir=tir, fecha_valoracion=date(2026, 2, 6), **bono
+        )
+
+    def test_entradas_equivalentes_son_acierto(self):
+        from app.services.memoizacion_service import MemoizacionService
+
+        primero = self._precio(Decimal('8.5'))
+        segundo = self._precio(Decimal('8.50'))
+        assert segundo["precio_sucio"] == primero["precio_sucio"]
+        segundo["precio_sucio"] = Decimal('0')
+        assert self._precio(Decimal('8.5'))["precio_sucio"] == primero["precio_sucio"]
+
+        stats = MemoizacionService.estadisticas()
+        assert (stats["aciertos"], stats["fallos"]) == (2, 1)
+
+    def test_limite_de_tamano_y_ttl(self, monkeypatch):
+        from app.config import settings
+        from app.services.memoizacion_service import MemoizacionService
+
+        monkeypatch.setattr(settings, "CACHE_CALCULOS_TAMANO", 2)
+        for tir in ('7', '8', '9'):
+            self._precio(Decimal(tir))
+        assert MemoizacionService.estadisticas()["tamano"] == 2
+        self._precio(Decimal('7'))
+        assert MemoizacionService.estadisticas()["aciertos"] == 0
+
+        monkeypatch.setattr(settings, "CACHE_CALCULOS_TTL_SEGUNDOS", -1)
+        self._precio(Decimal('10'))
+        self._precio(Decimal('10'))
+        assert MemoizacionService.estadisticas()["expirados"] == 1
+
+    def test_cdt_usa_penalizaciones_en_la_llave(self):
+        from app.services.memoizacion_service import MemoizacionService
+
+        args = (Decimal('10000000'), Decimal('12.5'), date(2025, 11, 1), date(2025, 12, 1), 90)
+        con_10 = CalculoFinancieroService._liquidar_cdt(*args, Decimal('0.10'), Decimal('0.20'))
+        con_5 = CalculoFinancieroService._liquidar_cdt(*args, Decimal('0.05'), Decimal('0.20'))
+        assert con_5["monto_total_recibir"] > con_10["monto_total_recibir"]
+        assert MemoizacionService.estadisticas()["aciertos"] == 0
+
+
+# ═══════════════════════════════════════════════
+# Modos de precisión (exacto vs rápido)
+# ═══════════════════════════════════════════════
+class TestModoPrecision:
+    """El modo 'rapido' (float64) coincide con 'exacto' (Decimal) dentro de la cota documentada"""
+
+    @pytest.mark.parametrize("bono", [BONO_TES, BONO_MENSUAL_30])
+    @pytest.mark.parametrize("tir", ['0.01', '3', '8.5', '25', '60'])
+    def test_precio_bono(self, bono, tir):
+        datos = {k: v for k, v in bono.items() if k != "identificador"}
+        resultados = {
+            modo: CalculoFinancieroService.calcular_precio_bono_sucio(
+                tir=Decimal(tir), fecha_valoracion=date(2026, 2, 6), modo_precision=modo, **datos
+            )
+            for modo in ('exacto', 'rapido')
+        }
+        for campo in ('precio_limpio', 'precio_sucio'):
+            assert abs(resultados['rapido'][campo] - resultados['exacto'][campo]) <= Decimal('0.01')
+
+        exacto = CalculoFinancieroService._valor_presente_flujos(
+            Decimal('100000000'), Decimal('3625000'), Decimal(tir) / 200, 360
+        )
+        rapido = CalculoFinancieroService._valor_presente_flujos_rapido(1e8, 3625000.0, float(tir) / 200, 360)
+        assert abs(Decimal(repr(rapido)) - exacto) / exacto < Decimal('1e-13')
+
+    @pytest.mark.parametrize("dias", [1, 45, 75, 90])
+    def test_liquidacion_cdt(self, dias):
+        args = (Decimal('10000000'), Decimal('12.5'), date(2025, 11, 1),
+                date.fromordinal(date(2025, 11, 1).toordinal() + dias), 90,
+                Decimal('0.10'), Decimal('0.20'))
+        exacto = CalculoFinancieroService._liquidar_cdt(*args, modo_precision='exacto')
+        rapido = CalculoFinancieroService._liquidar_cdt(*args, modo_precision='rapido')
+        assert abs(rapido["monto_total_recibir"] - exacto["monto_total_recibir"]) <= Decimal('0.01')
+        assert abs(rapido["tasa_efectiva_anual"] - exacto["tasa_efectiva_anual"]) <= Decimal('0.0001')
+
+    def test_modo_invalido(self):
+        datos = {k: v for k, v in BONO_TES.items() if k != "identificador"}
+        with pytest.raises(ValueError):
+            CalculoFinancieroService.calcular_precio_bono_sucio(
+                tir=Decimal('8'), fecha_valoracion=date(2026, 2, 6), modo_precision='aproximado', **datos
+            )
+
+
+# ═══════════════════════════════════════════════
+# Historial de cálculos (write-behind)
+# ═══════════════════════════════════════════════
+@pytest.fixture
+def bono_activo(db_session):
+    """Bono TES2030 registrado como activo"""
+    from app.models import Activo, TipoActivo
+
+    tipo = TipoActivo(nombre="BONO", descripcion="Bonos")
+    db_session.add(tipo)
+    db_session.commit()
+    activo = Activo(id_tipo_activo=tipo.id_tipo_activo, ticker="TES2030", nombre="TES 2030",
+                    **{k: v for k, v in BONO_TES.items() if k != "identificador"})
+    db_session.add(activo)
+    db_session.commit()
+    db_session.refresh(activo)
+    return activo
+
+
+class TestHistorialCalculos:
+    """Tests para HistorialCalculosService"""
+
+    def _valorar(self, db, activo):
+        return CalculoFinancieroService.calcular_valoracion_bono_desde_activo(
+            db=db, id_activo=activo.id_activo, tir=Decimal('8.5'), fecha_valoracion=date(2026, 2, 6)
+        )
+
+    def test_respaldo_sincrono_sin_cola(self, db_session, bono_activo):
+        from app.models import CalculoBono
+
+        resultado = self._valorar(db_session, bono_activo)
+        calculo = db_session.query(CalculoBono).one()
+        assert str(calculo.id_calculo) == resultado["id_calculo"]
+
+    @pytest.fixture
+    def sesion_compartida(self):
+        """BD en memoria visible desde el hilo de vaciado (StaticPool)"""
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+        from sqlalchemy.pool import StaticPool
+        from app.database import Base
+
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=engine)
+        yield sessionmaker(bind=engine)
+        Base.metadata.drop_all(bind=engine)
+
+    def test_cola_escribe_en_bloque_y_vacia_al_detener(self, sesion_compartida, monkeypatch):
+        import time
+        from app.config import settings
+        from app.models import Activo, CalculoBono, TipoActivo
+        from app.services.historial_calculos_service import HistorialCalculosService
+
+        db = sesion_compartida()
+        tipo = TipoActivo(nombre="BONO")
+        db.add(tipo)
+        db.commit()
+        activo = Activo(id_tipo_activo=tipo.id_tipo_activo, ticker="TES2030", nombre="TES 2030",
+                        **{k: v for k, v in BONO_TES.items() if k != "identificador"})
+        db.add(activo)
+        db.commit()
+
+        monkeypatch.setattr(settings, "HISTORIAL_INTERVALO_SEGUNDOS", 60)
+        monkeypatch.setattr(settings, "HISTORIAL_LOTE_TAMANO", 4)
+        HistorialCalculosService.iniciar(sesion_compartida)
+        try:
+            ids = {self._valorar(db, activo)["id_calculo"] for _ in range(3)}
+            assert db.query(CalculoBono).count() == 0
+
+            # El cuarto registro completa el lote y despierta el hilo de vaciado
+            ids.add(self._valorar(db, activo)["id_calculo"])
+            for _ in range(100):
+                if HistorialCalculosService.estadisticas()["escritos"] >= 4:
+                    break
+                time.sleep(0.01)
+            assert db.query(CalculoBono).count() == 4
+
+            ids.add(self._valorar(db, activo)["id_calculo"])
+        finally:
+            HistorialCalculosService.detener()
+
+        assert {str(c.id_calculo) for c in db.query(CalculoBono)} == ids
+        assert not HistorialCalculosService.activo()
+        db.close()
+
+    def test_fila_rechazada_no_bloquea_la_cola(self, sesion_compartida, monkeypatch):
+        from app.config import settings
+        from app.models import Activo, CalculoBono, TipoActivo
+        from app.services.historial_calculos_service import HistorialCalculosService
+
+        db = sesion_compartida()
+        tipo = TipoActivo(nombre="BONO")
+        db.add(tipo)
+        db.commit()
+        activo = Activo(id_tipo_activo=tipo.id_tipo_activo, ticker="TES2030", nombre="TES 2030",
+                        **{k: v for k, v in BONO_TES.items() if k != "identificador"})
+        db.add(activo)
+        db.commit()
+
+        monkeypatch.setattr(settings, "HISTORIAL_INTERVALO_SEGUNDOS", 60)
+        monkeypatch.setattr(settings, "HISTORIAL_MAX_INTENTOS", 2)
+        antes = HistorialCalculosService.estadisticas()["descartados"]
+        HistorialCalculosService.iniciar(sesion_compartida)
+        try:
+            ids = {self._valorar(db, activo)["id_calculo"] for _ in range(2)}
+            # fecha_calculo es NOT NULL: la BD rechaza estas filas siempre
+            for _ in range(2):
+                HistorialCalculosService.registrar(db, id_activo=activo.id_activo, fecha_calculo=None,
+                                                   tir=Decimal('8.5'))
+
+            # Al devolver a la cola se respeta el tope: una fila rechazada se descarta
+            monkeypatch.setattr(settings, "HISTORIAL_MAX_PENDIENTES", 1)
+            assert HistorialCalculosService.vaciar() == 2
+            assert {str(c.id_calculo) for c in db.query(CalculoBono)} == ids
+            estadisticas = HistorialCalculosService.estadisticas()
+            assert estadisticas["pendientes"] == 1
+            assert estadisticas["descartados"] == antes + 1
+
+            # Agotados los intentos, la última también se descarta y la cola sigue libre
+            assert HistorialCalculosService.vaciar() == 0
+            ids.add(self._valorar(db, activo)["id_calculo"])
+        finally:
+            HistorialCalculosService.detener()
+
+        assert {str(c.id_calculo) for c in db.query(CalculoBono)} == ids
+        estadisticas = HistorialCalculosService.estadisticas()
+        assert estadisticas["pendientes"] == 0
+        assert estadisticas["descartados"] == antes + 2
+        db.close()
+
+    def test_cliente_de_prueba_no_arranca_la_cola(self, client):
+        from app.services.historial_calculos_service import HistorialCalculosService
+
+        assert not HistorialCalculosService.activo()
+
+
+# ═══════════════════════════════════════════════
+# Valoración masiva del universo de bonos
+# ═══════════════════════════════════════════════
+class TestValoracionMasiva:
+    """Tests para ValoracionMasivaService"""
+
+    def _crear_bonos(self, db, cantidad):
+        from dateutil.relativedelta import relativedelta
+        from app.models import Activo, TipoActivo
+
+        tipo = TipoActivo(nombre="BONO")
+        db.add(tipo)
+        db.commit()
+        datos = {k: v for k, v in BONO_TES.items() if k not in ("identificador", "fecha_vencimiento")}
+        for k in range(cantidad):
+            db.add(Activo(id_tipo_activo=tipo.id_tipo_activo, ticker=f"B{k:04d}", nombre=f"Bono {k}",
+                          fecha_vencimiento=date(2027, 1, 1) + relativedelta(months=6 * k), **datos))
+        db.add(Activo(id_tipo_activo=tipo.id_tipo_activo, ticker="VENCIDO", nombre="Vencido",
+                      fecha_vencimiento=date(2025, 1, 1), **datos))
+        db.add(Activo(id_tipo_activo=tipo.id_tipo_activo, ticker="INACTIVO", nombre="Inactivo",
+                      fecha_vencimiento=date(2030, 1, 1), activo=False, **datos))
+        db.commit()
+
+    @pytest.mark.parametrize("cantidad,procesos", [(3, 1), (120, 2)])
+    def test_valora_e_inserta(self, db_session, cantidad, procesos):
+        from app.models import CalculoBono
+        from app.services.valoracion_masiva_service import ValoracionMasivaService
+
+        self._crear_bonos(db_session, cantidad)
+        reporte = ValoracionMasivaService.valorar_universo_bonos(
+            db_session, fecha_valoracion=date(2026, 2, 6), tir=Decimal('8.5'), procesos=procesos
+        )
+        assert reporte["total_bonos"] == cantidad + 1
+        assert reporte["valorados"] == cantidad
+        assert reporte["procesos"] == procesos
+        assert [e["ticker"] for e in reporte["errores"]] == ["VENCIDO"]
+        assert db_session.query(CalculoBono).count() == cantidad
+
+        primero = db_session.query(CalculoBono).join(CalculoBono.activo).filter_by(ticker="B0000").one()
+        esperado = CalculoFinancieroService.calcular_precio_bono_sucio(
+            valor_nominal=BONO_TES["valor_nominal"], tasa_cupon=BONO_TES["tasa_cupon"],
+            frecuencia_cupon=2, tir=Decimal('8.5'), fecha_emision=BONO_TES["fecha_emision"],
+            fecha_vencimiento=date(2027, 1, 1), fecha_valoracion=date(2026, 2, 6)
+        )
+        assert primero.precio_sucio == esperado["precio_sucio"]
+
+    @pytest.mark.parametrize("valor", ["Admin@x.com, otro@x.com", '["admin@x.com", "otro@x.com"]'])
+    def test_admin_emails_desde_entorno(self, monkeypatch, valor):
+        from app.config import Settings
+
+        monkeypatch.setenv("ADMIN_EMAILS", valor)
+        assert Settings().ADMIN_EMAILS == ["admin@x.com", "otro@x.com"]
+
+
+# ═══════════════════════════════════════════════
+# Curva de rendimientos cero cupón
+# ═══════════════════════════════════════════════
+CURVA_TES = [(Decimal('0.5'), Decimal('8.9')), (Decimal('1'), Decimal('9.1')), (Decimal('2'), Decimal('9.4')),
+             (Decimal('5'), Decimal('10.2')), (Decimal('10'), Decimal('11'))]
+
+
+class TestCurvaRendimiento:
+    """Tests para CurvaRendimientoService y la valoración con curva"""
+
+    def test_bonos_par_valen_par(self):
+        from app.services.curva_rendimiento_service import CurvaRendimientoService
+
+        curva = CurvaRendimientoService.construir_curva(CURVA_TES)
+        for plazo, tasa in CURVA_TES:
+            n = int(plazo * 2)
+            precio = curva.valor_presente(100.0, float(tasa) / 2, n, 2)
+            assert precio == pytest.approx(100.0, abs=1e-10)
+
+    def test_curva_plana_igual_a_tir_plana(self):
+        from app.services.curva_rendimiento_service import CurvaRendimientoService
+
+        curva = CurvaRendimientoService.construir_curva([(Decimal('1'), Decimal('8.5')), (Decimal('30'), Decimal('8.5'))])
+        bono = {k: v for k, v in BONO_TES.items() if k != "identificador"}
+        con_tir = CalculoFinancieroService.calcular_precio_bono_sucio(
+            tir=Decimal('8.5'), fecha_valoracion=date(2026, 2, 6), **bono
+        )
+        con_curva = CalculoFinancieroService.calcular_precio_bono_sucio(
+            tir=None, fecha_valoracion=date(2026, 2, 6), curva=curva, calcular_tir_equivalente=True, **bono
+        )
+        assert abs(con_curva["precio_sucio"] - con_tir["precio_sucio"]) <= Decimal('0.01')
+        assert con_curva["tir_utilizada"] == pytest.approx(Decimal('8.5'), abs=Decimal('1e-6'))
+
+        # Por defecto la valoración con curva no resuelve la TIR
+        sin_tir = CalculoFinancieroService.calcular_precio_bono_sucio(
+            tir=None, fecha_valoracion=date(2026, 2, 6), curva=curva, **bono
+        )
+        assert sin_tir["tir_utilizada"] is None
+        assert sin_tir["precio_sucio"] == con_curva["precio_sucio"]
+
+    def test_lote_con_curva_igual_a_valoracion_individual(self):
+        from app.services.curva_rendimiento_service import CurvaRendimientoService
+        from app.services.valoracion_bonos_service import ValoracionBonosService
+
+        curva = CurvaRendimientoService.construir_curva(CURVA_TES)
+        fecha = date(2026, 2, 6)
+        bonos = [
+            BONO_TES,
+            {**BONO_TES, "identificador": "CORTO", "frecuencia_cupon": 4, "fecha_vencimiento": date(2027, 1, 1)},
+            {**BONO_TES, "identificador": "LARGO", "tasa_cupon": Decimal('11'), "fecha_vencimiento": date(2040, 1, 1)},
+            {**BONO_TES, "identificador": "VENCIDO", "fecha_vencimiento": date(2025, 1, 1)},
+        ]
+        lote = ValoracionBonosService.calcular_precios_curva_lote(bonos, curva, fecha)["resultados"]
+
+        for bono, fila in zip(bonos[:3], lote):
+            individual = CalculoFinancieroService.calcular_precio_bono_sucio(
+                tir=None, fecha_valoracion=fecha, curva=curva,
+                **{k: v for k, v in bono.items() if k != "identificador"}
+            )
+            assert fila["error"] is None
+            assert fila["num_periodos"] == individual["num_periodos"]
+            assert fila["precio_sucio"] == pytest.approx(float(individual["precio_sucio"]), abs=0.01)
+        assert lote[3]["error"] is not None
+
+    def test_guardar_y_cache(self, db_session):
+        from app.services.curva_rendimiento_service import CurvaRendimientoService
+
+        fecha = date(2026, 2, 6)
+        CurvaRendimientoService.guardar_curva(db_session, "TES_COP", fecha, CURVA_TES)
+        CurvaRendimientoService.limpiar_cache()
+
+        primera = CurvaRendimientoService.obtener_curva(db_session, "TES_COP", fecha)
+        segunda = CurvaRendimientoService.obtener_curva(db_session, "TES_COP", fecha)
+        assert primera is segunda
+        assert CurvaRendimientoService.estadisticas_cache()["fallos"] == 1
+
+        tabla = CurvaRendimientoService.describir_curva(primera)["puntos"]
+        assert [p["tasa_par"] for p in tabla] == [float(t) for _, t in CURVA_TES]
+        # Curva creciente: las tasas cero quedan por encima de las par
+        assert all(p["tasa_cero"] >= p["tasa_par"] for p in tabla[1:])
+
+        with pytest.raises(ValueError):
+            CurvaRendimientoService.obtener_curva(db_session, "TES_COP", date(2026, 2, 7))
+
+    def test_guardar_usa_valores_almacenados(self, db_session):
+        from app.services.curva_rendimiento_service import CurvaRendimientoService
+
+        fecha = date(2026, 2, 6)
+        puntos = [(Decimal('0.50004'), Decimal('8.91234567')), (Decimal('2'), Decimal('9.4'))]
+        guardada = CurvaRendimientoService.guardar_curva(db_session, "TES_COP", fecha, puntos)
+        assert guardada.puntos == ((Decimal('0.5000'), Decimal('8.912346')), (Decimal('2'), Decimal('9.4')))
+
+        CurvaRendimientoService.limpiar_cache()
+        releida = CurvaRendimientoService.obtener_curva(db_session, "TES_COP", fecha)
+        assert np.array_equal(releida.log_factores, guardada.log_factores)
+
+    def test_curva_re_registrada_en_otro_worker(self, db_session, monkeypatch):
+        from datetime import datetime, timedelta
+        from app.config import settings
+        from app.models import PuntoCurva
+        from app.services.curva_rendimiento_service import CurvaRendimientoService
+
+        fecha = date(2026, 2, 6)
+        anterior = CurvaRendimientoService.guardar_curva(db_session, "TES_COP", fecha, CURVA_TES)
+
+        # Otro worker reemplaza los puntos: esta caché no se entera por guardar_curva
+        db_session.query(PuntoCurva).delete()
+        db_session.add_all([
+            PuntoCurva(nombre_curva="TES_COP", fecha_curva=fecha, plazo_anios=plazo, tasa_par=tasa + 1,
+                       fecha_registro=datetime.utcnow() + timedelta(seconds=1))
+            for plazo, tasa in CURVA_TES
+        ])
+        db_session.commit()
+
+        monkeypatch.setattr(settings, "CURVA_CACHE_SEGUNDOS", 3600)
+        assert CurvaRendimientoService.obtener_curva(db_session, "TES_COP", fecha) is anterior
+
+        monkeypatch.setattr(settings, "CURVA_CACHE_SEGUNDOS", 0)
+        nueva = CurvaRendimientoService.obtener_curva(db_session, "TES_COP", fecha)
+        assert nueva is not anterior
+        assert [t for _, t in nueva.puntos] == [t + 1 for _, t in CURVA_TES]
+        # Sin cambios de versión se sigue sirviendo la misma curva
+        assert CurvaRendimientoService.obtener_curva(db_session, "TES_COP", fecha) is nueva
+        assert CurvaRendimientoService.estadisticas_cache()["verificaciones"] == 2
+
+
+# ═══════════════════════════════════════════════
+# Simulación Monte Carlo del portafolio
+# ═══════════════════════════════════════════════
+POSICIONES_MC = [
+    {"ticker": "ECOPETROL", "tipo_activo": "ACCION", "valor": 6_000_000.0},
+    {"ticker": "TES2030", "tipo_activo": "BONO", "valor": 3_000_000.0},
+    {"ticker": "CDT180", "tipo_activo": "CDT", "valor": 1_000_000.0},
+]
+
+
+class TestSimulacionMonteCarlo:
+    """Tests para SimulacionMonteCarloService"""
+
+    def test_deterministica_con_cualquier_numero_de_procesos(self, monkeypatch):
+        from app.services import simulacion_service
+        from app.services.simulacion_service import SimulacionMonteCarloService
+
+        monkeypatch.setattr(simulacion_service, "TAMANO_BLOQUE", 700)
+        args = dict(posiciones=POSICIONES_MC, trayectorias=2_000, horizonte_dias=126,
+                    puntos_banda=6, correlacion=0.4, semilla=7)
+        uno = SimulacionMonteCarloService.simular_trayectorias(**args, procesos=1)
+        dos = SimulacionMonteCarloService.simular_trayectorias(**args, procesos=2)
+        assert uno["bloques"] == 3
+        assert dos["procesos"] == 2
+        assert np.array_equal(uno["valores"], dos["valores"])
+        assert list(uno["dias_banda"]) == [21, 42, 63, 84, 105, 126]
+
+    def test_media_gbm_coincide_con_la_esperanza(self):
+        from app.services.simulacion_service import SimulacionMonteCarloService
+
+        simulacion = SimulacionMonteCarloService.simular_trayectorias(
+            POSICIONES_MC, trayectorias=50_000, horizonte_dias=252, puntos_banda=1, semilla=11
+        )
+        esperado = sum(p["valor"] * np.exp(p["mu"]) for p in simulacion["posiciones"])
+        assert simulacion["valores"][:, -1].mean() == pytest.approx(esperado, rel=5e-3)
+
+    def test_bootstrap_requiere_historia_y_escala_el_valor(self):
+        from app.services.simulacion_service import SimulacionMonteCarloService
+
+        with pytest.raises(ValueError, match="bootstrap"):
+            SimulacionMonteCarloService.simular_trayectorias(
+                POSICIONES_MC, 100, 10, metodo='bootstrap', retornos_log=np.zeros(5)
+            )
+        constante = np.full(30, np.log(1.001))
+        simulacion = SimulacionMonteCarloService.simular_trayectorias(
+            POSICIONES_MC, 100, 10, puntos_banda=2, metodo='bootstrap', retornos_log=constante, semilla=1
+        )
+        assert simulacion["valores"][:, -1] == pytest.approx(10_000_000.0 * 1.001 ** 10)
+
+    def test_bandas_desde_lotes_abiertos(self, db_session, sample_usuario, sample_activo):
+        from app.models import Lote
+        from app.services.simulacion_service import SimulacionMonteCarloService
+
+        for cantidad in (Decimal('100'), Decimal('0')):
+            db_session.add(Lote(id_usuario=sample_usuario.id_usuario, id_activo=sample_activo.id_activo,
+                                cantidad_inicial=Decimal('100'), cantidad_disponible=cantidad,
+                                precio_compra=Decimal('2500'), trm=Decimal('1'), costo_total=Decimal('250000')))
+        db_session.commit()
+
+        resultado = SimulacionMonteCarloService.simular_portafolio(
+            db_session, sample_usuario.id_usuario, trayectorias=5_000, horizonte_dias=60, puntos_banda=3, semilla=3
+        )
+        assert resultado["valor_inicial"] == 250_000.0
+        assert [b["dia"] for b in resultado["bandas"]] == [20, 40, 60]
+        for banda in resultado["bandas"]:
+            assert banda["p5"] < banda["p25"] < banda["p50"] < banda["p75"] < banda["p95"]
+        assert 0 < resultado["resumen_final"]["probabilidad_perdida"] < 1
+        assert resultado["semilla"] == 3
+
+        with pytest.raises(ValueError, match="lotes abiertos"):
+            SimulacionMonteCarloService.simular_portafolio(db_session, uuid4())
+
+
+# ═══════════════════════════════════════════════
+# Riesgo histórico del portafolio
+# ═══════════════════════════════════════════════
+class TestRiesgoPortafolio:
+    """Tests para RiesgoPortafolioService"""
+
+    def test_metricas_contra_referencia(self):
+        from datetime import timedelta
+        from app.services.riesgo_service import RiesgoPortafolioService
+
+        rng = np.random.default_rng(21)
+        valores = 1_000_000 * np.cumprod(1 + rng.normal(0.0005, 0.01, 500))
+        fechas = [date(2024, 1, 1) + timedelta(days=k) for k in range(500)]
+        metricas = RiesgoPortafolioService.calcular_metricas(fechas, valores, 0.99)
+
+        retornos = np.array([valores[k] / valores[k - 1] - 1 for k in range(1, 500)])
+        var = -np.percentile(retornos, 1)
+        assert metricas["var_historico"]["porcentaje"] == pytest.approx(var * 100, abs=1e-4)
+        assert metricas["cvar_historico"]["porcentaje"] >= metricas["var_historico"]["porcentaje"]
+        assert metricas["cvar_parametrico"]["porcentaje"] > metricas["var_parametrico"]["porcentaje"]
+        assert metricas["volatilidad_diaria"] == pytest.approx(np.std(retornos, ddof=1) * 100, abs=1e-6)
+
+        peor = max(
+            (1 - valores[j] / valores[:j + 1].max(), j) for j in range(500)
+        )
+        assert metricas["max_drawdown"]["porcentaje"] == pytest.approx(peor[0] * 100, abs=1e-4)
+        assert metricas["max_drawdown"]["fecha_valle"] == fechas[peor[1]]
+
+    def test_cache_hasta_nuevo_snapshot(self, db_session, sample_usuario, monkeypatch):
+        from datetime import timedelta
+        from app.config import settings
+        from app.models import ValoracionDiaria
+        from app.services.riesgo_service import RiesgoPortafolioService
+
+        def agregar(dia, valor):
+            db_session.add(ValoracionDiaria(
+                id_usuario=sample_usuario.id_usuario, fecha_valoracion=date(2026, 1, 1) + timedelta(days=dia),
+                valor_mercado_total=Decimal(valor), costo_total_invertido=Decimal('100')
+            ))
+            db_session.commit()
+
+        for dia, valor in enumerate(['100', '110', '99']):
+            agregar(dia, valor)
+        primero = RiesgoPortafolioService.obtener_riesgo(db_session, sample_usuario.id_usuario)
+        assert not primero["desde_cache"]
+        assert primero["max_drawdown"]["porcentaje"] == 10.0
+        assert primero["max_drawdown"]["fecha_pico"] == date(2026, 1, 2)
+
+        agregar(3, '50')
+        segundo = RiesgoPortafolioService.obtener_riesgo(db_session, sample_usuario.id_usuario)
+        assert segundo["desde_cache"] and segundo["observaciones"] == 3
+
+        RiesgoPortafolioService.invalidar(sample_usuario.id_usuario)
+        tercero = RiesgoPortafolioService.obtener_riesgo(db_session, sample_usuario.id_usuario)
+        assert not tercero["desde_cache"] and tercero["observaciones"] == 4
+
+        # Snapshot escrito en otro worker: lo detecta la verificación de versión
+        agregar(4, '60')
+        monkeypatch.setattr(settings, "RIESGO_CACHE_SEGUNDOS", 0)
+        cuarto = RiesgoPortafolioService.obtener_riesgo(db_session, sample_usuario.id_usuario)
+        assert not cuarto["desde_cache"] and cuarto["observaciones"] == 5
+        assert RiesgoPortafolioService.obtener_riesgo(db_session, sample_usuario.id_usuario)["desde_cache"]
+
+    def test_llaves_de_nivel_acotadas(self, db_session, sample_usuario):
+        from datetime import timedelta
+        from app.models import ValoracionDiaria
+        from app.services import riesgo_service
+        from app.services.riesgo_service import RiesgoPortafolioService
+
+        for dia, valor in enumerate(['100', '110', '99', '105']):
+            db_session.add(ValoracionDiaria(
+                id_usuario=sample_usuario.id_usuario, fecha_valoracion=date(2026, 1, 1) + timedelta(days=dia),
+                valor_mercado_total=Decimal(valor), costo_total_invertido=Decimal('100')
+            ))
+        db_session.commit()
+
+        primero = RiesgoPortafolioService.obtener_riesgo(db_session, sample_usuario.id_usuario, 0.95)
+        redondeado = RiesgoPortafolioService.obtener_riesgo(db_session, sample_usuario.id_usuario, 0.9500001)
+        assert redondeado["desde_cache"] and redondeado["nivel_confianza"] == primero["nivel_confianza"] == 0.95
+
+        for k in range(2 * riesgo_service.MAX_NIVELES_POR_USUARIO):
+            RiesgoPortafolioService.obtener_riesgo(db_session, sample_usuario.id_usuario, 0.9 + k / 1000)
+        niveles = riesgo_service._cache[sample_usuario.id_usuario]["niveles"]
+        assert len(niveles) == riesgo_service.MAX_NIVELES_POR_USUARIO
+        assert 0.95 not in niveles
+
+    def test_serie_corta(self, db_session, sample_usuario):
+        from app.services.riesgo_service import RiesgoPortafolioService
+
+        with pytest.raises(ValueError, match="al menos 3"):
+            RiesgoPortafolioService.obtener_riesgo(db_session, sample_usuario.id_usuario)
+
+
+# ═══════════════════════════════════════════════
+# Pruebas de estrés del portafolio
+# ═══════════════════════════════════════════════
+class TestEstresPortafolio:
+    """Tests para EstresPortafolioService"""
+
+    @pytest.fixture
+    def portafolio(self, db_session, sample_usuario, sample_activo, bono_activo):
+        from app.models import Activo, Lote, TipoActivo
+
+        tipo = TipoActivo(nombre="ACCION_EXT")
+        db_session.add(tipo)
+        db_session.commit()
+        aapl = Activo(id_tipo_activo=tipo.id_tipo_activo, ticker="AAPL", nombre="Apple", moneda="USD")
+        db_session.add(aapl)
+        db_session.commit()
+
+        for activo, cantidad, precio, trm in [
+            (sample_activo, '100', '2500', '1'),           # 250.000 COP
+            (aapl, '10', '200', '4000'),                    # 8.000.000 COP
+            (bono_activo, '2', '1000000', '1'),             # 2.000.000 COP
+        ]:
+            db_session.add(Lote(id_usuario=sample_usuario.id_usuario, id_activo=activo.id_activo,
+                                cantidad_inicial=Decimal(cantidad), cantidad_disponible=Decimal(cantidad),
+                                precio_compra=Decimal(precio), trm=Decimal(trm), costo_total=Decimal('0')))
+        db_session.commit()
+        return sample_usuario.id_usuario
+
+    def test_choques_por_tipo_de_activo(self, db_session, portafolio):
+        from app.services.estres_service import EstresPortafolioService
+
+        fecha = date(2026, 2, 6)
+        resultado = EstresPortafolioService.ejecutar_escenarios(db_session, portafolio, [
+            {"nombre": "TRM +10%", "choque_trm": 10},
+            {"nombre": "Acciones -20%", "choque_acciones": -20, "choques_activos": {"TEST": -50}},
+            {"nombre": "Tasas +200pb", "choque_tasas_pb": 200},
+        ], fecha_valoracion=fecha, tirs_base={"TES2030": Decimal('8.5')})
+
+        assert resultado["valor_inicial"] == 10_250_000.0
+        trm, acciones, tasas = resultado["escenarios"]
+        assert trm["pnl"] == 800_000.0
+        assert {a["ticker"]: a["pnl"] for a in acciones["por_activo"]} == {
+            "AAPL": -1_600_000.0, "TES2030": 0.0, "TEST": -125_000.0
+        }
+
+        campos = {k: v for k, v in BONO_TES.items() if k != "identificador"}
+        base, estresado = (
+            CalculoFinancieroService.calcular_precio_bono_sucio(tir=Decimal(t), fecha_valoracion=fecha, **campos)
+            for t in ('8.5', '10.5')
+        )
+        esperado = 2_000_000 * (float(estresado["precio_sucio"]) / float(base["precio_sucio"]) - 1)
+        assert tasas["pnl"] == pytest.approx(esperado, abs=5)
+        assert resultado["peor_escenario"] == "Acciones -20%"
+
+    def test_choque_trm_solo_a_dolares(self, db_session, portafolio, sample_activo):
+        from app.models import Activo, Lote
+        from app.services.estres_service import EstresPortafolioService
+
+        sap = Activo(id_tipo_activo=sample_activo.id_tipo_activo, ticker="SAP", nombre="SAP", moneda="EUR")
+        db_session.add(sap)
+        db_session.commit()
+        db_session.add(Lote(id_usuario=portafolio, id_activo=sap.id_activo, cantidad_inicial=Decimal('10'),
+                            cantidad_disponible=Decimal('10'), precio_compra=Decimal('100'),
+                            trm=Decimal('4500'), costo_total=Decimal('0')))
+        db_session.commit()
+
+        resultado = EstresPortafolioService.ejecutar_escenarios(
+            db_session, portafolio, [{"nombre": "TRM +10%", "choque_trm": 10}], fecha_valoracion=date(2026, 2, 6)
+        )
+        por_activo = {a["ticker"]: a["pnl"] for a in resultado["escenarios"][0]["por_activo"]}
+        assert por_activo["AAPL"] == 800_000.0
+        assert por_activo["SAP"] == 0.0
+        assert any(a.startswith("SAP: moneda EUR") for a in resultado["advertencias"])
+
+    def test_bono_incompleto_se_advierte(self, db_session, portafolio, bono_activo):
+        from app.models import Activo, Lote
+        from app.services.estres_service import EstresPortafolioService
+
+        incompleto = Activo(id_tipo_activo=bono_activo.id_tipo_activo, ticker="SINDATOS", nombre="Sin datos",
+                            valor_nominal=Decimal('1000000'), tasa_cupon=Decimal('7'))
+        db_session.add(incompleto)
+        db_session.commit()
+        db_session.add(Lote(id_usuario=portafolio, id_activo=incompleto.id_activo, cantidad_inicial=Decimal('1'),
+                            cantidad_disponible=Decimal('1'), precio_compra=Decimal('1000000'),
+                            trm=Decimal('1'), costo_total=Decimal('0')))
+        db_session.commit()
+
+        resultado = EstresPortafolioService.ejecutar_escenarios(
+            db_session, portafolio, [{"nombre": "Tasas +200pb", "choque_tasas_pb": 200}],
+            fecha_valoracion=date(2026, 2, 6)
+        )
+        por_activo = {a["ticker"]: a["pnl"] for a in resultado["escenarios"][0]["por_activo"]}
+        assert por_activo["SINDATOS"] == 0.0
+        assert por_activo["TES2030"] < 0
+        assert "SINDATOS: bono sin frecuencia_cupon, fecha_emision, fecha_vencimiento; se mantiene su valor" \
+            in resultado["advertencias"]
+
+    def test_ticker_fuera_del_portafolio(self, db_session, portafolio):
+        from app.services.estres_service import EstresPortafolioService
+
+        with pytest.raises(ValueError, match="NOEXISTE"):
+            EstresPortafolioService.ejecutar_escenarios(
+                db_session, portafolio, [{"nombre": "X", "choques_activos": {"NOEXISTE": -10}}]
+            )
+
+
+# ═══════════════════════════════════════════════
+# Histórico de TRM
+# ═══════════════════════════════════════════════
+class TestHistoricoTRM:
+    """Tests para TRMService"""
+
+    SERIE = [(date(2026, 2, 2), Decimal('4200')), (date(2026, 2, 3), Decimal('4210.5')),
+             (date(2026, 2, 6), Decimal('4190'))]
+
+    def test_carga_y_consulta_as_of(self, db_session):
+        from app.services.trm_service import TRMService
+
+        reporte = TRMService.cargar_historico(db_session, self.SERIE, fuente="BANREP")
+        assert reporte["cargados"] == 3 and reporte["reemplazados"] == 0
+
+        assert TRMService.trms_en_fechas(db_session, [
+            date(2026, 2, 1), date(2026, 2, 2), date(2026, 2, 5), date(2026, 2, 6), date(2026, 12, 31)
+        ]) == [None, Decimal('4200'), Decimal('4210.5'), Decimal('4190'), Decimal('4190')]
+        assert TRMService.estadisticas()["recargas"] == 1
+
+        reporte = TRMService.cargar_historico(db_session, [(date(2026, 2, 3), Decimal('4300')),
+                                                           (date(2026, 2, 4), Decimal('4305'))])
+        assert reporte["reemplazados"] == 1
+        assert TRMService.trm_en_fecha(db_session, date(2026, 2, 5)) == Decimal('4305')
+
+    def test_trm_vigente_sin_historico_usa_parametro(self, db_session):
+        from app.models import ParametroSistema
+        from app.services.trm_service import TRMService
+
+        db_session.add(ParametroSistema(nombre_parametro="TRM_ACTUAL", valor_parametro="3950", tipo_dato="NUMERIC"))
+        db_session.commit()
+        assert TRMService.trm_vigente(db_session, date(2026, 2, 6)) == Decimal('3950')
+
+        with pytest.raises(ValueError, match="mayor a cero"):
+            TRMService.cargar_historico(db_session, [(date(2026, 2, 6), Decimal('0'))])
+
+    def test_valor_mercado_usa_trm_historica(self, db_session, sample_usuario, sample_activo):
+        from app.api.portafolio import _valor_mercado_posiciones
+        from app.models import Activo, Lote
+        from app.services.posicion_service import PosicionService
+        from app.services.trm_service import TRMService
+
+        aapl = Activo(id_tipo_activo=sample_activo.id_tipo_activo, ticker="AAPL", nombre="Apple", moneda="USD")
+        sap = Activo(id_tipo_activo=sample_activo.id_tipo_activo, ticker="SAP", nombre="SAP", moneda="EUR")
+        db_session.add_all([aapl, sap])
+        db_session.commit()
+        lotes = [
+            Lote(id_usuario=sample_usuario.id_usuario, id_activo=activo.id_activo, cantidad_inicial=Decimal('10'),
+                 cantidad_disponible=Decimal('10'), precio_compra=precio, trm=trm, costo_total=Decimal('0'))
+            for activo, precio, trm in [(sample_activo, Decimal('2500'), Decimal('1')),
+                                        (aapl, Decimal('200'), Decimal('4000')),
+                                        (sap, Decimal('100'), Decimal('4500'))]
+        ]
+        db_session.add_all(lotes)
+        db_session.commit()
+        PosicionService.reconstruir(db_session, sample_usuario.id_usuario)
+        posiciones = PosicionService.obtener_posiciones(db_session, sample_usuario.id_usuario)
+
+        assert _valor_mercado_posiciones(db_session, posiciones, date(2026, 2, 6)) == Decimal('12525000')
+        # Sólo la posición en USD se revalúa con la TRM histórica; EUR conserva la tasa del lote
+        TRMService.cargar_historico(db_session, self.SERIE)
+        assert _valor_mercado_posiciones(db_session, posiciones, date(2026, 2, 6)) == Decimal('12905000')
+
+
+# ═══════════════════════════════════════════════
+# Clasificación del curso
+# ═══════════════════════════════════════════════
+class TestClasificacion:
+    """Tests para ClasificacionService"""
+
+    def _usuario(self, db, nombre, valoraciones):
+        from app.models import Usuario, ValoracionDiaria
+
+        usuario = Usuario(nombre=nombre, email=f"{nombre.lower()}@test.com", password_hash="x")
+        db.add(usuario)
+        db.flush()
+        for fecha, valor, costo in valoraciones:
+            db.add(ValoracionDiaria(id_usuario=usuario.id_usuario, fecha_valoracion=fecha,
+                                    valor_mercado_total=Decimal(valor), costo_total_invertido=Decimal(costo)))
+        db.commit()
+        return usuario
+
+    def test_ranking_con_ultima_valoracion_y_empates(self, db_session):
+        from app.services.clasificacion_service import ClasificacionService
+
+        self._usuario(db_session, "Ana", [(date(2026, 1, 1), '200', '100'), (date(2026, 2, 1), '110', '100')])
+        self._usuario(db_session, "Beto", [(date(2026, 2, 1), '130', '100')])
+        self._usuario(db_session, "Carla", [(date(2026, 1, 15), '260', '200')])
+        self._usuario(db_session, "Dora", [(date(2026, 2, 1), '90', '100')])
+        self._usuario(db_session, "Sin inversión", [(date(2026, 2, 1), '0', '0')])
+
+        resultado = ClasificacionService.obtener_clasificacion(db_session)
+        assert not resultado["desde_cache"]
+        assert resultado["meta_rendimiento"] == 15.0
+        assert [(p["nombre"], p["posicion"], p["rendimiento"]) for p in resultado["posiciones"]] == [
+            ("Beto", 1, 30.0), ("Carla", 1, 30.0), ("Ana", 3, 10.0), ("Dora", 4, -10.0)
+        ]
+        assert resultado["posiciones"][0]["nota"] == 5.0 and resultado["posiciones"][0]["supero_meta"]
+        assert resultado["posiciones"][2]["nota"] == pytest.approx(3.33)
+        assert resultado["posiciones"][3]["nota"] == 0.0
+
+    def test_snapshot_actualiza_la_cache_sin_recargar(self, db_session):
+        from app.services.clasificacion_service import ClasificacionService
+
+        ana = self._usuario(db_session, "Ana", [(date(2026, 2, 1), '110', '100')])
+        self._usuario(db_session, "Beto", [(date(2026, 2, 1), '120', '100')])
+        ClasificacionService.obtener_clasificacion(db_session)
+        recargas = ClasificacionService.estadisticas()["recargas"]
+
+        ClasificacionService.registrar_snapshot(ana, date(2026, 2, 2), Decimal('150'), Decimal('100'))
+        ClasificacionService.registrar_snapshot(ana, date(2026, 1, 1), Decimal('0.01'), Decimal('100'))
+        resultado = ClasificacionService.obtener_clasificacion(db_session, limite=1)
+        assert resultado["desde_cache"]
+        assert resultado["total_usuarios"] == 2
+        assert [(p["nombre"], p["rendimiento"]) for p in resultado["posiciones"]] == [("Ana", 50.0)]
+        assert ClasificacionService.estadisticas()["recargas"] == recargas
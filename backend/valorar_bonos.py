@@ -0,0 +1,52 @@
+"""
+Job nocturno: valoración de todo el universo de bonos del catálogo
+
+Uso (desde backend/):
+    python valorar_bonos.py                      # hoy, a la tasa cupón de cada bono
+    python valorar_bonos.py --fecha 2026-02-06 --tir 8.5 --procesos 4
+
+Programar con cron, por ejemplo a las 23:30:
+    30 23 * * * cd /ruta/backend && python valorar_bonos.py
+"""
+import argparse
+import sys
+from datetime import date
+from decimal import Decimal
+
+from app.database import SessionLocal
+from app.services.valoracion_masiva_service import ValoracionMasivaService
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Valoración masiva de bonos")
+    parser.add_argument("--fecha", type=date.fromisoformat, default=None,
+                        help="Fecha de valoración AAAA-MM-DD (default: hoy)")
+    parser.add_argument("--tir", type=Decimal, default=None,
+                        help="TIR común en %% (default: tasa cupón de cada bono)")
+    parser.add_argument("--procesos", type=int, default=None,
+                        help="Procesos del pool (default: núcleos disponibles)")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        reporte = ValoracionMasivaService.valorar_universo_bonos(
+            db, fecha_valoracion=args.fecha, tir=args.tir, procesos=args.procesos
+        )
+    finally:
+        db.close()
+
+    tiempos = reporte["tiempos_segundos"]
+    print(f"📅 Fecha de valoración: {reporte['fecha_valoracion']}")
+    print(f"✅ Bonos valorados: {reporte['valorados']}/{reporte['total_bonos']} "
+          f"con {reporte['procesos']} proceso(s)")
+    print(f"⏱️  Carga {tiempos['carga']}s | Valoración {tiempos['valoracion']}s | "
+          f"Inserción {tiempos['insercion']}s | Total {tiempos['total']}s")
+    if reporte["bonos_por_segundo"] is not None:
+        print(f"🚀 Throughput: {reporte['bonos_por_segundo']} bonos/s")
+    for error in reporte["errores"]:
+        print(f"❌ {error['ticker']}: {error['error']}")
+    return 1 if reporte["errores"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -112,6 +112,32 @@ CREATE INDEX idx_lotes_activo ON lotes(id_activo);
 CREATE INDEX idx_lotes_estado ON lotes(estado);
 CREATE INDEX idx_lotes_fecha ON lotes(fecha_compra DESC);
 
+-- =====================================================================
+-- TABLA: posiciones
+-- Agregado de lotes por (usuario, activo), mantenido en cada compra/venta
+-- Reconciliar con: python reconciliar_posiciones.py [--reconstruir]
+-- =====================================================================
+CREATE TABLE posiciones (
+    id_usuario UUID NOT NULL REFERENCES usuarios(id_usuario) ON DELETE CASCADE,
+    id_activo UUID NOT NULL REFERENCES activos(id_activo),
+    
+    -- Lotes abiertos (cantidad_disponible > 0)
+    cantidad_total NUMERIC(18, 6) NOT NULL DEFAULT 0,
+    costo_total NUMERIC(18, 2) NOT NULL DEFAULT 0, -- Σ costo_total de los lotes
+    valor_compra NUMERIC(24, 6) NOT NULL DEFAULT 0, -- Σ precio × disponible × TRM
+    valor_compra_moneda NUMERIC(24, 6) NOT NULL DEFAULT 0, -- Σ precio × disponible
+    numero_lotes INTEGER NOT NULL DEFAULT 0,
+    
+    -- Semáforo de todos los lotes del activo
+    lotes_verdes INTEGER NOT NULL DEFAULT 0,
+    lotes_amarillos INTEGER NOT NULL DEFAULT 0,
+    lotes_rojos INTEGER NOT NULL DEFAULT 0,
+    
+    fecha_actualizacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    
+    PRIMARY KEY (id_usuario, id_activo)
+);
+
 -- =====================================================================
 -- TABLA: transacciones
 -- Registro histórico de todas las operaciones
@@ -174,6 +200,37 @@ CREATE TABLE valoraciones_diarias (
     CONSTRAINT valoracion_unica_diaria UNIQUE (id_usuario, fecha_valoracion)
 );
 
+-- =====================================================================
+-- TABLA: curvas_rendimiento
+-- Puntos de la curva de rendimientos par por fecha (base del bootstrapping)
+-- =====================================================================
+CREATE TABLE curvas_rendimiento (
+    id_punto SERIAL PRIMARY KEY,
+    nombre_curva VARCHAR(50) NOT NULL,
+    fecha_curva DATE NOT NULL,
+    
+    plazo_anios NUMERIC(8, 4) NOT NULL CHECK (plazo_anios > 0),
+    tasa_par NUMERIC(10, 6) NOT NULL,
+    
+    fecha_registro TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    
+    CONSTRAINT punto_curva_unico UNIQUE (nombre_curva, fecha_curva, plazo_anios)
+);
+
+CREATE INDEX idx_curvas_nombre_fecha ON curvas_rendimiento(nombre_curva, fecha_curva);
+
+-- =====================================================================
+-- TABLA: historico_trm
+-- Serie diaria de la TRM (COP por USD) para valorar a cualquier fecha
+-- =====================================================================
+CREATE TABLE historico_trm (
+    fecha DATE PRIMARY KEY,
+    valor NUMERIC(12, 6) NOT NULL CHECK (valor > 0),
+    fuente VARCHAR(50),
+    
+    fecha_actualizacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
 -- =====================================================================
 -- TABLA: parametros_sistema
 -- Configuración del sistema (parámetros del Admin)
@@ -273,6 +330,25 @@ CREATE TRIGGER trg_validar_saldo_caja
     FOR EACH ROW
     EXECUTE FUNCTION validar_saldo_caja();
 
+-- =====================================================================
+-- FUNCIÓN: actualizar_fecha_parametro
+-- Mantiene fecha_actualizacion al modificar un parámetro (la usa el
+-- backend como versión para invalidar su caché de parámetros)
+-- =====================================================================
+CREATE OR REPLACE FUNCTION actualizar_fecha_parametro()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.fecha_actualizacion := CURRENT_TIMESTAMP;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Trigger para versionar parámetros
+CREATE TRIGGER trg_actualizar_fecha_parametro
+    BEFORE UPDATE ON parametros_sistema
+    FOR EACH ROW
+    EXECUTE FUNCTION actualizar_fecha_parametro();
+
 -- =====================================================================
 -- VISTAS ÚTILES
 -- =====================================================================
@@ -2,6 +2,8 @@ import api from './api';
 import type {
   BonoRequest,
   BonoResponse,
+  CurvaPrecioTirRequest,
+  CurvaPrecioTirResponse,
   CDTRequest,
   CDTResponse,
   DivisaRequest,
@@ -15,6 +17,13 @@ export const calcularBono = async (data: BonoRequest): Promise<BonoResponse> =>
   return response.data;
 };
 
+export const calcularCurvaPrecioTir = async (
+  data: CurvaPrecioTirRequest
+): Promise<CurvaPrecioTirResponse> => {
+  const response = await api.post('/api/calculos/bono/curva-precio-tir', data);
+  return response.data;
+};
+
 export const liquidarCDT = async (data: CDTRequest): Promise<CDTResponse> => {
   const response = await api.post('/api/calculos/cdt/liquidar', data);
   return response.data;
@@ -1,6 +1,11 @@
 import api from './api';
 import type {
   CompraRequest,
+  CompraLoteRequest,
+  CompraLoteResponse,
+  RebalanceoRequest,
+  RebalanceoResponse,
+  ResumenActivo,
   VentaRequest,
   LoteResponse,
   DashboardResponse,
@@ -20,11 +25,21 @@ export const comprarActivo = async (data: CompraRequest) => {
   return response.data;
 };
 
+export const comprarActivosLote = async (data: CompraLoteRequest): Promise<CompraLoteResponse> => {
+  const response = await api.post('/api/lotes/comprar/lote', data);
+  return response.data;
+};
+
 export const venderActivo = async (data: VentaRequest) => {
   const response = await api.post('/api/lotes/vender', data);
   return response.data;
 };
 
+export const rebalancearPortafolio = async (data: RebalanceoRequest): Promise<RebalanceoResponse> => {
+  const response = await api.post('/api/lotes/rebalancear', data);
+  return response.data;
+};
+
 export const listarLotes = async (
   idUsuario?: string,
   soloDisponibles: boolean = false,
@@ -40,7 +55,7 @@ export const listarLotes = async (
 
 export const obtenerResumen = async (
   idUsuario?: string
-): Promise<Record<string, unknown>[]> => {
+): Promise<ResumenActivo[]> => {
   const uid = idUsuario || getUserId();
   const response = await api.get(`/api/lotes/usuario/${uid}/resumen`);
   return response.data;
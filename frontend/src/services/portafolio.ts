@@ -3,6 +3,11 @@ import type {
   SaldoCaja,
   ResumenPortafolio,
   ValoracionDiaria,
+  SimulacionMonteCarloRequest,
+  SimulacionMonteCarloResponse,
+  RiesgoPortafolio,
+  PruebaEstresRequest,
+  PruebaEstresResponse,
 } from '../types';
 
 /** Obtiene el saldo de la caja de ahorros. */
@@ -28,3 +33,23 @@ export const generarSnapshotValoracion = async (): Promise<ValoracionDiaria> =>
   const { data } = await api.post('/api/portafolio/valoraciones/snapshot');
   return data;
 };
+
+/** Simula trayectorias futuras del valor del portafolio (Monte Carlo). */
+export const simularPortafolioMonteCarlo = async (
+  request: SimulacionMonteCarloRequest
+): Promise<SimulacionMonteCarloResponse> => {
+  const { data } = await api.post('/api/portafolio/simulacion/montecarlo', request);
+  return data;
+};
+
+/** Obtiene VaR/CVaR, volatilidad y máximo drawdown de las valoraciones diarias. */
+export const obtenerRiesgoPortafolio = async (nivelConfianza = 0.95): Promise<RiesgoPortafolio> => {
+  const { data } = await api.get('/api/portafolio/riesgo', { params: { nivel_confianza: nivelConfianza } });
+  return data;
+};
+
+/** Aplica escenarios de estrés (TRM, tasas, precios) a las posiciones abiertas. */
+export const ejecutarPruebaEstres = async (request: PruebaEstresRequest): Promise<PruebaEstresResponse> => {
+  const { data } = await api.post('/api/portafolio/estres', request);
+  return data;
+};
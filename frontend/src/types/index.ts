@@ -17,6 +17,13 @@ export interface CompraRequest {
   notas?: string;
 }
 
+export type CompraLoteItem = Omit<CompraRequest, 'id_usuario'>;
+
+export interface CompraLoteRequest {
+  id_usuario: string;
+  compras: CompraLoteItem[];
+}
+
 export interface VentaRequest {
   id_usuario: string;
   id_activo: string;
@@ -28,7 +35,83 @@ export interface VentaRequest {
   notas?: string;
 }
 
+export type VentaOrdenItem = Omit<VentaRequest, 'id_usuario'>;
+
+export interface RebalanceoRequest {
+  id_usuario: string;
+  ventas?: VentaOrdenItem[];
+  compras?: CompraLoteItem[];
+  simular?: boolean;
+}
+
 // --- Lotes: Response ---
+export interface ResumenActivo {
+  id_activo: string;
+  ticker: string;
+  nombre_activo: string;
+  tipo_activo: string | null;
+  moneda: string | null;
+  cantidad_total: number;
+  inversion_total: number;
+  precio_promedio: number;
+  lotes_verdes: number;
+  lotes_amarillos: number;
+  lotes_rojos: number;
+  numero_lotes: number;
+}
+
+export interface CompraLoteResultado {
+  indice: number;
+  id_activo: string;
+  id_lote: string | null;
+  id_transaccion: string | null;
+  cantidad: number;
+  costo_total: number;
+  saldo_caja_antes: number;
+  saldo_caja_despues: number;
+}
+
+export interface CompraLoteResponse {
+  total_compras: number;
+  costo_total: number;
+  saldo_anterior: number;
+  saldo_nuevo: number;
+  resultados: CompraLoteResultado[];
+  mensaje: string;
+}
+
+export interface VentaOrdenResultado {
+  indice: number;
+  id_activo: string;
+  cantidad: number;
+  monto_total: number;
+  lotes_afectados: {
+    id_lote: string;
+    cantidad_vendida: number;
+    cantidad_restante: number;
+    estado_nuevo: EstadoLote;
+  }[];
+}
+
+export interface PosicionRebalanceo {
+  id_activo: string;
+  ticker: string;
+  cantidad_anterior: number;
+  cantidad_nueva: number;
+}
+
+export interface RebalanceoResponse {
+  simulacion: boolean;
+  saldo_anterior: number;
+  total_ventas: number;
+  total_compras: number;
+  saldo_nuevo: number;
+  ventas: VentaOrdenResultado[];
+  compras: CompraLoteResultado[];
+  posiciones: PosicionRebalanceo[];
+  mensaje: string;
+}
+
 export interface LoteResponse {
   id_lote: string;
   id_usuario: string;
@@ -58,6 +141,8 @@ export interface DashboardResponse {
 }
 
 // --- Calculos Financieros ---
+export type ModoPrecision = 'exacto' | 'rapido';
+
 export interface BonoRequest {
   valor_nominal: number;
   tasa_cupon: number;
@@ -66,6 +151,7 @@ export interface BonoRequest {
   fecha_emision: string;
   fecha_vencimiento: string;
   fecha_valoracion?: string;
+  modo_precision?: ModoPrecision;
 }
 
 export interface BonoResponse {
@@ -79,12 +165,40 @@ export interface BonoResponse {
   fecha_valoracion: string;
 }
 
+export interface CurvaPrecioTirRequest {
+  valor_nominal: number;
+  tasa_cupon: number;
+  frecuencia_cupon: number;
+  fecha_emision: string;
+  fecha_vencimiento: string;
+  fecha_valoracion?: string;
+  tir_minima: number;
+  tir_maxima: number;
+  paso: number;
+}
+
+export interface PuntoCurvaPrecioTir {
+  tir: number;
+  precio_limpio: number;
+  precio_sucio: number;
+  duracion_modificada: number;
+}
+
+export interface CurvaPrecioTirResponse {
+  fecha_valoracion: string;
+  num_periodos: number;
+  cupon_acumulado: number;
+  total_puntos: number;
+  puntos: PuntoCurvaPrecioTir[];
+}
+
 export interface CDTRequest {
   capital_invertido: number;
   tasa_interes_anual: number;
   fecha_inicio: string;
   fecha_liquidacion: string;
   plazo_dias_original: number;
+  modo_precision?: ModoPrecision;
 }
 
 export interface CDTResponse {
@@ -106,7 +220,8 @@ export interface CDTResponse {
 export interface DivisaRequest {
   cantidad: number;
   precio_unitario: number;
-  trm: number;
+  trm?: number;
+  fecha_trm?: string;
   comision?: number;
 }
 
@@ -235,3 +350,91 @@ export interface ValoracionDiaria {
   efectivo_disponible?: number;
   fecha_calculo?: string;
 }
+
+export interface SimulacionMonteCarloRequest {
+  trayectorias?: number;
+  horizonte_dias?: number;
+  puntos_banda?: number;
+  metodo?: 'gbm' | 'bootstrap';
+  parametros?: Record<string, { mu?: number; sigma?: number }>;
+  correlacion?: number;
+  semilla?: number;
+  procesos?: number;
+}
+
+export interface BandaPercentiles {
+  dia: number;
+  media: number;
+  p5: number;
+  p25: number;
+  p50: number;
+  p75: number;
+  p95: number;
+}
+
+export interface SimulacionMonteCarloResponse {
+  metodo: string;
+  trayectorias: number;
+  horizonte_dias: number;
+  semilla: number;
+  bloques: number;
+  procesos: number;
+  valor_inicial: number;
+  posiciones: { ticker: string; tipo_activo?: string; valor: number; mu?: number; sigma?: number }[];
+  bandas: BandaPercentiles[];
+  resumen_final: { media: number; p5: number; p50: number; p95: number; probabilidad_perdida: number };
+  tiempo_segundos: number;
+}
+
+export interface MetricaRiesgo {
+  porcentaje: number;
+  valor: number;
+}
+
+export interface RiesgoPortafolio {
+  nivel_confianza: number;
+  observaciones: number;
+  fecha_inicio: string;
+  fecha_fin: string;
+  valor_actual: number;
+  retorno_medio_diario: number;
+  volatilidad_diaria: number;
+  volatilidad_anual: number;
+  var_historico: MetricaRiesgo;
+  cvar_historico: MetricaRiesgo;
+  var_parametrico: MetricaRiesgo;
+  cvar_parametrico: MetricaRiesgo;
+  max_drawdown: { porcentaje: number; fecha_pico: string; fecha_valle: string };
+  desde_cache: boolean;
+}
+
+export interface EscenarioEstres {
+  nombre: string;
+  choque_trm?: number;
+  choque_tasas_pb?: number;
+  choque_acciones?: number;
+  choques_activos?: Record<string, number>;
+}
+
+export interface PruebaEstresRequest {
+  escenarios: EscenarioEstres[];
+  fecha_valoracion?: string;
+  tirs_base?: Record<string, number>;
+}
+
+export interface ResultadoEscenario {
+  nombre: string;
+  valor_estresado: number;
+  pnl: number;
+  pnl_porcentaje: number;
+  por_activo: { ticker: string; pnl: number }[];
+}
+
+export interface PruebaEstresResponse {
+  fecha_valoracion: string;
+  valor_inicial: number;
+  posiciones: { ticker: string; tipo_activo?: string; moneda: string; valor: number }[];
+  escenarios: ResultadoEscenario[];
+  peor_escenario: string;
+  advertencias: string[];
+}